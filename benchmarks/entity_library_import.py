@@ -0,0 +1,82 @@
+"""Benchmark of the redundancy checks of bulk imports into an entity library.
+
+Imports synthetic entities with EntityLibrary.add_entities and merges them into an entity library file with
+FileWriter.writefile_json, both check every new entity for redundant wikidata and gnd ids with Cache.check_for_redundancy.
+The former scan over all entities is measured on the first entities of the import.
+
+    python benchmarks/entity_library_import.py --library 100000 --entities 100000  (with tei_entity_enricher
+    installed or on the PYTHONPATH)
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tei_entity_enricher.interface.postprocessing.entity_library import EntityLibrary
+from tei_entity_enricher.interface.postprocessing.io import FileWriter
+
+
+def get_entities(first_number, count):
+    # every third entity has no gnd id, every fifth entity of the import repeats an id of the library
+    return [
+        {
+            "name": f"Entity {number}",
+            "furtherNames": [],
+            "type": "person",
+            "description": "",
+            "wikidata_id": f"Q{number if number % 5 != 0 else number - first_number}",
+            "gnd_id": f"{number}-X" if number % 3 != 0 else "",
+            "furtherIds": {},
+        }
+        for number in range(first_number, first_number + count)
+    ]
+
+
+def check_for_redundancy_by_scan(data, wikidata_id, gnd_id):
+    # former implementation of Cache.check_for_redundancy (usecase EntityLibrary)
+    gnd_id_is_redundant = False
+    wikidata_id_is_redundant = False
+    for entity in data:
+        if (entity["wikidata_id"] == wikidata_id) and (wikidata_id != ""):
+            wikidata_id_is_redundant = True
+        if (entity["gnd_id"] == gnd_id) and (gnd_id != ""):
+            gnd_id_is_redundant = True
+    return wikidata_id_is_redundant, gnd_id_is_redundant
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of bulk imports into an entity library")
+    parser.add_argument("--library", type=int, default=100000, help="number of entities in the library")
+    parser.add_argument("--entities", type=int, default=100000, help="number of imported entities")
+    parser.add_argument("--scan-entities", type=int, default=200, help="number of entities checked by the scan")
+    args = parser.parse_args()
+    el = EntityLibrary(show_printmessages=False)
+    el.data = get_entities(1, args.library)
+    new_entities = get_entities(args.library + 1, args.entities)
+
+    start = time.perf_counter()
+    for entity in new_entities[: args.scan_entities]:
+        check_for_redundancy_by_scan(el.data, entity["wikidata_id"], entity["gnd_id"])
+    scan_time = (time.perf_counter() - start) / args.scan_entities * args.entities
+    print(f"scan: {scan_time:.1f}s estimated for the checks of {args.entities} entities")
+
+    start = time.perf_counter()
+    result = el.add_entities([dict(entity) for entity in new_entities])
+    print(f"add_entities: {time.perf_counter() - start:.2f}s, (added, rejected) = {result}")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        filepath = os.path.join(tempdir, "entity_library.json")
+        FileWriter(get_entities(1, args.library), filepath, show_printmessages=False).writefile_json()
+        # the merge is only executed, if none of the new entities is redundant
+        unique_entities = [
+            dict(entity, wikidata_id=f"Q{args.library + index + 1}") for index, entity in enumerate(new_entities)
+        ]
+        start = time.perf_counter()
+        merged = FileWriter(unique_entities, filepath, show_printmessages=False).writefile_json(
+            "merge", "EntityLibrary"
+        )
+        print(f"writefile_json merge: {time.perf_counter() - start:.2f}s, merged: {merged}")
+
+
+if __name__ == "__main__":
+    main()
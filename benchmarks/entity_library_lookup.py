@@ -0,0 +1,97 @@
+"""Benchmark of the entity library lookups of Identifier.check_entity_library.
+
+Searches names in a synthetic entity library with the name index of EntityLibrary and with the former scan over all
+entities and checks that both deliver the same entities.
+
+    python benchmarks/entity_library_lookup.py --entities 200000 --queries 500  (with tei_entity_enricher installed or
+    on the PYTHONPATH)
+"""
+import argparse
+import random
+import time
+
+from tei_entity_enricher.interface.postprocessing.entity_library import EntityLibrary
+
+types = ["person", "place", "organisation", "work"]
+
+
+def get_syllables(random_generator, count=2000):
+    consonants = "bcdfghjklmnprstvwzß"
+    vowels = "aeiouäöü"
+    return [
+        random_generator.choice(consonants)
+        + random_generator.choice(vowels)
+        + random_generator.choice(consonants + " ")
+        for _ in range(count)
+    ]
+
+
+def get_name(random_generator, syllables):
+    return " ".join(
+        "".join(random_generator.choice(syllables) for _ in range(random_generator.randint(1, 3))).strip().capitalize()
+        for _ in range(random_generator.randint(1, 3))
+    )
+
+
+def get_synthetic_library(entity_count, random_generator, syllables):
+    return [
+        {
+            "name": get_name(random_generator, syllables),
+            "furtherNames": [get_name(random_generator, syllables) for _ in range(random_generator.randint(0, 3))],
+            "type": random_generator.choice(types),
+            "description": "",
+            "wikidata_id": f"Q{index}",
+            "gnd_id": "",
+            "furtherIds": {},
+        }
+        for index in range(entity_count)
+    ]
+
+
+def find_by_scan(data, searchstring, type):
+    # former implementation of Identifier.check_entity_library (without the repeated results)
+    result_list = []
+    for entity in data:
+        if entity["type"] == type:
+            if searchstring.lower() in entity["name"].lower():
+                result_list.append(entity)
+                continue
+            for furtherName in entity["furtherNames"]:
+                if searchstring.lower() in furtherName.lower():
+                    result_list.append(entity)
+                    break
+    return result_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the entity library lookups")
+    parser.add_argument("--entities", type=int, default=200000, help="number of entities in the synthetic library")
+    parser.add_argument("--queries", type=int, default=500, help="number of searched names")
+    args = parser.parse_args()
+    random_generator = random.Random(0)
+    el = EntityLibrary(show_printmessages=False)
+    syllables = get_syllables(random_generator)
+    el.data = get_synthetic_library(args.entities, random_generator, syllables)
+    # names of entities of the library and new names
+    queries = [
+        (random_generator.choice(el.data)["name"], random_generator.choice(types)) for _ in range(args.queries // 2)
+    ] + [(get_name(random_generator, syllables), random_generator.choice(types)) for _ in range(args.queries // 2)]
+    random_generator.shuffle(queries)
+    start = time.perf_counter()
+    el.get_name_index()
+    print(f"index of {args.entities} entities built in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    index_results = [el.find_entities(name, type) for name, type in queries]
+    index_time = (time.perf_counter() - start) / len(queries)
+    scan_queries = queries[: max(1, len(queries) // 10)]
+    start = time.perf_counter()
+    scan_results = [find_by_scan(el.data, name, type) for name, type in scan_queries]
+    scan_time = (time.perf_counter() - start) / len(scan_queries)
+    print(
+        f"per query: index {index_time * 1000:.3f}ms, scan {scan_time * 1000:.1f}ms, "
+        f"identical results: {index_results[: len(scan_queries)] == scan_results}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark of the JSON backends of json_io on a synthetic groundtruth.
+
+Writes and reads a groundtruth file of sentences (lists of [word, tag] pairs) like the ones of the groundtruth
+builder, the prediction data and the prediction results, and an entity library with the indentation of
+FileWriter.writefile_json, with the former json.dump/json.load calls and with every available backend of json_io.
+
+    python benchmarks/json_backend.py --sentences 1000000  (with tei_entity_enricher installed or on the PYTHONPATH)
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from tei_entity_enricher.util import json_io
+
+tags = ["O", "B-person", "I-person", "B-place", "I-place", "B-org", "I-org"]
+
+
+def get_groundtruth(sentence_count, seed=0):
+    random_generator = random.Random(seed)
+    words = [f"Wort{number}" for number in range(5000)] + ["Bärlin", "Straße", "Größe", ",", "."]
+    return [
+        [
+            [random_generator.choice(words), random_generator.choice(tags)]
+            for _ in range(random_generator.randint(5, 30))
+        ]
+        for _ in range(sentence_count)
+    ]
+
+
+def get_library(entity_count):
+    return [
+        {
+            "name": f"Entity {number}",
+            "furtherNames": [f"Entität {number}"],
+            "type": "person",
+            "description": "",
+            "wikidata_id": f"Q{number}",
+            "gnd_id": f"{number}-X",
+            "furtherIds": {},
+        }
+        for number in range(entity_count)
+    ]
+
+
+def get_variants():
+    # (dump, load) functions of the former json.dump/json.load calls and of the backends of json_io
+    variants = {"former json.dump/json.load": (json.dump, json.load)}
+    for backend in [json_io.backend_json] + ([json_io.backend_orjson] if json_io.orjson is not None else []):
+
+        def dump(obj, file, indent=None, backend=backend):
+            json_io.set_backend(backend)
+            json_io.dump(obj, file, indent=indent)
+
+        def load(file, backend=backend):
+            json_io.set_backend(backend)
+            return json_io.load(file)
+
+        variants["json_io with " + backend] = (dump, load)
+    return variants
+
+
+def measure(tempdir, name, get_data, indent=None, binary=False):
+    # the data is freed before loading, so that only one copy of a large groundtruth is kept in memory
+    variants = get_variants()
+    data = get_data()
+    length = len(data)
+    dump_times = {}
+    for index, (dump, _) in enumerate(variants.values()):
+        start = time.perf_counter()
+        with open(os.path.join(tempdir, f"{index}.json"), "w") as f:
+            dump(data, f, indent=indent)
+        dump_times[index] = time.perf_counter() - start
+    del data
+    for index, (variant, (_, load)) in enumerate(variants.items()):
+        filepath = os.path.join(tempdir, f"{index}.json")
+        start = time.perf_counter()
+        with open(filepath, "rb" if binary and index > 0 else "r") as f:
+            loaded_data = load(f)
+        load_time = time.perf_counter() - start
+        assert len(loaded_data) == length
+        del loaded_data
+        print(
+            f"{name}, {variant}: dump {dump_times[index]:.2f}s, load {load_time:.2f}s, "
+            f"{os.path.getsize(filepath) / 1e6:.0f} MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the JSON backends of json_io")
+    parser.add_argument("--sentences", type=int, default=1000000, help="number of sentences of the groundtruth")
+    parser.add_argument("--entities", type=int, default=200000, help="number of entities of the library")
+    args = parser.parse_args()
+    # the groundtruth and prediction files are read in binary mode, the entity library in text mode
+    with tempfile.TemporaryDirectory() as tempdir:
+        measure(
+            tempdir, f"groundtruth of {args.sentences} sentences", lambda: get_groundtruth(args.sentences), None, True
+        )
+        measure(tempdir, f"entity library of {args.entities} entities", lambda: get_library(args.entities), "\t")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Micro-benchmark of the text assembly stage of TEIFile.
+
+Creates a synthetic TEI-File of the given size (default 50 MB), extracts its text lists with the streaming
+engine and compares the former concatenation based assembly with tei_parser.assemble_text.
+
+    python benchmarks/tei_text_assembly.py --size-mb 50  (with tei_entity_enricher installed or on the PYTHONPATH)
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from tei_entity_enricher.util.tei_parser import TEIFile, assemble_text, engine_stream
+
+paragraph = (
+    "<p>Lieber <persName>Herwarth Walden</persName>,<lb/>ich komme am <date>Montag</date>\n"
+    "      nach <placeName>Berlin</placeName> und bringe <rs type=\"person\">Ihre Frau</rs> mit."
+    "<note>Gemeint ist <persName>Nell Walden</persName>.</note></p>\n"
+)
+tr_config = {"exclude_tags": [], "use_notes": True, "note_tags": ["note"]}
+entity_dict = {"pers": [["persName", {}], ["rs", {"type": "person"}]], "place": [["placeName", {}]], "date": [["date", {}]]}
+
+
+def write_synthetic_tei(filepath, size_mb):
+    paragraph_count = size_mb * 1024 * 1024 // len(paragraph.encode("utf-8"))
+    with open(filepath, "w", encoding="utf8") as f:
+        f.write('<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><div>\n')
+        for _ in range(paragraph_count):
+            f.write(paragraph)
+        f.write("</div></body></text></TEI>\n")
+
+
+def assemble_text_by_concatenation(element_list):
+    text = ""
+    for element in element_list:
+        text = text + str(element)
+    text = " ".join(re.split(r"\s+", text))
+    return text.replace("<linebreak>", "\n")
+
+
+class CollectingTEIFile(TEIFile):
+    def _build_text_outputs(self, text_list, tagged_text_list, statistics):
+        self.element_lists = [text_list, tagged_text_list, self._note_list, self._tagged_note_list]
+        return super()._build_text_outputs(text_list, tagged_text_list, statistics)
+
+
+def measure(assemble, element_lists):
+    start = time.perf_counter()
+    results = [assemble(element_list) for element_list in element_lists]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the TEIFile text assembly")
+    parser.add_argument("--size-mb", type=int, default=50, help="size of the synthetic TEI-File in MB")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tempdir:
+        filepath = os.path.join(tempdir, "synthetic.xml")
+        write_synthetic_tei(filepath, args.size_mb)
+        start = time.perf_counter()
+        tei_file = CollectingTEIFile(filepath, tr_config, entity_dict=entity_dict, engine=engine_stream)
+        print(f"streaming extraction of {args.size_mb} MB: {time.perf_counter() - start:.2f}s")
+    element_count = sum(len(element_list) for element_list in tei_file.element_lists)
+    print(f"assembling {element_count} elements")
+    old_time, old_results = measure(assemble_text_by_concatenation, tei_file.element_lists)
+    print(f"concatenation + regex split: {old_time:.2f}s")
+    new_time, new_results = measure(assemble_text, tei_file.element_lists)
+    print(f"assemble_text:               {new_time:.2f}s")
+    print(f"identical results: {old_results == new_results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark of the tree building of TEI_Writer.
+
+Builds the text tree of synthetic TEI-Files of increasing size with the stack based tree builder and with the former
+recursive tree builder and checks that both deliver the same tree.
+
+    python benchmarks/tei_writer_tree.py --sizes-kb 200 800 3200  (with tei_entity_enricher installed or on the PYTHONPATH)
+"""
+import argparse
+import io
+import time
+
+from tei_entity_enricher.util.tei_writer import TEI_Writer
+
+paragraph = (
+    '<p>Lieber <persName>Herwarth Walden</persName>,<lb/>ich komme am <date when="1912-03-04">Montag</date>\n'
+    '      nach <placeName>Berlin</placeName><!-- Ankunft --> und bringe <rs type="person">Ihre Frau</rs> mit.'
+    "<note>Gemeint ist <persName>Nell Walden</persName>.<note>verschachtelt</note></note></p>\n"
+)
+
+
+def get_synthetic_tei(size_kb):
+    paragraph_count = size_kb * 1024 // len(paragraph.encode("utf-8"))
+    return (
+        '<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><div>\n'
+        + paragraph * paragraph_count
+        + "</div></body></text></TEI>\n"
+    )
+
+
+def measure(build, writer):
+    writer._max_id = 0
+    start = time.perf_counter()
+    tree = build(writer._text)
+    return time.perf_counter() - start, tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the TEI_Writer tree building")
+    parser.add_argument(
+        "--sizes-kb", type=int, nargs="+", default=[200, 800, 3200], help="sizes of the synthetic TEI-Files in KB"
+    )
+    args = parser.parse_args()
+    for size_kb in args.sizes_kb:
+        writer = TEI_Writer("synthetic.xml", openfile=io.BytesIO(get_synthetic_tei(size_kb).encode("utf-8")))
+        stack_time, stack_tree = measure(writer._build_text_tree_by_stack, writer)
+        recursive_time, recursive_tree = measure(lambda text: writer._build_subtexttaglist(text)[0], writer)
+        print(
+            f"{size_kb} KB: stack {stack_time:.2f}s, recursive {recursive_time:.2f}s, "
+            f"identical trees: {stack_tree == recursive_tree}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Memory benchmark of the text tree of TEI_Writer.
+
+Builds the text tree of an edition file (or of a synthetic TEI-File of the given size) and compares the memory of the
+tree of TagNodes with the memory of the same tree in the former representation with a dict for every tag.
+
+    python benchmarks/tei_writer_tree_memory.py --file edition.xml
+    python benchmarks/tei_writer_tree_memory.py --size-mb 20  (with tei_entity_enricher installed or on the PYTHONPATH)
+"""
+import argparse
+import io
+import sys
+import time
+from collections.abc import Mapping
+
+from tei_entity_enricher.util.tei_writer import TEI_Writer
+from tei_writer_tree import get_synthetic_tei
+
+
+def copy_string(string):
+    # a new string object, as the former tree builder sliced every tag from the text
+    return (string + " ")[:-1]
+
+
+def to_former_tree(cur_element):
+    if isinstance(cur_element, Mapping):
+        tag_dict = {
+            key: copy_string(value) if key in ["name", "tagbegin", "tagend"] else value
+            for key, value in cur_element.items()
+        }
+        if "tagcontent" in tag_dict:
+            tag_dict["tagcontent"] = to_former_tree(tag_dict["tagcontent"])
+        return tag_dict
+    elif isinstance(cur_element, list):
+        return [to_former_tree(element) for element in cur_element]
+    return cur_element
+
+
+def get_deep_size(tree):
+    # sums the sizes of all objects of the tree (strings shared between the trees are counted in both)
+    seen = set()
+    size = 0
+    stack = [tree]
+    while len(stack) > 0:
+        cur_element = stack.pop()
+        if id(cur_element) in seen:
+            continue
+        seen.add(id(cur_element))
+        size += sys.getsizeof(cur_element)
+        if isinstance(cur_element, dict):
+            stack.extend(cur_element.values())
+        elif isinstance(cur_element, list):
+            stack.extend(cur_element)
+        elif isinstance(cur_element, Mapping):
+            for slot in type(cur_element).__slots__:
+                stack.append(getattr(cur_element, slot))
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark of the TEI_Writer text tree")
+    parser.add_argument("--file", help="TEI-File to use, e.g. a large edition file")
+    parser.add_argument(
+        "--size-mb", type=int, default=20, help="size of the synthetic TEI-File in MB, if no file is given"
+    )
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.file is not None:
+        writer = TEI_Writer(args.file)
+    else:
+        writer = TEI_Writer(
+            "synthetic.xml", openfile=io.BytesIO(get_synthetic_tei(args.size_mb * 1024).encode("utf-8"))
+        )
+    print(f"text of {len(writer._text) / 1024 / 1024:.1f} MB, tree built in {time.perf_counter() - start:.2f}s")
+    node_tree = writer.get_text_tree()
+    former_tree = to_former_tree(node_tree)
+    print(f"tree of TagNodes: {get_deep_size(node_tree) / 1024 / 1024:.1f} MB")
+    print(f"tree of dicts:    {get_deep_size(former_tree) / 1024 / 1024:.1f} MB")
+    print(f"identical trees: {node_tree == former_tree}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,7 +35,10 @@ setup(
     url="https://github.com/NEISSproject/tei_entity_enricher",
     download_url="https://github.com/NEISSproject/tei_entity_enricher/archive/{}.tar.gz".format(__version__),
     entry_points={
-        "console_scripts": ["ntee-start=tei_entity_enricher.scripts.ntee:run"],
+        "console_scripts": [
+            "ntee-start=tei_entity_enricher.scripts.ntee:run",
+            "ntee-batch=tei_entity_enricher.scripts.ntee_batch:main",
+        ],
     },
     python_requires=">=3.7",
     install_requires=open(os.path.join(this_dir, "requirements.txt")).read().split("\n"),
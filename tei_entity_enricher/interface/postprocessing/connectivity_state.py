@@ -0,0 +1,50 @@
+import functools
+import threading
+import time
+from typing import Any, Dict, Hashable, Tuple, Union
+
+
+class ConnectivityState:
+    def __init__(self, ttl: float = 300.0, failure_ttl: float = 30.0) -> None:
+        """results of the connectivity checks of GndConnector and WikidataConnector,
+        which are shared by all connectors of the process, so that the apis are only checked again after a while
+
+        ttl:
+            time in seconds, for which the result of a passed connectivity check is valid
+        failure_ttl:
+            time in seconds, for which the result of a failed connectivity check is valid
+            (shorter, so that the apis are checked again soon after a connection error)"""
+        self.ttl: float = ttl
+        self.failure_ttl: float = failure_ttl
+        self._lock: threading.Lock = threading.Lock()
+        self._results: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable) -> Any:
+        """returns the valid result saved for key or None"""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() > entry[1]:
+                del self._results[key]
+                return None
+            return entry[0]
+
+    def set(self, key: Hashable, result: Any, passed: bool = True) -> None:
+        """saves result (not None) for key with the time to live of a passed or failed connectivity check"""
+        with self._lock:
+            self._results[key] = (result, time.monotonic() + (self.ttl if passed else self.failure_ttl))
+
+    def invalidate(self, key: Union[Hashable, None] = None) -> None:
+        """removes the result of key or, without key, all results"""
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+
+@functools.lru_cache(maxsize=None)
+def get_connectivity_state() -> ConnectivityState:
+    # shared instance of the process
+    return ConnectivityState()
@@ -1,25 +1,93 @@
-from typing import Union, List, Tuple
+import itertools
+from typing import Union, List, Tuple, Dict, Iterable
 from streamlit.uploaded_file_manager import UploadedFile
+from tei_entity_enricher.interface.postprocessing.entity_library_journal import EntityLibraryJournal
+from tei_entity_enricher.interface.postprocessing.http_session import get_sparql_client
 from tei_entity_enricher.interface.postprocessing.io import FileReader, FileWriter, Cache
 from tei_entity_enricher.interface.postprocessing.wikidata_connector import WikidataConnector
 from tei_entity_enricher.interface.postprocessing.gnd_connector import GndConnector
 from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary
 from tei_entity_enricher.util.exceptions import MissingDefinition, FileNotFound, BadFormat
 import os
+import re
 from urllib.parse import urlparse
-from tei_entity_enricher import __version__
-from SPARQLWrapper import SPARQLWrapper, JSON
 
 # todo: prüfen, wie furtherIds im Moment zu Entitäten in der entity library hinzugefügt werden können
 # todo: wahrscheinlich furtherIds-Befüllung in add_missing_ids() einbauen
 
 
+class EntityNameIndex:
+    def __init__(self, data: Union[list, None] = None) -> None:
+        """index of the lowercased name and furtherNames values of the entities of an entity library,
+        which is used to find the entities containing a search string in one of their names
+
+        for every entity type the positions of the entities in the library are listed under the trigrams of their names;
+        a search string of at least three characters is only compared with the entities listed under its rarest trigram,
+        shorter search strings are compared with all entities (of the type)
+
+        search_strings:
+            lowercased names of every entity in one string, separated by null characters
+        trigrams:
+            dict with entity types as keys and dicts, which map the trigrams to the ascending entity positions, as values
+        positions_by_type:
+            dict with entity types as keys and the ascending positions of the entities of the type as values"""
+        self.search_strings: List[str] = []
+        self.trigrams: Dict[str, Dict[str, List[int]]] = {}
+        self.positions_by_type: Dict[str, List[int]] = {}
+        if data is not None:
+            self.add_entities(data)
+
+    def add_entities(self, entities: List[dict]) -> None:
+        """adds entities to the index, which have been appended to the indexed library data"""
+        for entity in entities:
+            position = len(self.search_strings)
+            names = [entity["name"].lower()] + [further_name.lower() for further_name in entity["furtherNames"]]
+            self.search_strings.append("\0".join(names))
+            self.positions_by_type.setdefault(entity["type"], []).append(position)
+            type_trigrams = self.trigrams.setdefault(entity["type"], {})
+            for trigram in {name[i : i + 3] for name in names for i in range(len(name) - 2)}:
+                type_trigrams.setdefault(trigram, []).append(position)
+
+    def search(self, searchstring: str, type: Union[str, None] = None) -> List[int]:
+        """returns the ascending positions of the entities (of type, if type is not None),
+        which contain the lowercased searchstring in their name or in one of their furtherNames values"""
+        searchstring = searchstring.lower()
+        types = [type] if type is not None else list(self.positions_by_type.keys())
+        candidate_lists = []
+        for entity_type in types:
+            if len(searchstring) < 3 or "\0" in searchstring:
+                candidate_lists.append(self.positions_by_type.get(entity_type, []))
+                continue
+            type_trigrams = self.trigrams.get(entity_type, {})
+            rarest_postings = None
+            for i in range(len(searchstring) - 2):
+                postings = type_trigrams.get(searchstring[i : i + 3])
+                if postings is None:
+                    rarest_postings = []
+                    break
+                if rarest_postings is None or len(postings) < len(rarest_postings):
+                    rarest_postings = postings
+            candidate_lists.append(rarest_postings)
+        candidates = candidate_lists[0] if len(candidate_lists) == 1 else sorted(itertools.chain(*candidate_lists))
+        if "\0" in searchstring:
+            return [
+                position
+                for position in candidates
+                if any(searchstring in name for name in self.search_strings[position].split("\0"))
+            ]
+        return [position for position in candidates if searchstring in self.search_strings[position]]
+
+    def __len__(self) -> int:
+        return len(self.search_strings)
+
+
 class EntityLibrary:
     def __init__(
         self,
         data_file: Union[str, None] = None,
         use_default_data_file: bool = False,
         show_printmessages: bool = True,
+        use_journal: bool = True,
     ) -> None:
         """is a runtime memory of entities (saved properties are: name, furtherNames, type, gnd_id, wikidata_id),
         which is used as data source for named entity identification in post-processing
@@ -33,6 +101,9 @@ class EntityLibrary:
             load EntityLibrary with default data_file-path or not
         show_printmessages:
             show class internal printmessages on runtime or not
+        use_journal:
+            save added and updated entities in an append-only journal next to data_file (see EntityLibraryJournal)
+            instead of rewriting the whole file on every save_library() call
         default_data_file:
             default path to json file in local_save_path/config/postprocessing/entity_library.json, is saved here and not
             as default value on init for processing reasons in menu/tei_postprocessing.py
@@ -43,18 +114,104 @@ class EntityLibrary:
             (keys are hostnames and values are lists,
             containing 1.: the wikidata property id which is used to retrieve the respective Identifier information from wikidata sparql endpoint,
             2. a uri template with a blank, in which an id can be inserted later to create a specific entitiy uri for the respective database)
+        rejected_entities:
+            entities rejected by the last add_entities_in_bulk() call, as tuples of their position in the imported data,
+            the entity and the reason of the rejection
         """
         self.use_default_data_file: bool = use_default_data_file
         self.default_data_file: str = os.path.join(local_save_path, "config", "postprocessing", "entity_library.json")
         self.data_file: Union[str, None] = self.default_data_file if self.use_default_data_file == True else data_file
         self.show_printmessages: bool = show_printmessages
+        self.use_journal: bool = use_journal
+        # self.data list, which is saved in data_file and its journal, and the changes of it, which are not saved yet
+        self._saved_data: Union[list, None] = None
+        self._unsaved_journal_records: List[dict] = []
+        self._name_index: Union[EntityNameIndex, None] = None
+        self._redundancy_check_cache: Union[Cache, None] = None
+        self._wikidata_connector: Union[WikidataConnector, None] = None
+        self._gnd_connector: Union[GndConnector, None] = None
         self.data: Union[list, None] = None
+        self.rejected_entities: List[Tuple[int, dict, str]] = []
         if (self.data_file is not None) and (self.load_library(create_new_file=True) == True):
             print(f"EntityLibrary loaded from {self.data_file}...") if self.show_printmessages else None
         else:
             print("EntityLibrary initialized without data...") if self.show_printmessages else None
         self.furtherIds_config: Union[dict, None] = self.load_furtherIds_config()
 
+    @property
+    def data(self) -> Union[list, None]:
+        return self._data
+
+    @data.setter
+    def data(self, data: Union[list, None]) -> None:
+        # a new data list has to be indexed again and saved completely
+        self._data = data
+        self._name_index = None
+        self._redundancy_check_cache = None
+        self._unsaved_journal_records = []
+
+    def get_name_index(self) -> EntityNameIndex:
+        """returns the name index of self.data, which is built on the first call and then updated by add_entities();
+        if entities of self.data are changed without update_entity(), reset_name_index() has to be called"""
+        if self._name_index is None or len(self._name_index) != len(self.data):
+            self._name_index = EntityNameIndex(self.data)
+        return self._name_index
+
+    def reset_name_index(self) -> None:
+        self._name_index = None
+
+    def get_redundancy_check_cache(self) -> Cache:
+        """returns a Cache of self.data, whose id indexes are kept up to date by add_entities() and update_entity()"""
+        if self._redundancy_check_cache is None:
+            self._redundancy_check_cache = Cache(data=self.data, show_printmessages=False)
+        return self._redundancy_check_cache
+
+    def update_entity(self, position: int, values: dict) -> None:
+        """updates the entity on position in self.data with the key-value pairs of values"""
+        self.data[position].update(values)
+        self._record_change({"op": "update", "position": position, "values": values})
+        self.reset_name_index()
+        if self._redundancy_check_cache is not None:
+            self._redundancy_check_cache.reset_indexes()
+
+    def _record_change(self, record: dict) -> None:
+        # changes of the saved data list are appended to the journal by the next save_library() call,
+        # changes of another data list are saved by rewriting the whole file anyway
+        if self.use_journal and self.data is self._saved_data:
+            self._unsaved_journal_records.append(record)
+
+    def get_wikidata_connector(
+        self, input: List[Tuple[str, str]], wikidata_web_api_limit: str = "50"
+    ) -> WikidataConnector:
+        """returns the WikidataConnector of the library with input and wikidata_web_api_limit for the next query,
+        the connector is created on the first call and reused afterwards (its connectivity is only checked again,
+        if the shared result of the last check has expired)"""
+        if self._wikidata_connector is None:
+            self._wikidata_connector = WikidataConnector(input=input, wikidata_web_api_limit=wikidata_web_api_limit)
+        else:
+            self._wikidata_connector.input = input
+            self._wikidata_connector.wikidata_web_api_limit = wikidata_web_api_limit
+            self._wikidata_connector.connectivity_check()
+        return self._wikidata_connector
+
+    def get_gnd_connector(self, gnd_id: Union[str, List[str]]) -> GndConnector:
+        """returns the GndConnector of the library with gnd_id for the next query,
+        the connector is created on the first call and reused afterwards (its connectivity is only checked again,
+        if the shared result of the last check has expired)"""
+        if self._gnd_connector is None:
+            self._gnd_connector = GndConnector(gnd_id)
+        else:
+            self._gnd_connector.gnd_id = gnd_id
+            self._gnd_connector.connectivitycheck_loop()
+        return self._gnd_connector
+
+    def find_entities(self, searchstring: str, type: Union[str, None] = None) -> List[dict]:
+        """returns the entities of self.data (of type, if type is not None), which contain searchstring
+        in their name or in one of their furtherNames values (case-insensitive)"""
+        if self.data is None:
+            return []
+        return [self.data[position] for position in self.get_name_index().search(searchstring, type)]
+
     def load_furtherIds_config(self) -> None:
         """used to load furtherIds_config.json from a local json file in config folder;
         file defines which ids (besides compulsory gnd and wikidata) are saved in entity dicts
@@ -125,6 +282,7 @@ class EntityLibrary:
                         filepath=self.data_file,
                         show_printmessages=self.show_printmessages,
                     ).writefile_json()
+                    EntityLibraryJournal(self.data_file).clear()
                 except:
                     print(
                         f"EntityLibrary load_library(): could not create default entity_library.json in config folder."
@@ -143,6 +301,8 @@ class EntityLibrary:
                 f"EntityLibrary load_library(): could not load library from {self.data_file}, no valid json format."
             ) if self.show_printmessages else None
             return f"EntityLibrary load_library(): could not load library from {self.data_file}, no valid json format."
+        if self.use_journal and isinstance(result, list):
+            EntityLibraryJournal(self.data_file).replay(result)
         structure_check_cache = Cache(result)
         if structure_check_cache.check_json_structure("EntityLibrary") == False:
             print(
@@ -150,6 +310,7 @@ class EntityLibrary:
             ) if self.show_printmessages else None
             return f"EntityLibrary load_library(): could not load library from {self.data_file}, file does not fulfill the structure requirements for EntityLibrary. See documentation for requirement list."
         self.data = result
+        self._saved_data = result
         return True
 
     def add_entities_from_file(
@@ -159,8 +320,12 @@ class EntityLibrary:
         source_type: str = None,
         file: UploadedFile = None,
         csv_delimiter: str = ",",
+        chunk_size: int = 10000,
     ) -> Union[Tuple[int, int], str, None]:
-        """used to add data from source (json or csv format) into the already loaded entity library
+        """used to add data from source (json, csv or tsv format) into the already loaded entity library,
+        the entities are checked one by one by add_entities_in_bulk() and the rejected entities are saved in self.rejected_entities;
+        csv and tsv files are read row by row and added in chunks of chunk_size entities,
+        so the entities of the chunks before a format error in the file stay in the library
 
         source_path:
             uri or filepath in local system to source, from which entities should be added to library
@@ -168,10 +333,15 @@ class EntityLibrary:
             source setting for used FileReader, can be 'web' or 'local'
         source_type:
             should be None; only when source_path or file.name doesnt deliver a correct file extension,
-            then source_type should be '.json' or '.csv' for clarification
+            then source_type should be '.json', '.csv' or '.tsv' for clarification
         file:
             should be None; only when a file is already loaded, it can be passed to file parameter
+        csv_delimiter:
+            character, which delimits the fields in a csv file
+        chunk_size:
+            number of rows of a csv or tsv file, which are added to the library at once
         """
+        self.rejected_entities = []
         if file is not None:
             file_extension = None
             if source_type is None:
@@ -187,10 +357,23 @@ class EntityLibrary:
             )
             file_load_method = fr.loadfile_types.get(source_type or file_extension)
         try:
-            if file_load_method == ".csv":
-                result = getattr(fr, file_load_method)(delimiting_character=csv_delimiter)
+            if file_load_method == "loadfile_csv":
+                result = fr.iterrows_csv(delimiting_character=csv_delimiter)
+            elif file_load_method == "loadfile_tsv":
+                result = fr.iterrows_tsv()
+            elif file_load_method == "loadfile_json":
+                result = fr.loadfile_json()
+                if type(result) != list:
+                    print(
+                        "Could not add entities to entity library, data does not fulfill the structure requirements. See documentation for requirement list."
+                    ) if self.show_printmessages else None
+                    return "Could not add entities to entity library, data does not fulfill the structure requirements. See documentation for requirement list."
             else:
-                result = getattr(fr, file_load_method)()
+                print(
+                    f"EntityLibrary add_entities_from_file() error: could not import new data from {source_path} to entity library, unsupported file type"
+                ) if self.show_printmessages == True else None
+                return None
+            added_entities_amount, rejected_entities = self.add_entities_in_bulk(result, chunk_size)
         except FileNotFound:
             print(
                 f"EntityLibrary import_data_from_file_to_library() error: could not import new data from {source_path} to entity library, file not found"
@@ -206,8 +389,9 @@ class EntityLibrary:
                 f"EntityLibrary import_data_from_file_to_library() error: could not import new data from {source_path} to entity library, missing input parameter"
             ) if self.show_printmessages == True else None
             return None
-        result = self.add_entities(result)
-        return result
+        if added_entities_amount == 0:
+            return "None of the entities were added to entity library due to structure or redundancy issues."
+        return added_entities_amount, len(rejected_entities)
 
     def add_entities(
         self,
@@ -226,24 +410,16 @@ class EntityLibrary:
             ) if self.show_printmessages else None
             return f"Could not add entities to entity library, data does not fulfill the structure requirements. See documentation for requirement list."
         # check for redundancy
-        from_data_removed_entities = []
-        for entity in reversed(data):
-            redundancy_check_cache = Cache(data=self.data)
-            redundancy_check_result = redundancy_check_cache.check_for_redundancy(
-                "EntityLibrary", entity["wikidata_id"], entity["gnd_id"]
-            )
-            if any(redundancy_check_result):
-                from_data_removed_entities.append(entity)
-                data.remove(entity)
-        from_data_removed_entities_amount = len(from_data_removed_entities)
+        added_entities, rejected_entities = self._add_valid_entities(data, check_structure=False)
+        data[:] = added_entities
+        from_data_removed_entities_amount = len(rejected_entities)
         if from_data_removed_entities_amount > 0:
             print(
                 f"The following {from_data_removed_entities_amount} entity/ies (from {entity_amount_before_filtering}) could not be added to entity library due to redundancy issues:"
             ) if self.show_printmessages == True else None
-            print(from_data_removed_entities) if self.show_printmessages == True else None
+            print([entity for _, entity, _ in rejected_entities]) if self.show_printmessages == True else None
         data_amount_after_filtering = len(data)
         if data_amount_after_filtering > 0:
-            self.data.extend(data)
             print(
                 f"{data_amount_after_filtering} entity/ies has/have been added to entity library."
             ) if self.show_printmessages == True else None
@@ -254,8 +430,95 @@ class EntityLibrary:
             ) if self.show_printmessages == True else None
             return f"None of the entities were added to entity library due to redundancy issues."
 
-    def save_library(self) -> Union[bool, None]:
-        """used to save current library data to the local json file with filepath self.data_file"""
+    def add_entities_in_bulk(
+        self, data: Iterable[dict], chunk_size: int = 10000
+    ) -> Tuple[int, List[Tuple[int, dict, str]]]:
+        """method to import many entities at once, e.g. from a file:
+        in contrast to add_entities() every entity of data is checked on its own in a single pass,
+        entities with a wrong structure or with a wikidata_id or gnd_id, which is already assigned to an entity
+        in the library or to a previous entity of data, are rejected and the remaining entities are added;
+        data can be a generator (see FileReader.iterrows_csv()), which is consumed in chunks of chunk_size entities;
+        returns the number of added entities and a list of the rejected entities as tuples
+        of their position in data, the entity and the reason of the rejection"""
+        self.rejected_entities = []
+        batch_ids = {"wikidata_id": {}, "gnd_id": {}}
+        added_entities_amount = 0
+        data_iterator = iter(data)
+        first_position = 0
+        while True:
+            chunk = list(itertools.islice(data_iterator, chunk_size))
+            if len(chunk) == 0:
+                break
+            added_entities, rejected_entities = self._add_valid_entities(chunk, True, first_position, batch_ids)
+            added_entities_amount += len(added_entities)
+            self.rejected_entities.extend(rejected_entities)
+            first_position += len(chunk)
+            print(
+                f"EntityLibrary add_entities_in_bulk() status: {first_position} entities checked, {added_entities_amount} added."
+            ) if self.show_printmessages else None
+        if len(self.rejected_entities) > 0 and self.show_printmessages:
+            print(f"The following {len(self.rejected_entities)} entity/ies could not be added to entity library:")
+            for position, entity, reason in self.rejected_entities:
+                print(f"entity {position + 1} ({reason}): {entity}")
+        print(
+            f"{added_entities_amount} entity/ies has/have been added to entity library."
+        ) if self.show_printmessages == True else None
+        return added_entities_amount, self.rejected_entities
+
+    def _add_valid_entities(
+        self,
+        data: List[dict],
+        check_structure: bool = True,
+        first_position: int = 0,
+        batch_ids: Union[Dict[str, Dict[str, int]], None] = None,
+    ) -> Tuple[List[dict], List[Tuple[int, dict, str]]]:
+        # adds the entities of data, which pass the structure check and are not redundant to the library
+        # or to a previous entity of data, to self.data and the indexes; returns the added and the rejected entities;
+        # batch_ids contains the positions of the ids of the accepted entities of previous chunks of the data
+        redundancy_check_cache = self.get_redundancy_check_cache()
+        if batch_ids is None:
+            batch_ids = {"wikidata_id": {}, "gnd_id": {}}
+        added_entities = []
+        rejected_entities = []
+        for position, entity in enumerate(data, first_position):
+            reason = Cache.get_entity_structure_error(entity) if check_structure else None
+            if reason is None:
+                redundancy_check_result = redundancy_check_cache.check_for_redundancy(
+                    "EntityLibrary", entity["wikidata_id"], entity["gnd_id"]
+                )
+                for id_key, id_is_redundant in zip(["wikidata_id", "gnd_id"], redundancy_check_result):
+                    id_value = entity[id_key]
+                    if id_value in batch_ids[id_key]:
+                        reason = f"{id_key} {id_value} is already assigned to entity {batch_ids[id_key][id_value] + 1}"
+                        break
+                    if id_is_redundant:
+                        reason = f"{id_key} {id_value} is already assigned to an entity in entity library"
+                        break
+            if reason is not None:
+                rejected_entities.append((position, entity, reason))
+                continue
+            for id_key in ["wikidata_id", "gnd_id"]:
+                if entity[id_key] != "":
+                    batch_ids[id_key][entity[id_key]] = position
+            added_entities.append(entity)
+        if len(added_entities) > 0:
+            self.data.extend(added_entities)
+            self._record_change({"op": "add", "entities": added_entities})
+            redundancy_check_cache.index_added_entities(added_entities)
+            if self._name_index is not None and len(self._name_index) + len(added_entities) == len(self.data):
+                self._name_index.add_entities(added_entities)
+        return added_entities, rejected_entities
+
+    def save_library(self, compact: bool = False) -> Union[bool, None]:
+        """used to save current library data to the local json file with filepath self.data_file
+
+        if use_journal is True and the loaded data list has only been changed by add_entities(), add_entities_in_bulk()
+        and update_entity(), the changes are appended to the journal of self.data_file instead of rewriting the file;
+        the file is rewritten and the journal is cleared (compaction), if compact is True, if self.data has been replaced
+        or if the journal has grown too large (see EntityLibraryJournal.needs_compaction()),
+        the previous file is kept as backup with the additional extension .bak;
+        entities changed in another way (e.g. directly in self.data) are only saved with compact=True;
+        tools, which read self.data_file directly, miss the journaled changes until the next compaction"""
         if self.data_file is None:
             print("EntityLibrary save_library() internal error: data_file parameter not defined")
             return False
@@ -264,14 +527,30 @@ class EntityLibrary:
             print("EntityLibrary save_library() internal error: data parameter not defined")
             return False
             # raise MissingDefinition("data", "EntityLibrary", "save_library()")
+        journal = EntityLibraryJournal(self.data_file)
+        if (
+            self.use_journal
+            and compact == False
+            and self.data is self._saved_data
+            and os.path.isfile(self.data_file)
+            and journal.needs_compaction() == False
+        ):
+            if len(self._unsaved_journal_records) > 0:
+                journal.append(self._unsaved_journal_records)
+                self._unsaved_journal_records = []
+            return True
         fw = FileWriter(data=self.data, filepath=self.data_file, show_printmessages=self.show_printmessages)
         try:
-            result = fw.writefile_json("replace", "EntityLibrary")
+            result = fw.writefile_json("replace", "EntityLibrary", backup=True)
         except MissingDefinition:
             print(
                 "EntityLibrary save_library(): could not write file due to missing definition of usecase parameter"
             ) if self.show_printmessages == True else None
             result = None
+        if result == True:
+            journal.clear()
+            self._saved_data = self.data
+            self._unsaved_journal_records = []
         return result
 
     def export_library(
@@ -350,24 +629,21 @@ class EntityLibrary:
                 return ([], 0, "entity ignored due to try_to_identify_entities_without_id_values parameter setting")
             else:
                 input_tuple = (input_entity["name"], input_entity["type"])
-                wikidata_connector = WikidataConnector(
-                    input=[input_tuple], wikidata_web_api_limit=wikidata_query_match_limit
-                )
+                wikidata_connector = self.get_wikidata_connector([input_tuple], wikidata_query_match_limit)
                 if input_entity["type"] not in list(wikidata_connector.link_suggestion_categories.keys()):
                     return ([], 0, "entity ignored due to missing or incorrect 'type' value")
                 wikidata_connector_result = wikidata_connector.get_wikidata_search_results()
                 if wikidata_connector_result[input_tuple][0] > 0:
                     entity_list_in_query_wikidata_result = []
+                    wikidata_entity_data = self.get_data_of_wikidata_entities(
+                        [entity.get("id", "") for entity in wikidata_connector_result[input_tuple][1]["search"]]
+                    )
                     for entity in wikidata_connector_result[input_tuple][1]["search"]:
-                        _gnd_retrieve_attempt_result = self.get_gnd_id_of_wikidata_entity(entity["id"])
-                        _gnd_id_to_add = (
-                            _gnd_retrieve_attempt_result[0]["o"]["value"]
-                            if len(_gnd_retrieve_attempt_result) > 0
-                            else ""
-                        )
-                        _furtherNames_to_add = self.get_further_names_of_wikidata_entity(entity.get("id", ""))
+                        _entity_data = wikidata_entity_data[entity.get("id", "")]
+                        _gnd_id_to_add = _entity_data["gnd_id"]
+                        _furtherNames_to_add = _entity_data["furtherNames"]
                         _furtherIds_to_add = (
-                            self.get_further_ids_of_wikidata_entity(entity.get("id", ""))
+                            _entity_data["furtherIds"]
                             # HIER WEITER
                             # if replace_furtherIds_information
                             # else self.get_missing_further_ids_of_wikidata_entity(entity.get("id", ""))
@@ -406,23 +682,21 @@ class EntityLibrary:
                 else:
                     return ([], 0, "no matching entities found in wikidata query")
         if (input_entity["wikidata_id"] != "") and (input_entity["gnd_id"] == ""):
-            result_of_gnd_id_retrieval_attempt = self.get_gnd_id_of_wikidata_entity(input_entity["wikidata_id"])
-            gnd_id_of_first_suggested_entity = (
-                result_of_gnd_id_retrieval_attempt[0]["o"]["value"]
-                if len(result_of_gnd_id_retrieval_attempt) > 0
-                else ""
-            )
+            wikidata_entity_data = self.get_data_of_wikidata_entities([input_entity["wikidata_id"]])[
+                input_entity["wikidata_id"]
+            ]
+            gnd_id_of_first_suggested_entity = wikidata_entity_data["gnd_id"]
             if gnd_id_of_first_suggested_entity != "":
                 returned_entity = input_entity.copy()
                 returned_entity["gnd_id"] = gnd_id_of_first_suggested_entity
                 # HIER WEITER
                 # returned_entity["furtherIds"] = self.get_further_ids_of_wikidata_entity(input_entity["wikidata_id"]) if replace_furtherIds_information else self.get_missing_further_ids_of_wikidata_entity(input_entity["wikidata_id"])
-                returned_entity["furtherIds"] = self.get_further_ids_of_wikidata_entity(input_entity["wikidata_id"])
+                returned_entity["furtherIds"] = wikidata_entity_data["furtherIds"]
                 return ([returned_entity], 0, f"gnd_id {gnd_id_of_first_suggested_entity} determined")
             else:
                 return ([], 0, "no id data could be retrieved for entity")
         if (input_entity["wikidata_id"] == "") and (input_entity["gnd_id"] != ""):
-            gnd_connector = GndConnector(input_entity["gnd_id"])
+            gnd_connector = self.get_gnd_connector(input_entity["gnd_id"])
             gnd_data = gnd_connector.get_gnd_data(["sameAs"])
             gnd_connector_sameAs_id_key = list(
                 gnd_connector.apilist[gnd_connector.apiindex]["baseAliases"]["sameAs"][1][0].keys()
@@ -449,6 +723,8 @@ class EntityLibrary:
     ) -> Union[List[str], list]:
         """NOT IN USE AT THE MOMENT"""
         return_messages = []
+        # entities are changed in place, so that the next save_library() call has to rewrite the whole file
+        self._saved_data = None
         for entity in self.data:
             entity_unchanged = entity.copy()
             # add missing gnd_id or wikidata_id value
@@ -460,9 +736,7 @@ class EntityLibrary:
                     continue
                 else:
                     input_tuple = (entity["name"], entity["type"])
-                    wikidata_connector = WikidataConnector(
-                        input=[input_tuple], wikidata_web_api_limit=wikidata_query_match_limit
-                    )
+                    wikidata_connector = self.get_wikidata_connector([input_tuple], wikidata_query_match_limit)
                     wikidata_connector_result = wikidata_connector.get_wikidata_search_results()
                     if wikidata_connector_result[input_tuple][0] > 0:
                         wikidata_id_of_first_suggested_entity = wikidata_connector_result[input_tuple][1]["search"][0][
@@ -498,7 +772,7 @@ class EntityLibrary:
                     return_messages.append(f"no id data could be retrieved for {entity_unchanged}")
                 continue
             if (entity["wikidata_id"] == "") and (entity["gnd_id"] != ""):
-                gnd_connector = GndConnector(entity["gnd_id"])
+                gnd_connector = self.get_gnd_connector(entity["gnd_id"])
                 gnd_data = gnd_connector.get_gnd_data(["sameAs"])
                 gnd_connector_sameAs_id_key = list(
                     gnd_connector.apilist[gnd_connector.apiindex]["baseAliases"]["sameAs"][1][0].keys()
@@ -533,13 +807,7 @@ class EntityLibrary:
                 wd:%s wdt:P227 ?o .
             }
             """
-        endpoint_url = "https://query.wikidata.org/sparql"
-        user_agent = "NEISS TEI Entity Enricher v.{}".format(__version__)
-        sparql = SPARQLWrapper(endpoint=endpoint_url, agent=user_agent)
-        sparql.setQuery(query % wikidata_id)
-        sparql.setReturnFormat(JSON)
-        result = sparql.query().convert()
-        return result["results"]["bindings"]
+        return self._query_wikidata_sparql_endpoint(query % wikidata_id)
         # if there is no result, the returned value is an empty list
         # if there is a result, it can be retrieved by returnvalue[0]["o"]["value"]
 
@@ -559,17 +827,68 @@ class EntityLibrary:
                 wd:%s ?p ?label .
             }
         """
-        endpoint_url = "https://query.wikidata.org/sparql"
-        user_agent = "NEISS TEI Entity Enricher v.{}".format(__version__)
-        sparql = SPARQLWrapper(endpoint=endpoint_url, agent=user_agent)
-        sparql.setQuery(alt_labels_query % wikidata_id)
-        sparql.setReturnFormat(JSON)
-        query_result = sparql.query().convert()
+        query_result = self._query_wikidata_sparql_endpoint(alt_labels_query % wikidata_id)
         # return empty list, if no result is returned by sparql query
-        if len(query_result["results"]["bindings"]) == 0:
+        if len(query_result) == 0:
             return []
         # return a list with distinct values: for this, the list is transformed to a set and back to new list without value doublets
-        return list(set([item["label"]["value"] for item in query_result["results"]["bindings"]]))
+        return list(set([item["label"]["value"] for item in query_result]))
+
+    def get_data_of_wikidata_entities(self, wikidata_ids: List[str], chunk_size: int = 50) -> Dict[str, dict]:
+        """method to get the gnd id, the further names and the further ids of several wikidata entities at once,
+        delivers the results of get_gnd_id_of_wikidata_entity(), get_further_names_of_wikidata_entity() and
+        get_further_ids_of_wikidata_entity() with one sparql query for every chunk_size entities instead of
+        2 + len(self.furtherIds_config) queries for every entity;
+        returns a dict with the wikidata ids as keys and dicts with the keys gnd_id, furtherNames and furtherIds as values
+        (ids, which are empty or no wikidata item ids, get empty values)
+
+        output example for ['Q64']: {"Q64": {"gnd_id": "2004272-3", "furtherNames": ["Berlin", "Berlin, Germany", ...], "furtherIds": {"geonames.com": ["2950159", "2950157", "6547383", "6547539"], "viaf.org": ["122530980"]}}}
+        """
+        entity_data_query = """
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+            PREFIX wd: <http://www.wikidata.org/entity/>
+            PREFIX wdt: <http://www.wikidata.org/prop/direct/>
+
+            SELECT ?item ?field ?value WHERE {
+                VALUES ?item { %s }
+                VALUES (?field ?p) { %s }
+                ?item ?p ?value .
+            }
+        """
+        # the fields are numbered: 0 = gnd id, 1 = further names, 2 and more = keys of self.furtherIds_config
+        further_ids_keys = list(self.furtherIds_config)
+        field_values = ["(0 wdt:P227)", "(1 rdfs:label)", "(1 skos:altLabel)"] + [
+            f"({index + 2} {self.furtherIds_config[key][0]})" for index, key in enumerate(further_ids_keys)
+        ]
+        result_dict = {
+            wikidata_id: {"gnd_id": "", "furtherNames": [], "furtherIds": {key: [] for key in further_ids_keys}}
+            for wikidata_id in wikidata_ids
+        }
+        query_ids = [wikidata_id for wikidata_id in result_dict if re.fullmatch(r"Q\d+", wikidata_id)]
+        for chunk_start in range(0, len(query_ids), chunk_size):
+            chunk_ids = query_ids[chunk_start : chunk_start + chunk_size]
+            bindings = self._query_wikidata_sparql_endpoint(
+                entity_data_query % (" ".join(f"wd:{wikidata_id}" for wikidata_id in chunk_ids), " ".join(field_values))
+            )
+            further_names = {wikidata_id: set() for wikidata_id in chunk_ids}
+            for binding in bindings:
+                wikidata_id = binding["item"]["value"].rsplit("/", 1)[-1]
+                field = int(binding["field"]["value"])
+                value = binding["value"]["value"]
+                if field == 0:
+                    if result_dict[wikidata_id]["gnd_id"] == "":
+                        result_dict[wikidata_id]["gnd_id"] = value
+                elif field == 1:
+                    further_names[wikidata_id].add(value)
+                else:
+                    result_dict[wikidata_id]["furtherIds"][further_ids_keys[field - 2]].append(value)
+            for wikidata_id in chunk_ids:
+                result_dict[wikidata_id]["furtherNames"] = list(further_names[wikidata_id])
+        return result_dict
+
+    def _query_wikidata_sparql_endpoint(self, query: str) -> List[dict]:
+        return get_sparql_client().select(query)
 
     def get_further_names_of_gnd_entity(self, gnd_id: str = None) -> List[str]:
         """method to get further names of a gnd entity,
@@ -579,7 +898,7 @@ class EntityLibrary:
         NOT IN USE AT THE MOMENT"""
         if gnd_id == "":
             return []
-        gnd_connector = GndConnector(gnd_id)
+        gnd_connector = self.get_gnd_connector(gnd_id)
         query_result = gnd_connector.get_gnd_data(["furtherNames"])
         return query_result[gnd_id]["furtherNames"]
 
@@ -604,8 +923,6 @@ class EntityLibrary:
         """
         if wikidata_id == "":
             return {}
-        endpoint_url = "https://query.wikidata.org/sparql"
-        user_agent = "NEISS TEI Entity Enricher v.{}".format(__version__)
         further_ids_query = """
             PREFIX wd: <http://www.wikidata.org/entity/>
             PREFIX wdt: <http://www.wikidata.org/prop/direct/>
@@ -617,11 +934,10 @@ class EntityLibrary:
         """
         result_dict = {key: [] for key in self.furtherIds_config}
         for key in self.furtherIds_config:
-            sparql = SPARQLWrapper(endpoint=endpoint_url, agent=user_agent)
-            sparql.setQuery(further_ids_query % (self.furtherIds_config[key][0], wikidata_id))
-            sparql.setReturnFormat(JSON)
-            query_result = sparql.query().convert()
-            for query_result_item in query_result["results"]["bindings"]:
+            query_result = self._query_wikidata_sparql_endpoint(
+                further_ids_query % (self.furtherIds_config[key][0], wikidata_id)
+            )
+            for query_result_item in query_result:
                 result_dict[key].append(query_result_item["label"]["value"])
         return result_dict
 
@@ -636,7 +952,7 @@ class EntityLibrary:
         NOT IN USE AT THE MOMENT"""
         if gnd_id == "":
             return {}
-        gnd_connector = GndConnector(gnd_id)
+        gnd_connector = self.get_gnd_connector(gnd_id)
         # ATTENTION: NEXT LINE JUST FOR TESTING PURPOSE
         # gnd_connector.apiindex = 1
         gnd_connector_sameAs_id_key = list(
@@ -660,3 +976,4 @@ class EntityLibrary:
         self.show_printmessages = True
         self.data_file = None
         self.data = None
+        self._saved_data = None
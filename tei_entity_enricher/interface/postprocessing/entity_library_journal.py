@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import os
+from typing import List
+
+from tei_entity_enricher.util import json_io
+
+logger = logging.getLogger(__name__)
+
+
+class EntityLibraryJournal:
+    def __init__(self, data_file: str, compaction_ratio: float = 0.5, min_compaction_size: int = 1024 * 1024) -> None:
+        """append-only journal of the changes of an entity library, which is saved as a json lines file next to
+        the library json file, so that saving an added or updated entity only appends a line instead of rewriting
+        the whole library; the journal is replayed on loading and cleared after a complete rewrite of the library file
+        (compaction)
+
+        data_file:
+            path to the json file of the entity library
+        compaction_ratio:
+            the library should be compacted, if the journal is larger than this fraction of the library file
+        min_compaction_size:
+            the library should not be compacted, before the journal has this size in bytes
+        journal_file:
+            path to the journal file (data_file with the additional extension .journal)
+
+        the first record of the journal stamps it with the size and the sha256 hash of the library file it applies to;
+        a journal, whose stamp does not match the library file (e.g. because a compaction has been interrupted after
+        rewriting the library file, but before clearing the journal), is not replayed, but moved aside to
+        journal_file with the additional extension .old;
+        tools, which read the library file directly, miss the journaled changes until the next compaction
+
+        records of the journal:
+            {"op": "stamp", "size": 1234, "sha256": "..."}: the journal applies to the library file with this size and hash
+            {"op": "add", "entities": [...]}: the entities have been appended to the library
+            {"op": "update", "position": 3, "values": {...}}: the entity on position has been updated with values"""
+        self.data_file: str = data_file
+        self.journal_file: str = data_file + ".journal"
+        self.compaction_ratio: float = compaction_ratio
+        self.min_compaction_size: int = min_compaction_size
+
+    def get_stamp(self) -> dict:
+        """returns the stamp record of the current library file"""
+        file_hash = hashlib.sha256()
+        with open(self.data_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+        return {"op": "stamp", "size": os.path.getsize(self.data_file), "sha256": file_hash.hexdigest()}
+
+    def append(self, records: List[dict]) -> None:
+        """appends records to the journal and flushes them to disk, a new journal is stamped with the current library
+        file first"""
+        with open(self.journal_file, "a+b") as journal:
+            if journal.tell() == 0:
+                records = [self.get_stamp()] + records
+            # an incomplete last line of an interrupted append is terminated, so that it does not spoil the new records
+            else:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    journal.write(b"\n")
+            for record in records:
+                json_io.dump(record, journal)
+                journal.write(b"\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def replay(self, data: list) -> int:
+        """applies the records of the journal to data (the loaded library) by reading the journal line by line,
+        returns the number of applied records; incomplete lines of interrupted appends are ignored, a journal with a
+        missing or mismatching stamp is moved aside without applying it"""
+        applied_records = 0
+        stamp_matches = False
+        try:
+            with open(self.journal_file, encoding="utf-8") as journal:
+                for line in journal:
+                    if line.strip() == "":
+                        continue
+                    try:
+                        record = json_io.loads(line)
+                    except ValueError:
+                        logger.warning(f"Ignored incomplete record in entity library journal {self.journal_file}")
+                        continue
+                    if stamp_matches == False:
+                        # the first complete record has to be the stamp of the current library file
+                        stamp_matches = record == self.get_stamp()
+                        if stamp_matches == False:
+                            break
+                        continue
+                    try:
+                        if record["op"] == "add":
+                            data.extend(record["entities"])
+                        elif record["op"] == "update":
+                            data[record["position"]].update(record["values"])
+                    except (KeyError, IndexError, TypeError, AttributeError):
+                        logger.warning(f"Ignored invalid record in entity library journal {self.journal_file}")
+                        continue
+                    applied_records += 1
+        except FileNotFoundError:
+            return applied_records
+        if stamp_matches == False:
+            # a new stamped journal is started by the next append()
+            logger.warning(
+                f"Entity library journal {self.journal_file} does not belong to the current library file, "
+                f"moved it to {self.journal_file}.old"
+            )
+            os.replace(self.journal_file, self.journal_file + ".old")
+        return applied_records
+
+    def get_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        """returns, whether the journal has grown so much, that the library file should be rewritten"""
+        journal_size = self.get_size()
+        if journal_size < self.min_compaction_size:
+            return False
+        try:
+            data_file_size = os.path.getsize(self.data_file)
+        except OSError:
+            return True
+        return journal_size > self.compaction_ratio * data_file_size
+
+    def clear(self) -> None:
+        """removes the journal, after the library file has been rewritten"""
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
@@ -1,5 +1,7 @@
 import os
 from typing import Union, List
+from tei_entity_enricher.interface.postprocessing.connectivity_state import ConnectivityState, get_connectivity_state
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor, get_http_executor
 from tei_entity_enricher.interface.postprocessing.io import FileReader, FileWriter
 from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary
 from tei_entity_enricher.util.exceptions import FileNotFound
@@ -12,6 +14,8 @@ class GndConnector:
         apiindex: int = 0,
         check_connectivity: bool = True,
         show_printmessages: bool = True,
+        http_executor: Union[HttpExecutor, None] = None,
+        connectivity_state: Union[ConnectivityState, None] = None,
     ) -> None:
         """establishes connection to api, from which norm data for entities of Deutsche Nationalbibliothek´s database is retrieved,
         loaded data can be passed to an instance of Cache class for further processing or FileWriter class to save it
@@ -24,6 +28,10 @@ class GndConnector:
             execute connectivity check in __init__() or not (see connectivitycheck_loop())
         show_printmessages:
             show class internal printmessages on runtime or not
+        http_executor:
+            executes the requests of get_gnd_data() for lists of gnd ids concurrently (default: shared instance of get_http_executor())
+        connectivity_state:
+            results of recent connectivity checks, which are reused by connectivitycheck_loop() (default: shared instance of get_connectivity_state())
         apilist_filepath:
             path to apilist config file
         apilist:
@@ -36,6 +44,10 @@ class GndConnector:
         self.show_printmessages: bool = show_printmessages
         self.gnd_id: Union[str, List[str], None] = gnd_id
         self.apiindex: int = apiindex
+        self.http_executor: HttpExecutor = http_executor if http_executor is not None else get_http_executor()
+        self.connectivity_state: ConnectivityState = (
+            connectivity_state if connectivity_state is not None else get_connectivity_state()
+        )
         self.apilist_filepath: str = os.path.join(local_save_path, "config", "postprocessing", "gnd_apilist.json")
         try:
             self.apilist: Union[dict, None] = FileReader(
@@ -121,14 +133,15 @@ class GndConnector:
 
     def connectivitycheck_single(self, index_to_test: int, gnd_id_to_test: str = "118540238") -> bool:
         """auxiliary method of connectivitycheck_loop(),
-        checks a single api`s (from self.apilist) response status code and checks if response data type is json,
-        preset gnd_id_to_test value refers to Goethe"""
+        checks a single api`s (from self.apilist) response status code and checks if response data type is json
+        (bypassing the response cache), preset gnd_id_to_test value refers to Goethe"""
         try:
             result: dict = FileReader(
                 filepath=self.apilist[index_to_test]["baseUrl"].format(gnd_id_to_test),
                 origin="web",
                 internal_call=True,
                 show_printmessages=self.show_printmessages,
+                use_cache=False,
             ).loadfile_json()
         except:
             return False
@@ -138,10 +151,25 @@ class GndConnector:
 
     def connectivitycheck_loop(self) -> int:
         """recursive connectivity check, checking every single api in self.apilist (ascending)
-        and setting self.apiindex to the value of those api, which is first to pass the check successfully.
+        and setting self.apiindex to the value of those api, which is first to pass the check successfully;
+        the result is saved in self.connectivity_state and reused by all connectors until it expires.
         returns 0 or -1 for unittest purposes"""
         if self.check_connectivity == False:
             self.check_connectivity == True
+        if len(self.remaining_apis_to_check) == len(self.apilist):
+            cached_apiindex = self.connectivity_state.get(self._get_connectivity_state_key())
+            if cached_apiindex is not None:
+                self.connection_established = cached_apiindex >= 0
+                if self.connection_established:
+                    self.apiindex = cached_apiindex
+                    print(
+                        f"GndConnector: connectivity check passed recently, using {self.apilist[self.apiindex]['name']} api."
+                    ) if self.show_printmessages else None
+                    return 0
+                print(
+                    "GndConnector connectivity check error: none of the listed apis has been responding as expected recently."
+                ) if self.show_printmessages else None
+                return -1
         if len(self.remaining_apis_to_check) > 0:
             if self.connectivitycheck_single(self.remaining_apis_to_check[0]) == True:
                 print(
@@ -150,19 +178,26 @@ class GndConnector:
                 self.apiindex = self.remaining_apis_to_check[0]
                 self.remaining_apis_to_check = [i for i, _ in enumerate(self.apilist)]
                 self.connection_established = True
+                self.connectivity_state.set(self._get_connectivity_state_key(), self.apiindex)
                 return 0
             else:
                 print(
                     f"GndConnector connectivity check: {self.apilist[self.remaining_apis_to_check[0]]['name']} api is currently not responding as expected. checking for alternatives..."
                 ) if self.show_printmessages else None
                 self.remaining_apis_to_check.remove(self.remaining_apis_to_check[0])
-                self.connectivitycheck_loop()
+                return self.connectivitycheck_loop()
         else:
             print(
                 "GndConnector connectivity check error: none of the listed apis is responding as expected."
             ) if self.show_printmessages else None
+            self.remaining_apis_to_check = [i for i, _ in enumerate(self.apilist)]
+            self.connection_established = False
+            self.connectivity_state.set(self._get_connectivity_state_key(), -1, passed=False)
             return -1
 
+    def _get_connectivity_state_key(self) -> tuple:
+        return ("gnd", tuple(api["baseUrl"] for api in self.apilist))
+
     def print_complete_url(self, index: int = 0) -> int:
         """print baseUrl string of the currently selected api defined in self.apilist,
         formatted with a gnd id number of self.gnd_id (list or str) selected by index value.
@@ -230,10 +265,13 @@ class GndConnector:
         if type(self.gnd_id) == str:
             _temp_data = {}
             try:
-                filereader = FileReader(
-                    filepath=self.return_complete_url(), origin="web", internal_call=True, show_printmessages=False
-                )
-                _temp_data = filereader.loadfile_json()
+                _temp_data = FileReader(
+                    filepath=self.return_complete_url(),
+                    origin="web",
+                    internal_call=True,
+                    show_printmessages=False,
+                    http_executor=self.http_executor,
+                ).loadfile_json()
             except:
                 print(
                     "GndConnector connectivity error in get_gnd_data() method: could not load resource from api as expected."
@@ -251,20 +289,29 @@ class GndConnector:
                 ) if self.show_printmessages else None
                 return None
         elif type(self.gnd_id) == list:
-            for index, gnd in enumerate(self.gnd_id):
-                _temp_data = {}
+
+            def load_gnd_data(index: int) -> Union[dict, None]:
+                # returns None, if the request failed
+                url = self.return_complete_url(index)
                 try:
-                    filereader = FileReader(
-                        filepath=self.return_complete_url(index),
+                    return FileReader(
+                        filepath=url,
                         origin="web",
                         internal_call=True,
                         show_printmessages=True,
-                    )
-                    _temp_data = filereader.loadfile_json()
+                        http_executor=self.http_executor,
+                    ).loadfile_json()
                 except:
+                    return None
+
+            for index, (gnd, _temp_data) in enumerate(
+                zip(self.gnd_id, self.http_executor.map(load_gnd_data, range(len(self.gnd_id))))
+            ):
+                if _temp_data is None:
                     print(
                         f"GndConnector get_gnd_data() status: for gnd id {index + 1} ({gnd}) of {len(self.gnd_id)} no data could be delivered by api"
                     ) if self.show_printmessages else None
+                    _temp_data = {}
                 result[gnd] = _temp_data
                 print(
                     f"GndConnector get_gnd_data() status: gnd id {index + 1} ({gnd}) of {len(self.gnd_id)} processed"
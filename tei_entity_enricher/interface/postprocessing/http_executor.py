@@ -0,0 +1,64 @@
+import contextlib
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from urllib.parse import urlparse
+
+
+class HttpExecutor:
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_requests_per_host: int = 4,
+        min_request_interval: float = 0.05,
+    ) -> None:
+        """executes the web requests of GndConnector and WikidataConnector concurrently,
+        while the requests to a single host are limited to be polite to the apis
+
+        max_workers:
+            maximum number of threads, which are used by map() (1 = sequential execution)
+        max_requests_per_host:
+            maximum number of requests, which are sent to the same host at the same time
+        min_request_interval:
+            minimum time in seconds between the starts of two requests to the same host"""
+        self.max_workers: int = max_workers
+        self.max_requests_per_host: int = max_requests_per_host
+        self.min_request_interval: float = min_request_interval
+        self._lock: threading.Lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_request_times: Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def host_slot(self, url: str) -> Iterator[None]:
+        """context manager, which has to enclose every request to url:
+        waits until less than max_requests_per_host requests to the host of url are running
+        and min_request_interval seconds have passed since the start of the last request to the host"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._host_semaphores.setdefault(host, threading.BoundedSemaphore(self.max_requests_per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_request_times.get(host, now))
+                self._next_request_times[host] = start + self.min_request_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+    def map(self, function: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """calls function for every item in up to max_workers threads and returns the results in the order of items;
+        an exception of function is raised after all calls have been finished, so function should handle
+        the errors of single items itself"""
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(function, items))
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_executor() -> HttpExecutor:
+    # shared instance, so that the limits per host apply to all connectors of the process
+    return HttpExecutor()
@@ -0,0 +1,130 @@
+import functools
+from typing import List, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tei_entity_enricher import __version__
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor, get_http_executor
+from tei_entity_enricher.interface.postprocessing.response_cache import ResponseCache, get_response_cache
+from tei_entity_enricher.util.exceptions import NotCached
+
+default_pool_size = 16
+default_retries = 3
+default_backoff_factor = 0.5
+# seconds to connect and to wait for data
+default_timeout = (10, 60)
+
+wikidata_sparql_endpoint = "https://query.wikidata.org/sparql"
+sparql_user_agent = "NEISS TEI Entity Enricher v.{}".format(__version__)
+
+
+def create_session(
+    pool_size: int = default_pool_size,
+    retries: int = default_retries,
+    backoff_factor: float = default_backoff_factor,
+) -> requests.Session:
+    """creates a requests.Session, which keeps up to pool_size connections per host alive
+    and retries interrupted requests and responses with the status 429, 500, 502, 503 or 504 up to retries times
+    (waiting backoff_factor * 2 ** (retry - 1) seconds or as long as a Retry-After header demands);
+    a connection, which could not be established, is only tried once more, so that a missing network fails fast"""
+    retry = Retry(
+        total=retries,
+        connect=min(retries, 1),
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST"),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_session(
+    pool_size: int = default_pool_size,
+    retries: int = default_retries,
+    backoff_factor: float = default_backoff_factor,
+) -> requests.Session:
+    # shared instance of the process, so that all web requests of the postprocessing reuse their connections
+    return create_session(pool_size, retries, backoff_factor)
+
+
+class SparqlClient:
+    def __init__(
+        self,
+        endpoint_url: str = wikidata_sparql_endpoint,
+        user_agent: str = sparql_user_agent,
+        session: Union[requests.Session, None] = None,
+        timeout: Tuple[float, float] = default_timeout,
+        max_get_length: int = 2000,
+        http_executor: Union[HttpExecutor, None] = None,
+        response_cache: Union[ResponseCache, None] = None,
+    ) -> None:
+        """sends sparql queries to endpoint_url with the shared session of get_session() (or session)
+        and returns the json results
+
+        a sparqle query to wikidata endpoint needs an agent parameter in the header to get an answer,
+        the value of the agent string can be choosen freely;
+        queries longer than max_get_length characters are sent by POST instead of GET;
+        the queries to endpoint_url are limited by http_executor (default: shared instance of get_http_executor())
+        and their results are cached in response_cache (default: shared instance of get_response_cache()),
+        if the host of endpoint_url is configured there"""
+        self.endpoint_url: str = endpoint_url
+        self.user_agent: str = user_agent
+        self.session: requests.Session = session if session is not None else get_session()
+        self.timeout: Tuple[float, float] = timeout
+        self.max_get_length: int = max_get_length
+        # the shared instances are resolved, when a query is sent
+        self.http_executor: Union[HttpExecutor, None] = http_executor
+        self.response_cache: Union[ResponseCache, None] = response_cache
+
+    def query(self, query: str, use_cache: bool = True) -> dict:
+        """returns the json result of query, raises requests.HTTPError, if the endpoint does not answer with status 200,
+        and NotCached, if the result is not cached in cache-only mode;
+        with use_cache=False the query is sent to the endpoint in any case and its result is not cached
+        (e.g. for connectivity checks)"""
+        http_executor = self.http_executor if self.http_executor is not None else get_http_executor()
+        response_cache = self.response_cache if self.response_cache is not None else get_response_cache()
+        source = response_cache.get_source(self.endpoint_url) if use_cache else None
+        cache_key = self.endpoint_url + "\n" + query
+        if source is not None:
+            result = response_cache.load(source, cache_key)
+            if result is not None:
+                return result
+            if response_cache.cache_only:
+                raise NotCached(self.endpoint_url, "SparqlClient", "query()")
+        headers = {"Accept": "application/sparql-results+json", "User-Agent": self.user_agent}
+        with http_executor.host_slot(self.endpoint_url):
+            if len(query) > self.max_get_length:
+                response = self.session.post(
+                    self.endpoint_url, data={"query": query}, headers=headers, timeout=self.timeout
+                )
+            else:
+                response = self.session.get(
+                    self.endpoint_url, params={"query": query}, headers=headers, timeout=self.timeout
+                )
+        with response:
+            response.raise_for_status()
+            result = response.json()
+        if source is not None:
+            response_cache.store(source, cache_key, result)
+        return result
+
+    def select(self, query: str, use_cache: bool = True) -> List[dict]:
+        """returns the bindings of the result of a SELECT query"""
+        return self.query(query, use_cache)["results"]["bindings"]
+
+    def ask(self, query: str, use_cache: bool = True) -> bool:
+        """returns the result of an ASK query"""
+        return self.query(query, use_cache)["boolean"]
+
+
+@functools.lru_cache(maxsize=None)
+def get_sparql_client(endpoint_url: str = wikidata_sparql_endpoint) -> SparqlClient:
+    return SparqlClient(endpoint_url)
@@ -12,6 +12,7 @@ class Identifier:
         self,
         input: Union[List[Tuple[str, str]], None] = None,
         show_printmessages: bool = True,
+        wikidata_connector: Union[WikidataConnector, None] = None,
     ) -> None:
         """delivers suggestions to which entity(ies) refers the input string(s)
 
@@ -19,6 +20,9 @@ class Identifier:
             contains a list of tuples, which themself consists of a name and a type string
         show_printmessages:
             show class internal printmessages on runtime or not
+        wikidata_connector:
+            WikidataConnector, which is reused for all queries of wikidata_query()
+            (default: a new connector without connectivity check)
         current_wikidata_query_result_data:
             buffer to save and print current wikidata_query() results
         current_suggest_result_data:
@@ -29,11 +33,15 @@ class Identifier:
         self.show_printmessages: bool = show_printmessages
         self.current_wikidata_query_result_data: Union[dict, None] = None
         self.current_suggest_result_data: Union[dict, None] = None
+        self.wikidata_connector: WikidataConnector = (
+            wikidata_connector
+            if wikidata_connector is not None
+            else WikidataConnector(check_connectivity=False, show_printmessages=False)
+        )
         self.entity_types: List[str] = self.get_entity_type_list()
 
     def get_entity_type_list(self) -> List[str]:
-        wikidata_con = WikidataConnector(check_connectivity=False, show_printmessages=False)
-        return list(wikidata_con.link_suggestion_categories.keys())
+        return list(self.wikidata_connector.link_suggestion_categories.keys())
 
     def check_entity_library(
         self, input_tuple: tuple = None, loaded_library: EntityLibrary = None, query_by_type: bool = True
@@ -45,40 +53,8 @@ class Identifier:
         searchstring_name = input_tuple[0]
         searchstring_type = input_tuple[1]
         if query_by_type == True:
-            # result_list = list(
-            #     filter(
-            #         lambda item: (item["type"] == searchstring_type)
-            #         and ((item["name"] == searchstring_name) or (searchstring_name in item["furtherNames"])),
-            #         loaded_library.data,
-            #     )
-            # )
-            result_list = []
-            for entity in loaded_library.data:
-                if entity["type"] == searchstring_type:
-                    if searchstring_name.lower() in entity["name"].lower():
-                        result_list.append(entity)
-                        continue
-                    for furtherName in entity["furtherNames"]:
-                        if searchstring_name.lower() in furtherName.lower():
-                            result_list.append(entity)
-                            continue
-        else:
-            # result_list = list(
-            #     filter(
-            #         lambda item: (item["name"] == searchstring_name) or (searchstring_name in item["furtherNames"]),
-            #         loaded_library.data,
-            #     )
-            # )
-            result_list = []
-            for entity in loaded_library.data:
-                if searchstring_name.lower() in entity["name"].lower():
-                    result_list.append(entity)
-                    continue
-                for furtherName in entity["furtherNames"]:
-                    if searchstring_name.lower() in furtherName.lower():
-                        result_list.append(entity)
-                        continue
-        return result_list
+            return loaded_library.find_entities(searchstring_name, searchstring_type)
+        return loaded_library.find_entities(searchstring_name)
 
     def check_query_results_with_wikidata_ids_of_entity_library(
         self, loaded_library: EntityLibrary = None, library_files: List[str] = None
@@ -108,6 +84,40 @@ class Identifier:
                     break
         return result
 
+    def get_wikidata_entities(
+        self, query_wikidata_result: Dict[Tuple[str, str], list]
+    ) -> Dict[Tuple[str, str], List[dict]]:
+        """transforms the search hits of a wikidata query result (see suggest()) to lists of entity dicts
+        (with the origin value "wd"), the gnd ids, furtherNames and furtherIds of all hits are retrieved
+        together with EntityLibrary.get_data_of_wikidata_entities()"""
+        _temp_el = EntityLibrary(show_printmessages=False)
+        wikidata_entity_data = _temp_el.get_data_of_wikidata_entities(
+            [
+                subkey.get("id", "")
+                for key in query_wikidata_result
+                for subkey in query_wikidata_result[key][1]["search"]
+            ]
+        )
+        output_dict = {}
+        for key in query_wikidata_result:
+            entity_list_in_query_wikidata_result = []
+            for subkey in query_wikidata_result[key][1]["search"]:
+                _entity_data = wikidata_entity_data[subkey.get("id", "")]
+                entity_list_in_query_wikidata_result.append(
+                    {
+                        "name": subkey.get("label", f"No name delivered, search pattern was: {key[0]}"),
+                        "furtherNames": list(_entity_data["furtherNames"]),
+                        "type": key[1],
+                        "description": subkey.get("description", "No description delivered"),
+                        "wikidata_id": subkey.get("id", ""),
+                        "gnd_id": _entity_data["gnd_id"],
+                        "furtherIds": {database: list(ids) for database, ids in _entity_data["furtherIds"].items()},
+                        "origin": "wd",
+                    }
+                )
+            output_dict[key] = entity_list_in_query_wikidata_result
+        return output_dict
+
     # todo: funktionen schreiben: neuaufnahme von entitäten in die library, finale empfehlungen ausgeben
 
     def suggest(
@@ -198,32 +208,7 @@ class Identifier:
             if entity_library_has_data:
                 if wikidata_result_has_data:
                     # if both, entity library check and wikidata check, suggested any entities
-                    wikidata_output_dict = {}
-                    _temp_el = EntityLibrary(show_printmessages=False)
-                    for key in query_wikidata_result:
-                        entity_list_in_query_wikidata_result = []
-                        for subkey in query_wikidata_result[key][1]["search"]:
-                            _gnd_retrieve_attempt_result = _temp_el.get_gnd_id_of_wikidata_entity(subkey["id"])
-                            _gnd_id_to_add = (
-                                _gnd_retrieve_attempt_result[0]["o"]["value"]
-                                if len(_gnd_retrieve_attempt_result) > 0
-                                else ""
-                            )
-                            _furtherNames_to_add = _temp_el.get_further_names_of_wikidata_entity(subkey.get("id", ""))
-                            _furtherIds_to_add = _temp_el.get_further_ids_of_wikidata_entity(subkey.get("id", ""))
-                            entity_list_in_query_wikidata_result.append(
-                                {
-                                    "name": subkey.get("label", f"No name delivered, search pattern was: {key[0]}"),
-                                    "furtherNames": _furtherNames_to_add,
-                                    "type": key[1],
-                                    "description": subkey.get("description", "No description delivered"),
-                                    "wikidata_id": subkey.get("id", ""),
-                                    "gnd_id": _gnd_id_to_add,
-                                    "furtherIds": _furtherIds_to_add,
-                                    "origin": "wd",
-                                }
-                            )
-                        wikidata_output_dict[key] = entity_list_in_query_wikidata_result
+                    wikidata_output_dict = self.get_wikidata_entities(query_wikidata_result)
                     redundancy_test_list = []
                     for tuple in query_entity_library_result:
                         check_cache = Cache(query_entity_library_result[tuple])
@@ -250,31 +235,7 @@ class Identifier:
             else:
                 if wikidata_result_has_data:
                     # if only wikidata check suggested any entities
-                    _temp_el = EntityLibrary(show_printmessages=False)
-                    for key in query_wikidata_result:
-                        entity_list_in_query_wikidata_result = []
-                        for subkey in query_wikidata_result[key][1]["search"]:
-                            _gnd_retrieve_attempt_result = _temp_el.get_gnd_id_of_wikidata_entity(subkey["id"])
-                            _gnd_id_to_add = (
-                                _gnd_retrieve_attempt_result[0]["o"]["value"]
-                                if len(_gnd_retrieve_attempt_result) > 0
-                                else ""
-                            )
-                            _furtherNames_to_add = _temp_el.get_further_names_of_wikidata_entity(subkey.get("id", ""))
-                            _furtherIds_to_add = _temp_el.get_further_ids_of_wikidata_entity(subkey.get("id", ""))
-                            entity_list_in_query_wikidata_result.append(
-                                {
-                                    "name": subkey.get("label", f"No name delivered, search pattern was: {key[0]}"),
-                                    "furtherNames": _furtherNames_to_add,
-                                    "type": key[1],
-                                    "description": subkey.get("description", "No description delivered"),
-                                    "wikidata_id": subkey.get("id", ""),
-                                    "gnd_id": _gnd_id_to_add,
-                                    "furtherIds": _furtherIds_to_add,
-                                    "origin": "wd",
-                                }
-                            )
-                        output_dict[key] = entity_list_in_query_wikidata_result
+                    output_dict = self.get_wikidata_entities(query_wikidata_result)
                 else:
                     # if none of the two checks, entity library and wikidata, suggested any entities
                     output_dict = {}
@@ -282,31 +243,7 @@ class Identifier:
             # if only wikidata check was executed
             if wikidata_result_has_data:
                 # if wikidata check suggested any entities
-                _temp_el = EntityLibrary(show_printmessages=False)
-                for key in query_wikidata_result:
-                    entity_list_in_query_wikidata_result = []
-                    for subkey in query_wikidata_result[key][1]["search"]:
-                        _gnd_retrieve_attempt_result = _temp_el.get_gnd_id_of_wikidata_entity(subkey["id"])
-                        _gnd_id_to_add = (
-                            _gnd_retrieve_attempt_result[0]["o"]["value"]
-                            if len(_gnd_retrieve_attempt_result) > 0
-                            else ""
-                        )
-                        _furtherNames_to_add = _temp_el.get_further_names_of_wikidata_entity(subkey.get("id", ""))
-                        _furtherIds_to_add = _temp_el.get_further_ids_of_wikidata_entity(subkey.get("id", ""))
-                        entity_list_in_query_wikidata_result.append(
-                            {
-                                "name": subkey.get("label", f"No name delivered, search pattern was: {key[0]}"),
-                                "furtherNames": _furtherNames_to_add,
-                                "type": key[1],
-                                "description": subkey.get("description", "No description delivered"),
-                                "wikidata_id": subkey.get("id", ""),
-                                "gnd_id": _gnd_id_to_add,
-                                "furtherIds": _furtherIds_to_add,
-                                "origin": "wd",
-                            }
-                        )
-                    output_dict[key] = entity_list_in_query_wikidata_result
+                output_dict = self.get_wikidata_entities(query_wikidata_result)
             else:
                 # if wikidata check suggested no entities
                 output_dict = {}
@@ -335,13 +272,13 @@ class Identifier:
         check_connectivity:
             execute connectivity check in called WikidataConnector instance or not
         """
-        c = WikidataConnector(
-            self.input,
-            check_connectivity,
-            wikidata_web_api_language,
-            wikidata_web_api_limit,
-            self.show_printmessages,
-        )
+        c = self.wikidata_connector
+        c.input = self.input
+        c.wikidata_web_api_language = wikidata_web_api_language
+        c.wikidata_web_api_limit = wikidata_web_api_limit
+        c.show_printmessages = self.show_printmessages
+        if check_connectivity == True:
+            c.connectivity_check()
         result = c.get_wikidata_search_results(filter_for_precise_spelling, filter_for_correct_type)
         self.current_wikidata_query_result_data = result
         return result
@@ -1,11 +1,19 @@
 import os
 import re
 import json
-import requests
 import csv
-from typing import Union, List, Tuple
+import codecs
+from io import StringIO, TextIOWrapper
+from typing import Any, Callable, Iterable, Iterator, Union, List, Tuple, Dict
+import requests
+import urllib3
 from streamlit.uploaded_file_manager import UploadedFile
-from tei_entity_enricher.util.exceptions import MissingDefinition, BadFormat, FileNotFound
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor, get_http_executor
+from tei_entity_enricher.interface.postprocessing.http_session import default_timeout, get_session
+from tei_entity_enricher.interface.postprocessing.response_cache import ResponseCache, get_response_cache
+from tei_entity_enricher.util.exceptions import MissingDefinition, BadFormat, FileNotFound, NotCached
+from tei_entity_enricher.util.helper import atomic_write
+from tei_entity_enricher.util import json_io
 
 class FileReader:
     def __init__(
@@ -15,6 +23,9 @@ class FileReader:
         origin: Union[str, None] = None,
         internal_call: bool = False,
         show_printmessages: bool = True,
+        http_executor: Union[HttpExecutor, None] = None,
+        response_cache: Union[ResponseCache, None] = None,
+        use_cache: bool = True,
     ) -> None:
         """loads json, beacon, csv and tsv files from local file system or web source,
         used in GndConnector, WikidataConnector, FileWriter and EntityLibrary classes
@@ -29,6 +40,12 @@ class FileReader:
             if FileReader is used in instances of other classes, some error messages can be surpressed
         show_printmessages:
             show class internal printmessages on runtime or not
+        http_executor:
+            limits the web requests per host (default: shared instance of get_http_executor())
+        response_cache:
+            cache of the json and beacon files loaded from the web (default: shared instance of get_response_cache())
+        use_cache:
+            serve and save web files with response_cache or not (connectivity checks have to reach the web source)
         loadfile_types:
             dict to map file extensions to loading methods, can be used from outside
             to execute the requiredloading function"""
@@ -37,6 +54,10 @@ class FileReader:
         self.origin: Union[str, None] = origin
         self.internal_call: bool = internal_call
         self.show_printmessages: bool = show_printmessages
+        # the shared instances are only needed for web files and resolved, when a web file is loaded
+        self.http_executor: Union[HttpExecutor, None] = http_executor
+        self.response_cache: Union[ResponseCache, None] = response_cache
+        self.use_cache: bool = use_cache
         self.loadfile_types: dict = {
             ".json": "loadfile_json",
             ".csv": "loadfile_csv",
@@ -51,9 +72,9 @@ class FileReader:
         if self.file is not None:
             try:
                 if type(self.file) == str:
-                    imported_data = json.loads(self.file)
+                    imported_data = json_io.loads(self.file)
                 else:
-                    imported_data = json.load(self.file)
+                    imported_data = json_io.load(self.file)
             except json.decoder.JSONDecodeError:
                 raise BadFormat(self.file, "FileReader", "loadfile_json()")
             return imported_data
@@ -68,24 +89,14 @@ class FileReader:
                         if os.stat(self.filepath).st_size == 0:
                             imported_data = "empty"
                         else:
-                            imported_data = json.load(loaded_file)
+                            imported_data = json_io.load(loaded_file)
                     return imported_data
                 except FileNotFoundError:
                     raise FileNotFound(self.filepath, "FileReader", "loadfile_json()")
                 except json.decoder.JSONDecodeError:
                     raise BadFormat(self.filepath, "FileReader", "loadfile_json()")
             elif self.origin == "web":
-                response = requests.get(self.filepath, headers=self.headers)
-                if response.status_code == 404:
-                    response.close()
-                    raise FileNotFound(self.filepath, "FileReader", "loadfile_json()")
-                try:
-                    imported_data = response.json()
-                except:
-                    response.close()
-                    raise BadFormat(self.filepath, "FileReader", "loadfile_json()")
-                response.close()
-                return imported_data
+                return self._load_web_data("loadfile_json()", lambda response: response.json())
 
     def loadfile_beacon(self) -> Union[dict, str]:
         """method to load beacon files, locally or out of the web,
@@ -109,19 +120,42 @@ class FileReader:
             except FileNotFoundError:
                 raise FileNotFound(self.filepath, "FileReader", "loadfile_beacon()")
         elif self.origin == "web":
-            response = requests.get(self.filepath, headers=self.headers)
+            return self._load_web_data("loadfile_beacon()", lambda response: response.text)
+
+    def _load_web_data(self, caller_method: str, read_response: Callable[[requests.Response], Any]) -> Any:
+        """loads the url in self.filepath with the shared session and returns the data extracted by read_response;
+        responses of the hosts configured in self.response_cache are served from the cache, if possible,
+        and saved in it, unless self.use_cache is False"""
+        response_cache = self._get_response_cache()
+        source = response_cache.get_source(self.filepath) if self.use_cache else None
+        if source is not None:
+            cached_data = response_cache.load(source, self.filepath)
+            if cached_data is not None:
+                return cached_data
+            if response_cache.cache_only:
+                raise NotCached(self.filepath, "FileReader", caller_method)
+        with self._get_http_executor().host_slot(self.filepath):
+            response = get_session().get(self.filepath, headers=self.headers, timeout=default_timeout)
+        with response:
             if response.status_code == 404:
-                response.close()
-                raise FileNotFound(self.filepath, "FileReader", "loadfile_beacon()")
+                raise FileNotFound(self.filepath, "FileReader", caller_method)
             try:
-                loaded_file = response.text
+                loaded_data = read_response(response)
             except:
-                response.close()
-                raise BadFormat(self.filepath, "FileReader", "loadfile_beacon()")
-            response.close()
-            return loaded_file
+                raise BadFormat(self.filepath, "FileReader", caller_method)
+        if source is not None and response.status_code == 200:
+            response_cache.store(source, self.filepath, loaded_data)
+        return loaded_data
+
+    def _get_http_executor(self) -> HttpExecutor:
+        return self.http_executor if self.http_executor is not None else get_http_executor()
 
-    def loadfile_csv(self, delimiting_character: str = ",", transform_for_entity_library_import: bool = True) -> dict:
+    def _get_response_cache(self) -> ResponseCache:
+        return self.response_cache if self.response_cache is not None else get_response_cache()
+
+    def loadfile_csv(
+        self, delimiting_character: str = ",", transform_for_entity_library_import: bool = True
+    ) -> Union[List[dict], List[List[str]]]:
         """method to load csv files, locally or out of the web, from filepath or from passed file,
         used to add data to entity library;
         the csv file should contain the following key names
@@ -129,169 +163,121 @@ class FileReader:
         name, type, wikidata_id, gnd_id, furtherNames\0;
         if two furtherNames are provided, the second should be saved in
         a key field named furtherNames\1 and so on;
+        returns the list of all rows delivered by iterrows_csv()
 
         delimiter:
             define character, which delimits the fields in the csv file
         transform_for_entity_library_import:
             activate data transformation for usecase of importing entity data into entity library"""
+        return list(self.iterrows_csv(delimiting_character, transform_for_entity_library_import))
+
+    def loadfile_tsv(self, transform_for_entity_library_import: bool = True) -> Union[List[dict], List[List[str]]]:
+        """method to load tsv files, locally or out of the web, from filepath or from passed file,
+        is used to add data to entity library (see loadfile_csv())"""
+        return list(self.iterrows_tsv(transform_for_entity_library_import))
+
+    def iterrows_csv(
+        self, delimiting_character: str = ",", transform_for_entity_library_import: bool = True
+    ) -> Iterator[Union[dict, List[str]]]:
+        """generator version of loadfile_csv(), which reads the csv file line by line
+        and yields the rows as entity dicts (transform_for_entity_library_import) or as lists of strings,
+        so that large files are processed with bounded memory"""
+        lines = self._iterlines("loadfile_csv()")
+        if transform_for_entity_library_import == True:
+            for row in csv.DictReader(lines, delimiter=delimiting_character):
+                yield self.transform_csv_row_for_entity_library(row)
+        else:
+            yield from csv.reader(lines, delimiter=delimiting_character)
+
+    def iterrows_tsv(self, transform_for_entity_library_import: bool = True) -> Iterator[Union[dict, List[str]]]:
+        """generator version of loadfile_tsv(), see iterrows_csv()"""
+        return self.iterrows_csv("\t", transform_for_entity_library_import)
+
+    def iter_gnd_ids_of_beacon(self) -> Iterator[str]:
+        """generator, which reads a beacon file line by line and yields the listed gnd id numbers
+        (see Cache.get_gnd_ids_of_beacon_file()); the #PREFIX statement of the gnd has to be part of the meta lines
+        at the beginning of the file, otherwise BadFormat is raised"""
+        return Cache.iter_gnd_ids_of_beacon_lines(self._iterlines("loadfile_beacon()"), self.filepath)
+
+    @staticmethod
+    def transform_csv_row_for_entity_library(row: Dict[str, str]) -> dict:
+        """transforms a row of csv.DictReader into an entity dict of an entity library:
+        the values of the furtherNames columns are collected in a list
+        and the values of the furtherIds columns in a dict of lists;
+        the values of a row with more fields than the header row, which csv.DictReader saves under the key None,
+        are kept under the key 'fields without column', so that the entity is rejected by the structure check"""
+        new_row = {}
+        new_furtherNames = []
+        new_furtherIds = {}
+        for key in list(row.keys()):
+            # case of a row with more fields than the header row
+            if key is None:
+                new_row["fields without column"] = row[key]
+                continue
+            # furthernames case
+            if "furthernames" in key.lower():
+                new_furtherNames.append(row[key])
+                continue
+            # furtherids case
+            if "furtherids" in key.lower():
+                _curr_fi_key = key.split(".", 1)[1]
+                _curr_fi_key = _curr_fi_key.split("\\")[-2]
+                if _curr_fi_key in new_furtherIds.keys():
+                    new_furtherIds[_curr_fi_key].append(row[key])
+                else:
+                    new_furtherIds[_curr_fi_key] = [row[key]]
+                continue
+            # all other cases
+            new_row[key.lower().strip()] = row[key]
+        # furtherNames: delete None values in list and add list in new_row dict
+        new_furtherNames = [i for i in new_furtherNames if i is not None and len(i) > 0]
+        new_row["furtherNames"] = new_furtherNames
+        # furtherIds: delete None values in lists and add dict in new_row dict
+        for key in list(new_furtherIds.keys()):
+            new_furtherIds[key] = [i for i in new_furtherIds[key] if i is not None and len(i) > 0]
+        new_row["furtherIds"] = new_furtherIds
+        return new_row
+
+    def _iterlines(self, caller_method: str) -> Iterator[str]:
+        # yields the lines (with line endings) of the passed file, the local file or the streamed web response
+        # in self.filepath without loading the whole file
         if self.file is not None:
-            if transform_for_entity_library_import == True:
-                result = []
-                csv_reader = csv.DictReader(
-                    self.file.getvalue().decode("utf-8").splitlines(), delimiter=delimiting_character
-                )
-                for row in csv_reader:
-                    new_row = {}
-                    new_furtherNames = []
-                    new_furtherIds = {}
-                    for key in list(row.keys()):
-                        # furthernames case
-                        if "furthernames" in key.lower():
-                            new_furtherNames.append(row[key])
-                            continue
-                        # furtherids case
-                        if "furtherids" in key.lower():
-                            _curr_fi_key = key.split(".", 1)[1]
-                            _curr_fi_key = _curr_fi_key.split("\\")[-2]
-                            if _curr_fi_key in new_furtherIds.keys():
-                                new_furtherIds[_curr_fi_key].append(row[key])
-                            else:
-                                new_furtherIds[_curr_fi_key] = [row[key]]
-                            continue
-                        # all other cases
-                        new_row[key.lower()] = row[key]
-                    # furtherNames: delete None values in list and add list in new_row dict
-                    new_furtherNames = [i for i in new_furtherNames if len(i) > 0]
-                    new_row["furtherNames"] = new_furtherNames
-                    # furtherIds: delete None values in lists and add dict in new_row dict
-                    for key in list(new_furtherIds.keys()):
-                        new_furtherIds[key] = [i for i in new_furtherIds[key] if len(i) > 0]
-                    new_row["furtherIds"] = new_furtherIds
-                    # add new_row to result
-                    result.append(new_row)
-                return result
+            if type(self.file) == str:
+                lines = StringIO(self.file)
             else:
-                result = []
-                csv_reader = csv.reader(
-                    self.file.getvalue().decode("utf-8").splitlines(), delimiter=delimiting_character
-                )
-                for row in csv_reader:
-                    result.append(row)
-                return result
+                self.file.seek(0)
+                lines = codecs.iterdecode(self.file, "utf-8")
+            try:
+                yield from lines
+            except UnicodeDecodeError:
+                raise BadFormat(getattr(self.file, "name", "passed file"), "FileReader", caller_method)
+            return
         if self.filepath == None:
-            raise MissingDefinition("filepath", "FileReader", "loadfile_csv()")
+            raise MissingDefinition("filepath", "FileReader", caller_method)
         if self.origin == None:
-            raise MissingDefinition("origin", "FileReader", "loadfile_csv()")
+            raise MissingDefinition("origin", "FileReader", caller_method)
         if self.origin == "local":
             try:
-                if transform_for_entity_library_import == True:
-                    result = []
-                    with open(self.filepath) as loaded_file:
-                        csv_reader = csv.DictReader(loaded_file)
-                        for row in csv_reader:
-                            new_row = {}
-                            new_furtherNames = []
-                            new_furtherIds = {}
-                            for key in list(row.keys()):
-                                # furthernames case
-                                if "furthernames" in key.lower():
-                                    new_furtherNames.append(row[key])
-                                    continue
-                                # furtherids case
-                                if "furtherids" in key.lower():
-                                    _curr_fi_key = key.split(".", 1)[1]
-                                    _curr_fi_key = _curr_fi_key.split("\\")[-2]
-                                    if _curr_fi_key in new_furtherIds.keys():
-                                        new_furtherIds[_curr_fi_key].append(row[key])
-                                    else:
-                                        new_furtherIds[_curr_fi_key] = [row[key]]
-                                    continue
-                                # all other cases
-                                new_row[key.lower()] = row[key]
-                            # furtherNames: delete None values in list and add list in new_row dict
-                            new_furtherNames = [i for i in new_furtherNames if len(i) > 0]
-                            new_row["furtherNames"] = new_furtherNames
-                            # furtherIds: delete None values in lists and add dict in new_row dict
-                            for key in list(new_furtherIds.keys()):
-                                new_furtherIds[key] = [i for i in new_furtherIds[key] if len(i) > 0]
-                            new_row["furtherIds"] = new_furtherIds
-                            # add new_row to result
-                            result.append(new_row)
-                        return result
-                else:
-                    result = []
-                    with open(self.filepath) as loaded_file:
-                        csv_reader = csv.reader(loaded_file)
-                        for row in csv_reader:
-                            result.append(row)
-                        return result
+                with open(self.filepath, encoding="utf-8", newline="") as loaded_file:
+                    yield from loaded_file
             except FileNotFoundError:
-                raise FileNotFound(self.filepath, "FileReader", "loadfile_csv()")
+                raise FileNotFound(self.filepath, "FileReader", caller_method)
+            except UnicodeDecodeError:
+                raise BadFormat(self.filepath, "FileReader", caller_method)
         elif self.origin == "web":
-            if transform_for_entity_library_import == True:
-                result = []
-                response = requests.get(self.filepath, headers=self.headers)
-                if response.status_code == 404:
-                    response.close()
-                    raise FileNotFound(self.filepath, "FileReader", "loadfile_csv()")
-                try:
-                    loaded_file = response.content.decode("utf-8")
-                    csv_reader = csv.DictReader(loaded_file.splitlines(), delimiter=delimiting_character)
-                    for row in csv_reader:
-                        new_row = {}
-                        new_furtherNames = []
-                        new_furtherIds = {}
-                        for key in list(row.keys()):
-                            # furthernames case
-                            if "furthernames" in key.lower():
-                                new_furtherNames.append(row[key])
-                                continue
-                            # furtherids case
-                            if "furtherids" in key.lower():
-                                _curr_fi_key = key.split(".", 1)[1]
-                                _curr_fi_key = _curr_fi_key.split("\\")[-2]
-                                if _curr_fi_key in new_furtherIds.keys():
-                                    new_furtherIds[_curr_fi_key].append(row[key])
-                                else:
-                                    new_furtherIds[_curr_fi_key] = [row[key]]
-                                continue
-                            # all other cases
-                            new_row[key.lower().strip()] = row[key]
-                        # furtherNames: delete None values in list and add list in new_row dict
-                        new_furtherNames = [i for i in new_furtherNames if len(i) > 0]
-                        new_row["furtherNames"] = new_furtherNames
-                        # furtherIds: delete None values in lists and add dict in new_row dict
-                        for key in list(new_furtherIds.keys()):
-                            new_furtherIds[key] = [i for i in new_furtherIds[key] if len(i) > 0]
-                        new_row["furtherIds"] = new_furtherIds
-                        # add new_row to result
-                        result.append(new_row)
-                except:
-                    response.close()
-                    raise BadFormat(self.filepath, "FileReader", "loadfile_csv()")
-                response.close()
-                return result
-            else:
-                result = []
-                response = requests.get(self.filepath)
+            with self._get_http_executor().host_slot(self.filepath):
+                response = get_session().get(self.filepath, headers=self.headers, timeout=default_timeout, stream=True)
+            with response:
                 if response.status_code == 404:
-                    response.close()
-                    raise FileNotFound(self.filepath, "FileReader", "loadfile_csv()")
+                    raise FileNotFound(self.filepath, "FileReader", caller_method)
+                # decode gzip or deflate content encoding while reading the raw stream and keep the stream open
+                # at its end, so that TextIOWrapper can finish reading
+                response.raw.decode_content = True
+                response.raw.auto_close = False
                 try:
-                    loaded_file = response.content.decode("utf-8")
-                    csv_reader = csv.reader(loaded_file)
-                    for row in csv_reader:
-                        result.append(row)
-                except:
-                    response.close()
-                    raise BadFormat(self.filepath, "FileReader", "loadfile_csv()")
-                response.close()
-                return result
-
-    def loadfile_tsv(self) -> Union[str, None, bool]:
-        """method to load tsv files, locally or out of the web,
-        is used to add data to entity library"""
-        pass
+                    yield from TextIOWrapper(response.raw, encoding="utf-8", newline="")
+                except (UnicodeDecodeError, requests.RequestException, urllib3.exceptions.HTTPError):
+                    raise BadFormat(self.filepath, "FileReader", caller_method)
 
 
 class Cache:
@@ -307,6 +293,63 @@ class Cache:
         self.data: Union[str, dict, list, None] = data
         self.show_printmessages: bool = show_printmessages
 
+    @property
+    def data(self) -> Union[str, dict, list, None]:
+        return self._data
+
+    @data.setter
+    def data(self, data: Union[str, dict, list, None]) -> None:
+        # indexes of the ids and values in data, which are used by check_for_redundancy();
+        # they are built on the first check and rebuilt, if data is replaced or the length of data changes
+        self._data = data
+        self._id_index: Union[Dict[str, set], None] = None
+        self._value_indexes: Dict[str, Tuple[set, list]] = {}
+        self._indexed_length: Union[int, None] = None
+
+    def reset_indexes(self) -> None:
+        """has to be called, if ids or values in self.data are changed without changing the length of self.data"""
+        self.data = self._data
+
+    def _check_indexed_length(self) -> None:
+        if self._indexed_length != len(self._data):
+            self.reset_indexes()
+            self._indexed_length = len(self._data)
+
+    def _get_id_index(self) -> Dict[str, set]:
+        # sets of the wikidata_id and gnd_id values of the entities in self.data (usecase EntityLibrary)
+        self._check_indexed_length()
+        if self._id_index is None:
+            self._id_index = {"wikidata_id": set(), "gnd_id": set()}
+            self._add_entities_to_id_index(self._data)
+        return self._id_index
+
+    def _add_entities_to_id_index(self, entities: List[dict]) -> None:
+        for entity in entities:
+            self._id_index["wikidata_id"].add(entity["wikidata_id"])
+            self._id_index["gnd_id"].add(entity["gnd_id"])
+
+    def index_added_entities(self, entities: List[dict]) -> None:
+        """adds entities, which have been appended to self.data (usecase EntityLibrary), to the id index,
+        so that it has not to be rebuilt"""
+        if self._id_index is not None and self._indexed_length + len(entities) == len(self._data):
+            self._add_entities_to_id_index(entities)
+            self._indexed_length = len(self._data)
+
+    def _get_value_index(self, category: str) -> Tuple[set, list]:
+        # hashable values and list of the unhashable values of category in the dicts of self.data (usecase GndConnector)
+        self._check_indexed_length()
+        if category not in self._value_indexes:
+            hashable_values = set()
+            unhashable_values = []
+            for key in self._data:
+                value = self._data[key][category]
+                try:
+                    hashable_values.add(value)
+                except TypeError:
+                    unhashable_values.append(value)
+            self._value_indexes[category] = (hashable_values, unhashable_values)
+        return self._value_indexes[category]
+
     def print_cache(self) -> int:
         print(self.data)
         return 0
@@ -359,24 +402,24 @@ class Cache:
         which should be added to the file:
         but if a specific gnd id number and a specific value (usecase GndConnector)
         or a specific entity (EntityLibrary) is already present in the file,
-        the merging process will be canceled (see FileWriter class)"""
+        the merging process will be canceled (see FileWriter class);
+        the checks use hash indexes of self.data, which are built on the first check"""
         if usecase == "GndConnector":
-            gnd_id_is_redundant = False
+            gnd_id_is_redundant = gnd_id in self.data
             value_is_redundant = False
-            for key in self.data:
-                if key == gnd_id:
-                    gnd_id_is_redundant = True
-                if self.data[key][category] == value:
-                    value_is_redundant = True
+            if len(self.data) > 0:
+                hashable_values, unhashable_values = self._get_value_index(category)
+                try:
+                    value_is_redundant = value in hashable_values
+                except TypeError:
+                    pass
+                if not value_is_redundant:
+                    value_is_redundant = any(item == value for item in unhashable_values)
             return gnd_id_is_redundant, value_is_redundant
         elif usecase == "EntityLibrary":
-            gnd_id_is_redundant = False
-            wikidata_id_is_redundant = False
-            for entity in self.data:
-                if (entity["wikidata_id"] == wikidata_id) and (wikidata_id != ""):
-                    wikidata_id_is_redundant = True
-                if (entity["gnd_id"] == gnd_id) and (gnd_id != ""):
-                    gnd_id_is_redundant = True
+            id_index = self._get_id_index()
+            wikidata_id_is_redundant = (wikidata_id != "") and (wikidata_id in id_index["wikidata_id"])
+            gnd_id_is_redundant = (gnd_id != "") and (gnd_id in id_index["gnd_id"])
             return wikidata_id_is_redundant, gnd_id_is_redundant
         else:
             raise MissingDefinition("usecase", "Cache", "check_for_redundancy()")
@@ -405,49 +448,53 @@ class Cache:
         elif usecase == "EntityLibrary":
             if type(self.data) == list:
                 for entity in self.data:
-                    if type(entity) != dict:
-                        return False
-                    compulsory_keys = [
-                        "name",
-                        "type",
-                        "description",
-                        "wikidata_id",
-                        "gnd_id",
-                        "furtherNames",
-                        "furtherIds",
-                    ]
-                    # check for keys which shouldnt be in entity dict
-                    for key in list(entity.keys()):
-                        if key not in compulsory_keys:
-                            return False
-                    # check if all compulsory keys are in the entity dict
-                    for key in compulsory_keys:
-                        if key not in list(entity.keys()):
-                            return False
-                    # check if furtherNames is a list
-                    if type(entity[compulsory_keys[5]]) != list:
+                    if self.get_entity_structure_error(entity) is not None:
                         return False
-                    # check if furtherIds is a dict
-                    if type(entity[compulsory_keys[6]]) != dict:
-                        return False
-                    # check if all furtherIds values are empty lists or lists with strings
-                    for furtherId_entry_key in entity[compulsory_keys[6]]:
-                        if type(entity[compulsory_keys[6]][furtherId_entry_key]) != list:
-                            return False
-                        if len(entity[compulsory_keys[6]][furtherId_entry_key]) > 0:
-                            for furtherId_entry_key_item in entity[compulsory_keys[6]][furtherId_entry_key]:
-                                if type(furtherId_entry_key_item) != str:
-                                    return False
-                    # check if the first 5 keys have str values
-                    for key in compulsory_keys[:-2]:
-                        if type(entity[key]) != str:
-                            return False
                 return True
             else:
                 return False
         else:
             raise MissingDefinition("usecase", "Cache", "check_json_structure()")
 
+    @staticmethod
+    def get_entity_structure_error(entity: dict) -> Union[str, None]:
+        """checks the structure of a single entity dict of an entity library (see check_json_structure())
+        and returns the reason, why it does not fulfill the requirements, or None"""
+        if type(entity) != dict:
+            return "entity is not a dict"
+        compulsory_keys = [
+            "name",
+            "type",
+            "description",
+            "wikidata_id",
+            "gnd_id",
+            "furtherNames",
+            "furtherIds",
+        ]
+        # check for keys which shouldnt be in entity dict
+        for key in entity:
+            if key not in compulsory_keys:
+                return f"unexpected key '{key}'"
+        # check if all compulsory keys are in the entity dict
+        for key in compulsory_keys:
+            if key not in entity:
+                return f"missing key '{key}'"
+        # check if furtherNames is a list
+        if type(entity["furtherNames"]) != list:
+            return "furtherNames value is not a list"
+        # check if furtherIds is a dict
+        if type(entity["furtherIds"]) != dict:
+            return "furtherIds value is not a dict"
+        # check if all furtherIds values are empty lists or lists with strings
+        for furtherId_entry_key, furtherId_entry in entity["furtherIds"].items():
+            if type(furtherId_entry) != list or any(type(item) != str for item in furtherId_entry):
+                return f"furtherIds value of '{furtherId_entry_key}' is not a list of strings"
+        # check if the first 5 keys have str values
+        for key in compulsory_keys[:-2]:
+            if type(entity[key]) != str:
+                return f"{key} value is not a string"
+        return None
+
     def check_beacon_prefix_statement(self) -> bool:
         """method to check an imported beacon file, if the listed entities are defined by gnd norm data ids"""
         regex_prefix_line = re.compile(r"#PREFIX:\s+http:\/\/d-nb.info\/gnd\/")
@@ -466,13 +513,7 @@ class Cache:
     def get_gnd_ids_of_beacon_file(self) -> List[str]:
         """method to get all listed gnd id numbers from a beacon file"""
         if self.check_beacon_prefix_statement() == True:
-            regex_gndid = re.compile(r"^.{9,10}(?=\|)")
-            lines = self.data.split("\n")
-            result_list = []
-            for line in lines:
-                line_search_result = re.search(regex_gndid, line)
-                if line_search_result != None:
-                    result_list.append(line_search_result.group(0))
+            result_list = list(self.iter_gnd_ids_of_beacon_lines(StringIO(self.data), check_prefix_statement=False))
             print(
                 f"in beacon found gndids: {len(result_list)}\ndata: {result_list}"
             ) if self.show_printmessages else None
@@ -485,6 +526,36 @@ class Cache:
                 "{} {}: loaded beacon-file from {} doesn't refer to gnd data or is corrupted",
             )
 
+    @staticmethod
+    def iter_gnd_ids_of_beacon_lines(
+        lines: Iterable[str], source: str = "Cache data", check_prefix_statement: bool = True
+    ) -> Iterator[str]:
+        """generator, which yields the gnd id numbers listed in the lines of a beacon file;
+        with check_prefix_statement the #PREFIX statement of the gnd has to be found in the meta lines
+        before the first id line, otherwise BadFormat is raised with source as the origin of the lines"""
+        regex_prefix_line = re.compile(r"#PREFIX:\s+http:\/\/d-nb.info\/gnd\/")
+        regex_gndid = re.compile(r"^.{9,10}(?=\|)")
+        prefix_found = not check_prefix_statement
+        for line in lines:
+            if line.startswith("#"):
+                if not prefix_found and regex_prefix_line.search(line) is not None:
+                    prefix_found = True
+                continue
+            if line.strip() == "":
+                continue
+            if not prefix_found:
+                break
+            line_search_result = regex_gndid.search(line)
+            if line_search_result is not None:
+                yield line_search_result.group(0)
+        if not prefix_found:
+            raise BadFormat(
+                source,
+                "Cache",
+                "iter_gnd_ids_of_beacon_lines()",
+                "{} {}: loaded beacon-file from {} doesn't refer to gnd data or is corrupted",
+            )
+
     def get_items_with_specific_value_in_a_category(
         self, category: str, value: str, mode: str = "dict"
     ) -> Union[dict, list]:
@@ -537,15 +608,20 @@ class FileWriter:
         self.show_printmessages: bool = show_printmessages
         self.writefile_types: dict = {".json": "writefile_json", ".csv": "writefile_csv"}
 
-    def writefile_json(self, do_if_file_exists: str = "cancel", usecase: str = "GndConnector") -> bool:
+    def writefile_json(
+        self, do_if_file_exists: str = "cancel", usecase: str = "GndConnector", backup: bool = False
+    ) -> bool:
         """method to write a new or enrich an existing json file,
-        used in EntityLibrary, GndConnector and WikidataConnector
+        used in EntityLibrary, GndConnector and WikidataConnector;
+        the file is written to a temporary file first, which replaces the file only after it has been written completely
 
         do_if_file_exists:
             parameter controls behavior in case a file in self.filepath already exists,
             there are 3 submethods defined, differentiating the 3 cases 'cancel', 'replace' and 'merge'
         usecase:
-            can be 'GndConnector' 'or 'EntityLibrary'"""
+            can be 'GndConnector' 'or 'EntityLibrary'
+        backup:
+            keep a replaced file as backup with the additional extension .bak"""
 
         def do_if_file_exists_cancel() -> bool:
             print(
@@ -554,8 +630,8 @@ class FileWriter:
             return False
 
         def do_if_file_exists_replace() -> bool:
-            with open(self.filepath, "w") as file:
-                json.dump(self.data, file, indent="\t")
+            with atomic_write(self.filepath, backup=backup) as file:
+                json_io.dump(self.data, file, indent="\t")
             print(
                 "FileWriter writefile_json(): file already exists, file successfully overwritten"
             ) if self.show_printmessages else None
@@ -579,8 +655,8 @@ class FileWriter:
                             ) if self.show_printmessages else None
                             return False
                     already_existing_file_cache.data.update(self.data)
-                    with open(self.filepath, "w") as file:
-                        json.dump(already_existing_file_cache.data, file, indent="\t")
+                    with atomic_write(self.filepath, backup=backup) as file:
+                        json_io.dump(already_existing_file_cache.data, file, indent="\t")
                     print(
                         "FileWriter writefile_json(): file already exists, files successfully merged"
                     ) if self.show_printmessages else None
@@ -596,8 +672,8 @@ class FileWriter:
                             ) if self.show_printmessages else None
                             return False
                     already_existing_file_cache.data.extend(self.data)
-                    with open(self.filepath, "w") as file:
-                        json.dump(already_existing_file_cache.data, file, indent="\t")
+                    with atomic_write(self.filepath, backup=backup) as file:
+                        json_io.dump(already_existing_file_cache.data, file, indent="\t")
                     print(
                         "FileWriter writefile_json(): file already exists, files successfully merged"
                     ) if self.show_printmessages else None
@@ -616,8 +692,8 @@ class FileWriter:
             )
             already_existing_file_cache = Cache(data=already_existing_file.loadfile_json())
         except FileNotFound:
-            with open(self.filepath, "w") as file:
-                json.dump(self.data, file, indent="\t")
+            with atomic_write(self.filepath, backup=backup) as file:
+                json_io.dump(self.data, file, indent="\t")
             print(
                 f"FileWriter writefile_json(): new file {self.filepath} successfully created"
             ) if self.show_printmessages else None
@@ -633,8 +709,8 @@ class FileWriter:
             ) if self.show_printmessages else None
             return False
         if already_existing_file_cache.data == "empty":
-            with open(self.filepath, "w") as file:
-                json.dump(self.data, file, indent="\t")
+            with atomic_write(self.filepath, backup=backup) as file:
+                json_io.dump(self.data, file, indent="\t")
             print(
                 "FileWriter writefile_json(): file already exists but was empty, file successfully written"
             ) if self.show_printmessages else None
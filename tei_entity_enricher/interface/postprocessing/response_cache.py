@@ -0,0 +1,232 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Union
+from urllib.parse import urlparse
+
+from tei_entity_enricher.util import json_io
+from tei_entity_enricher.util.helper import atomic_write, local_save_path, makedir_if_necessary
+
+logger = logging.getLogger(__name__)
+
+default_config_filepath = os.path.join(local_save_path, "config", "postprocessing", "response_cache_config.json")
+default_config = {
+    "db_path": os.path.join(local_save_path, "config", "postprocessing", "response_cache.sqlite"),
+    # sources of the hosts, whose responses are cached
+    "hosts": {
+        "www.wikidata.org": "wikidata",
+        "query.wikidata.org": "sparql",
+        "hub.culturegraph.org": "gnd",
+        "lobid.org": "gnd",
+    },
+    # time to live of the responses of a source in seconds
+    "ttls": {"wikidata": 7 * 24 * 3600, "sparql": 7 * 24 * 3600, "gnd": 30 * 24 * 3600},
+    "max_size": 256 * 1024 * 1024,
+    "cache_only": False,
+}
+# share of max_size, down to which the responses are removed, so that not every new response requires an eviction
+default_low_water_ratio = 0.9
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        db_path: str = default_config["db_path"],
+        hosts: Union[Dict[str, str], None] = None,
+        ttls: Union[Dict[str, float], None] = None,
+        max_size: int = default_config["max_size"],
+        cache_only: bool = False,
+        low_water_ratio: float = default_low_water_ratio,
+    ) -> None:
+        """SQLite cache of the responses of web apis (FileReader web loads) and sparql endpoints (SparqlClient),
+        so that repeated postprocessing runs over the same edition do not query the same entities again
+
+        db_path:
+            path to the SQLite database file
+        hosts:
+            dict with the hosts, whose responses are cached, as keys and the names of their sources as values
+            (responses of other hosts are never cached)
+        ttls:
+            dict with source names as keys and the time in seconds, for which a response of the source is valid, as values
+        max_size:
+            maximum size of the cached responses in bytes, the least recently used responses are removed,
+            if it is exceeded, until the responses take less than low_water_ratio * max_size bytes
+        cache_only:
+            offline mode: cached responses are used regardless of their age and the requests of responses,
+            which are not cached, fail with a NotCached exception instead of being sent
+        hits, misses:
+            counters of the cache lookups"""
+        self.db_path: str = db_path
+        self.hosts: Dict[str, str] = dict(default_config["hosts"] if hosts is None else hosts)
+        self.ttls: Dict[str, float] = dict(default_config["ttls"] if ttls is None else ttls)
+        self.max_size: int = max_size
+        self.cache_only: bool = cache_only
+        self.low_water_ratio: float = low_water_ratio
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: Union[sqlite3.Connection, None] = None
+        self._size: Union[int, None] = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            makedir_if_necessary(os.path.dirname(os.path.abspath(self.db_path)))
+            self._connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, source TEXT NOT NULL, "
+                "stored REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL, value TEXT NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        return self._connection
+
+    def get_source(self, url: str) -> Union[str, None]:
+        """returns the source of the host of url or None, if the responses of the host are not cached"""
+        return self.hosts.get(urlparse(url).netloc)
+
+    def _get_key(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def load(self, source: str, key: str) -> Any:
+        """returns the cached response of key (an url or a query) or None, if there is no valid response in the cache"""
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                row = connection.execute(
+                    "SELECT stored, value FROM responses WHERE key = ? AND source = ?", (self._get_key(key), source)
+                ).fetchone()
+                now = time.time()
+                if row is None or (not self.cache_only and now - row[0] > self.ttls.get(source, 0)):
+                    self.misses += 1
+                    return None
+                connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, self._get_key(key)))
+                self.hits += 1
+            return json_io.loads(row[1])
+        except (sqlite3.Error, ValueError) as ex:
+            logger.warning(f"Could not read the response cache {self.db_path}: {repr(ex)}")
+            self.misses += 1
+            return None
+
+    def store(self, source: str, key: str, value: Any) -> None:
+        """saves the response value (json serializable) of key, if responses of source have a time to live"""
+        if self.ttls.get(source, 0) <= 0:
+            return
+        value = json_io.dumps(value)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                replaced_row = connection.execute(
+                    "SELECT size FROM responses WHERE key = ?", (self._get_key(key),)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, source, stored, accessed, size, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._get_key(key), source, now, now, size, value),
+                )
+                # the size of a replaced response is freed
+                if replaced_row is not None:
+                    size -= replaced_row[0]
+                if self._size is None or self._size + size > self.max_size:
+                    self._evict()
+                else:
+                    self._size += size
+        except sqlite3.Error as ex:
+            logger.warning(f"Could not write the response cache {self.db_path}: {repr(ex)}")
+
+    def _evict(self) -> None:
+        # if max_size is exceeded, removes the expired responses (which are kept until then for the cache-only mode)
+        # and then the least recently used responses, until the low water mark is reached
+        connection = self._get_connection()
+        size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if size <= self.max_size:
+            self._size = size
+            return
+        # one transaction instead of a commit per removed response
+        connection.execute("BEGIN")
+        try:
+            size = self._remove_responses(connection, size)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        self._size = size
+
+    def _remove_responses(self, connection: sqlite3.Connection, size: int) -> int:
+        # removes the expired and then the least recently used responses, returns the remaining size
+        now = time.time()
+        for (source,) in connection.execute("SELECT DISTINCT source FROM responses").fetchall():
+            condition = (source, now - self.ttls.get(source, 0))
+            size -= connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses WHERE source = ? AND stored < ?", condition
+            ).fetchone()[0]
+            connection.execute("DELETE FROM responses WHERE source = ? AND stored < ?", condition)
+        low_water_mark = self.low_water_ratio * self.max_size
+        if size > low_water_mark:
+            # walks the responses from the least recently used one on (by the index on accessed)
+            # until enough of them are found to be removed
+            cursor = connection.execute("SELECT key, size FROM responses ORDER BY accessed")
+            keys_to_remove = []
+            for key, entry_size in cursor:
+                if size <= low_water_mark:
+                    break
+                keys_to_remove.append((key,))
+                size -= entry_size
+            cursor.close()
+            connection.executemany("DELETE FROM responses WHERE key = ?", keys_to_remove)
+        return size
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict()
+
+    def get_size(self) -> int:
+        with self._lock:
+            return self._get_connection().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self, source: Union[str, None] = None) -> int:
+        """removes all responses of source or, without source, all responses; returns the number of removed responses"""
+        with self._lock:
+            if source is None:
+                cursor = self._get_connection().execute("DELETE FROM responses")
+            else:
+                cursor = self._get_connection().execute("DELETE FROM responses WHERE source = ?", (source,))
+            self._size = None
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def load_response_cache_config(filepath: str = default_config_filepath) -> dict:
+    """loads the settings of the response cache from response_cache_config.json in config folder
+    (keys: db_path, hosts, ttls, max_size and cache_only), creates the file with the default settings, if it is missing
+    """
+    config = dict(default_config)
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        try:
+            makedir_if_necessary(os.path.dirname(filepath))
+            with atomic_write(filepath, encoding="utf-8") as f:
+                json.dump(default_config, f, indent="\t")
+        except OSError as ex:
+            logger.warning(f"Could not create the default response cache config {filepath}: {repr(ex)}")
+    except (OSError, ValueError) as ex:
+        logger.warning(f"Could not load the response cache config {filepath}, using the default settings: {repr(ex)}")
+    return config
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache() -> ResponseCache:
+    # shared instance of the process
+    config = load_response_cache_config()
+    return ResponseCache(config["db_path"], config["hosts"], config["ttls"], config["max_size"], config["cache_only"])
@@ -1,11 +1,13 @@
 from typing import Union, List, Tuple, Dict
-from SPARQLWrapper import SPARQLWrapper, JSON
+from tei_entity_enricher.interface.postprocessing.connectivity_state import ConnectivityState, get_connectivity_state
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor, get_http_executor
+from tei_entity_enricher.interface.postprocessing.http_session import SparqlClient, get_sparql_client
 from tei_entity_enricher.interface.postprocessing.io import FileReader, FileWriter
 from tei_entity_enricher.util.exceptions import FileNotFound
 from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary
-from tei_entity_enricher import __version__
 import math
 import os
+import re
 
 
 class WikidataConnector:
@@ -16,6 +18,8 @@ class WikidataConnector:
         wikidata_web_api_language: str = "de",
         wikidata_web_api_limit: str = "50",
         show_printmessages: bool = True,
+        http_executor: Union[HttpExecutor, None] = None,
+        connectivity_state: Union[ConnectivityState, None] = None,
     ) -> None:
         """establishes connection to wikidata web api and wikidata´s sparql endpoint,
         used to get a list of possible entities refering to input name and type strings
@@ -30,14 +34,28 @@ class WikidataConnector:
             maximum amount of returned search hits in wikidata web api query results
         show_printmessages:
             show class internal printmessages on runtime or not
+        http_executor:
+            executes the requests of get_wikidata_search_results() for the tuples of input concurrently and limits the sparql queries (default: shared instance of get_http_executor())
+        connectivity_state:
+            results of recent connectivity checks, which are reused by connectivity_check() (default: shared instance of get_connectivity_state())
         self.wikidata_web_api_baseUrl:
             baseUrl of wikidata web api, contains search string, language and limit of resulting hits placeholder
+        self.sparql_client:
+            sends the sparql queries of the connector to the wikidata sparql endpoint
+            (shared instance of get_sparql_client() like in EntityLibrary, unless http_executor is passed)
         connection_established:
             data from an api has already been received or not"""
         print("initializing WikidataConnector..") if show_printmessages else None
         self.input: Union[List[Tuple[str, str]], None] = input
         self.check_connectivity: bool = check_connectivity
         self.show_printmessages: bool = show_printmessages
+        self.http_executor: HttpExecutor = http_executor if http_executor is not None else get_http_executor()
+        self.sparql_client: SparqlClient = (
+            SparqlClient(http_executor=http_executor) if http_executor is not None else get_sparql_client()
+        )
+        self.connectivity_state: ConnectivityState = (
+            connectivity_state if connectivity_state is not None else get_connectivity_state()
+        )
         self.wikidata_web_api_baseUrl: str = "https://www.wikidata.org/w/api.php?action=wbsearchentities&search={}&format=json&language={}&uselang={}&limit={}"
         self.wikidata_web_api_language: str = wikidata_web_api_language
         self.wikidata_web_api_limit: str = wikidata_web_api_limit
@@ -93,7 +111,8 @@ class WikidataConnector:
 
     def connectivity_check(self) -> int:
         """checking wikidata web api (preset query string: 'Berlin', hit limit: '1')
-        and wikidata sparql endpoint (preset query input: ('Q64 (Berlin)', 'place')),
+        and wikidata sparql endpoint (preset query input: ('Q64 (Berlin)', 'place')) bypassing the response cache,
+        the result is saved in self.connectivity_state and reused by all connectors until it expires,
         returns 0 or -1 for unittest purposes"""
 
         def check_wikidata_web_api() -> bool:
@@ -108,6 +127,7 @@ class WikidataConnector:
                     origin="web",
                     internal_call=True,
                     show_printmessages=self.show_printmessages,
+                    use_cache=False,
                 ).loadfile_json()
             except:
                 print(
@@ -120,7 +140,7 @@ class WikidataConnector:
 
         def check_wikidata_sparql_endpoint() -> bool:
             try:
-                result = self.check_wikidata_entity_type("Q64", "place")
+                result = self.check_wikidata_entity_type("Q64", "place", use_cache=False)
             except:
                 print(
                     "WikidataConnector connectivity_check() error: internal failure in check_wikidata_sparql_endpoint() trying to do sparql query on wikidata sparql endpoint"
@@ -135,12 +155,23 @@ class WikidataConnector:
 
         if self.check_connectivity == False:
             self.check_connectivity == True
+        state_key = ("wikidata", self.wikidata_web_api_baseUrl, self.wikidata_web_api_language)
+        cached_result = self.connectivity_state.get(state_key)
+        if cached_result is not None:
+            self.connection_established = cached_result
+            print(
+                f"WikidataConnector connectivity_check(): using the result of a recent check ({'passed' if cached_result else 'failed'})."
+            ) if self.show_printmessages else None
+            return 0 if cached_result else -1
         if all((check_wikidata_web_api(), check_wikidata_sparql_endpoint())):
             print(
                 "WikidataConnector connectivity_check() passed: Wikidata web api and wikidata sparql endpoint are responding as expected."
             ) if self.show_printmessages else None
             self.connection_established = True
+            self.connectivity_state.set(state_key, True)
             return 0
+        self.connection_established = False
+        self.connectivity_state.set(state_key, False, passed=False)
         return -1
 
     def get_wikidata_search_results(
@@ -176,8 +207,9 @@ class WikidataConnector:
                 "WikidataConnector get_wikidata_search_results() internal error: WikidataConnector input data is in a wrong format."
             ) if self.show_printmessages == True else None
             return False
-        result_dict = {}
-        for string_tuple in self.input:
+
+        def get_search_result(string_tuple: Tuple[str, str]) -> Union[list, None]:
+            # returns None, if the request to wikidata web api failed
             filereader = FileReader(
                 filepath=self.wikidata_web_api_baseUrl.format(
                     string_tuple[0],
@@ -188,12 +220,12 @@ class WikidataConnector:
                 origin="web",
                 internal_call=True,
                 show_printmessages=self.show_printmessages,
+                http_executor=self.http_executor,
             )
             try:
                 filereader_result = filereader.loadfile_json()
             except:
-                print("WikidataConnector get_wikidata_search_results() error: internal failure")
-                return False
+                return None
             if all(x == False for x in [filter_for_precise_spelling, filter_for_correct_type]):
                 print(f"no filtering in {string_tuple} result") if self.show_printmessages == True else None
             if filter_for_precise_spelling == True:
@@ -211,74 +243,88 @@ class WikidataConnector:
                             precise_spelling.append(search_list_element)
                     filereader_result["search"] = precise_spelling
             if filter_for_correct_type == True:
-                correctly_typed_entities = []
-                entry_amount = len(filereader_result["search"])
-                percent = 100 / entry_amount if entry_amount > 0 else 100
-                progressbar = 0
-                for search_list_element in filereader_result["search"]:
-                    progressbar += percent
-                    print(
-                        f"type filtering in {string_tuple} result: {math.floor(progressbar * 10 ** 2) / 10 ** 2}"
-                    ) if self.show_printmessages == True else None
-                    if self.check_wikidata_entity_type(search_list_element["id"], string_tuple[1]) == True:
-                        correctly_typed_entities.append(search_list_element)
-                filereader_result["search"] = correctly_typed_entities
-            result_dict[string_tuple] = [
+                print(
+                    f"type filtering in {string_tuple} result: {len(filereader_result['search'])} entities"
+                ) if self.show_printmessages == True else None
+                entity_types = self.check_wikidata_entity_types(
+                    [search_list_element["id"] for search_list_element in filereader_result["search"]],
+                    string_tuple[1],
+                )
+                filereader_result["search"] = [
+                    search_list_element
+                    for search_list_element in filereader_result["search"]
+                    if entity_types is not None and entity_types[search_list_element["id"]] == True
+                ]
+            return [
                 len(filereader_result["search"]),
                 filereader_result,
             ]
+
+        input_tuples = list(dict.fromkeys(self.input))
+        search_results = self.http_executor.map(get_search_result, input_tuples)
+        if any(search_result is None for search_result in search_results):
+            print("WikidataConnector get_wikidata_search_results() error: internal failure")
+            return False
+        result_dict = dict(zip(input_tuples, search_results))
         return result_dict
 
-    def check_wikidata_entity_type(self, entity_id: str, type: str) -> Union[bool, None]:
+    def check_wikidata_entity_type(self, entity_id: str, type: str, use_cache: bool = True) -> Union[bool, None]:
+        """checks, if a wikidata entity is of the type, which has been defined inside the self.input tuples
+        of WikidataConnector class (see check_wikidata_entity_types() for details);
+        returns None, if type is not defined in self.link_suggestion_categories"""
+        result = self.check_wikidata_entity_types([entity_id], type, use_cache=use_cache)
+        if result is None:
+            return None
+        return result[entity_id]
+
+    def check_wikidata_entity_types(
+        self, entity_ids: List[str], type: str, chunk_size: int = 50, use_cache: bool = True
+    ) -> Union[Dict[str, bool], None]:
         """used in get_wikidata_search_results() to check, if those wikidata entities delivered
         by self.get_wikidata_search_results() query are of the type, which has been defined inside
         the self.input tuples of WikidataConnector class
 
         this check uses the wikidata semantic web data base by sending queries to the wikidata sparql endpoint;
-        get_wikidata_search_results() retrieves wikidata id numbers, which are used here in an ASK-query,
-        which determines, if the entity in question is a member of one of specific classes
+        get_wikidata_search_results() retrieves wikidata id numbers, which are used here in a SELECT-query,
+        which returns those entities, that are members of one of specific classes
         (see local 'query_string' variable for details: 'wdt:P31/wdt:P279*'-property means 'is a member of a specific class or
         a member of any subclass (any level beneath) of a specific class' and the FILTER statement
-        (created with local function _build_filter_string() on basis of data from self.link_suggestion_categories)
-        defines a set of classes, out of which only one class has to match the query statement to let the query return true)
+        (created on basis of data from self.link_suggestion_categories)
+        defines a set of classes, out of which only one class has to match the query statement to let an entity be returned)
 
         a sparqle query to wikidata endpoint needs an agent parameter in the header to get an answer,
         the value of the agent string can be choosen freely
 
-        this method checks only one entity at once and has to be used in an iteration
-
-        it contains an internal auxiliary function _build_filter_string
-        to create the filter expression for the sparql query"""
-
-        def _build_filter_string(type_string) -> str:
-            filter_string = "("
-            type_checking_entity_list = self.link_suggestion_categories.get(type)[0]
-            for index, x in enumerate(type_checking_entity_list):
-                if index != len(type_checking_entity_list) - 1:
-                    filter_string += "wd:" + x + ", "
-                else:
-                    filter_string += "wd:" + x + ")"
-            return filter_string
-
+        this method checks chunk_size entities with one query (given in a VALUES statement)
+        and returns a dict with the entity ids as keys and the check results as values
+        (ids, which are no wikidata item ids, are not queried and get False);
+        the query results are served from the response cache, if possible, unless use_cache is False;
+        returns None, if type is not defined in self.link_suggestion_categories"""
         if type not in list(self.link_suggestion_categories.keys()):
             return None
-        endpoint_url = "https://query.wikidata.org/sparql"
-        user_agent = "NEISS TEI Entity Enricher v.{}".format(__version__)
-        sparql = SPARQLWrapper(endpoint=endpoint_url, agent=user_agent)
+        filter_string = "(" + ", ".join("wd:" + x for x in self.link_suggestion_categories.get(type)[0]) + ")"
         query_string = """
             PREFIX wdt: <http://www.wikidata.org/prop/direct/>
             PREFIX wd: <http://www.wikidata.org/entity/>
 
-            ASK
+            SELECT DISTINCT ?item
+            WHERE
             {
-            wd:%s wdt:P31/wdt:P279* ?o .
+            VALUES ?item { %s }
+            ?item wdt:P31/wdt:P279* ?o .
             FILTER (?o IN %s)
             }
-        """ % (
-            entity_id,
-            _build_filter_string(type),
-        )
-        sparql.setQuery(query_string)
-        sparql.setReturnFormat(JSON)
-        result = sparql.query().convert()
-        return result["boolean"]
+        """
+        result_dict = {entity_id: False for entity_id in entity_ids}
+        query_ids = [entity_id for entity_id in result_dict if re.fullmatch(r"Q\d+", entity_id)]
+        for chunk_start in range(0, len(query_ids), chunk_size):
+            chunk_ids = query_ids[chunk_start : chunk_start + chunk_size]
+            bindings = self._query_wikidata_sparql_endpoint(
+                query_string % (" ".join("wd:" + entity_id for entity_id in chunk_ids), filter_string), use_cache
+            )
+            for binding in bindings:
+                result_dict[binding["item"]["value"].rsplit("/", 1)[-1]] = True
+        return result_dict
+
+    def _query_wikidata_sparql_endpoint(self, query: str, use_cache: bool = True) -> List[dict]:
+        return self.sparql_client.select(query, use_cache)
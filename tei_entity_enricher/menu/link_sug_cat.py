@@ -4,6 +4,7 @@ import os
 from tei_entity_enricher.util.helper import (
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     menu_entity_definition,
     menu_link_sug_cat,
     get_listoutput,
@@ -156,7 +157,7 @@ class LinkSugCat:
                     new_lscdict[cur_name].append(False)
                 else:
                     new_lscdict[cur_name][2] = False
-                with open(self.lsc_path, "w+") as f:
+                with atomic_write(self.lsc_path, "w+") as f:
                     json.dump(new_lscdict, f, indent=4)
 
                 st.session_state.lsc_save_message = f"Link Suggestion Category {cur_name} succesfully saved!"
@@ -196,7 +197,7 @@ class LinkSugCat:
             for name in list(self.lscdict.keys()):
                 if name != lsc_name:
                     new_lscdict[name] = self.lscdict[name]
-            with open(self.lsc_path, "w+") as f:
+            with atomic_write(self.lsc_path, "w+") as f:
                 json.dump(new_lscdict, f, indent=4)
 
             st.session_state.lsc_rerun_save_message = f"Link Suggestion Category {lsc_name} succesfully deleted!"
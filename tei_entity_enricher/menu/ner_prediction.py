@@ -30,7 +30,8 @@ from tei_entity_enricher.util.helper import (
     is_accepted_TEI_filename,
     MessageType
 )
-from tei_entity_enricher.util.spacy_lm import lang_dict
+from tei_entity_enricher.util.prediction_pipeline import data_format_json, data_format_options
+from tei_entity_enricher.util.spacy_lm import lang_dict, sentence_split_options, sentence_split_parser
 
 import streamlit as st
 
@@ -54,6 +55,12 @@ class NERPrediction(MenuBase):
 
         if "predict_lang" not in st.session_state:
             st.session_state.predict_lang = "German"
+        if "predict_sentence_split" not in st.session_state:
+            st.session_state.predict_sentence_split = sentence_split_parser
+        if "predict_write_back_processes" not in st.session_state:
+            st.session_state.predict_write_back_processes = 1
+        if "predict_data_format" not in st.session_state:
+            st.session_state.predict_data_format = data_format_json
 
         self._check_list = []
         self._check_warn_list = []
@@ -173,6 +180,24 @@ class NERPrediction(MenuBase):
                 key="predict_lang",
                 help="For Predicting entities the text of the TEI-Files has to be splitted into parts of sentences. For this sentence split you need to choose a language.",
             )
+            st.selectbox(
+                label="Select a method for the split into sentences:",
+                options=sentence_split_options,
+                key="predict_sentence_split",
+                help="The dependency parse uses the whole language model, the statistical sentence segmenter and the rule-based sentencizer are faster.",
+            )
+            st.number_input(
+                "Number of parallel processes for writing the predictions into the TEI-Files",
+                min_value=1,
+                max_value=os.cpu_count() or 1,
+                key="predict_write_back_processes",
+            )
+            st.selectbox(
+                label="Select a format for the intermediate prediction data:",
+                options=data_format_options,
+                key="predict_data_format",
+                help="With JSON-lines the sentences are written and read file by file, so that large TEI corpora do not have to be kept in memory completely.",
+            )
             st.radio(
                 label="Input options",
                 options=tuple(self.predict_conf_tei_input_options.keys()),
@@ -5,6 +5,7 @@ from tei_entity_enricher.util.helper import (
     module_path,
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     menu_entity_definition,
     menu_TEI_read_mapping,
     menu_TEI_write_mapping,
@@ -245,7 +246,7 @@ class NERTaskDef:
             # ntd_definition_dict[self.ntd_attr_entitylist] = self.get_editable_entitylist(self.build_entitylist_key(mode))
             def save_ntd(definition, mode):
                 definition[self.ntd_attr_template] = False
-                with open(
+                with atomic_write(
                     os.path.join(
                         self.ntd_Folder,
                         definition[self.ntd_attr_name].replace(" ", "_") + ".json",
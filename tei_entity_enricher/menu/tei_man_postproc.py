@@ -7,7 +7,7 @@ import tei_entity_enricher.menu.tei_reader as tei_reader
 import tei_entity_enricher.menu.tei_ner_writer_map as tnw_map
 import tei_entity_enricher.menu.tei_ner_map as tnm_map
 import tei_entity_enricher.util.tei_writer as tei_writer
-from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary
+from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary, atomic_write
 from tei_entity_enricher.interface.postprocessing.io import FileReader, FileWriter
 from tei_entity_enricher.util.exceptions import FileNotFound, BadFormat
 import tei_entity_enricher.menu.link_sug_cat as sparql
@@ -606,7 +606,7 @@ class TEIManPP:
                 if self.validate_direct_tei_changes(st.session_state.tmp_ace_el_editor_content):
                     st.info("Don't forget to press CTRL+ENTER to apply the last changes you made before saving!")
                     def save_changes():
-                        with open(file=st.session_state.tmp_direct_change_teifile_save, mode="w", encoding="utf8") as file:
+                        with atomic_write(st.session_state.tmp_direct_change_teifile_save, encoding="utf8") as file:
                             file.write(st.session_state.tmp_ace_el_editor_content)
                         if "tmp_ace_el_editor_content" in st.session_state:
                             del st.session_state["tmp_ace_el_editor_content"]
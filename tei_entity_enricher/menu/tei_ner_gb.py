@@ -1,28 +1,30 @@
 import streamlit as st
-import json
 import os
-import random
-import math
 import shutil
-import traceback
+from collections import Counter
 
 from tei_entity_enricher.util.helper import (
     module_path,
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     menu_TEI_reader_config,
     menu_TEI_read_mapping,
     menu_groundtruth_builder,
     print_st_message,
-    is_accepted_TEI_filename,
     check_folder_for_TEI_Files,
     MessageType,
 )
 import tei_entity_enricher.menu.tei_ner_map as tei_map
 import tei_entity_enricher.menu.tei_reader as tei_reader
 import tei_entity_enricher.menu.ner_task_def as ner_task
-import tei_entity_enricher.util.tei_parser as tp
-from tei_entity_enricher.util.spacy_lm import lang_dict, get_spacy_lm
+import tei_entity_enricher.util.groundtruth_builder as gt_builder
+from tei_entity_enricher.util import json_io
+from tei_entity_enricher.util.parse_cache import get_parse_cache
+from tei_entity_enricher.util.spacy_lm import (
+    lang_dict,
+    sentence_split_options,
+)
 from tei_entity_enricher.util.components import small_dir_selector
 
 
@@ -35,6 +37,7 @@ class TEINERGroundtruthBuilder:
         self.tng_attr_tr = "tr"
         self.tng_attr_tnm = "tnm"
         self.tng_attr_lang = "lang"
+        self.tng_attr_sentence_split = "sentence_split"
         self.tng_attr_ratio = "ratio"
         self.tng_attr_shuffle_type = "shuffle_type"
         self.tng_attr_template = "template"
@@ -43,10 +46,7 @@ class TEINERGroundtruthBuilder:
         self.tng_gt_type_test = "test"
         self.check_one_time_attributes()
 
-        self.shuffle_options_dict = {
-            "Shuffle by TEI File": True,
-            "Shuffle by Sentences": False,
-        }
+        self.shuffle_options_dict = gt_builder.shuffle_options_dict
 
         makedir_if_necessary(self.tng_Folder)
         makedir_if_necessary(self.template_tng_Folder)
@@ -86,7 +86,7 @@ class TEINERGroundtruthBuilder:
                         os.path.basename(gt_folder) + ".json",
                     )
                 ) as f:
-                    self.tnglist.append(json.load(f))
+                    self.tnglist.append(json_io.load(f))
         for gt_folder in sorted(os.listdir(self.tng_Folder)):
             if os.path.isdir(os.path.join(self.tng_Folder, gt_folder)) and os.path.isfile(
                 os.path.join(self.tng_Folder, gt_folder, os.path.basename(gt_folder) + ".json")
@@ -98,7 +98,7 @@ class TEINERGroundtruthBuilder:
                         os.path.basename(gt_folder) + ".json",
                     )
                 ) as f:
-                    self.tnglist.append(json.load(f))
+                    self.tnglist.append(json_io.load(f))
 
         self.tngdict = {}
         self.editable_tng_names = []
@@ -149,170 +149,23 @@ class TEINERGroundtruthBuilder:
                     val = False
         return val
 
-    def build_groundtruth(self, build_config, folder_path):
-        build_config[self.tng_attr_template] = False
+    def build_groundtruth(self, build_config, folder_path, processes=1, seed=None):
         progressoutput = st.success("Prepare Groundtruth building...")
         save_folder = os.path.join(self.tng_Folder, build_config[self.tng_attr_name].replace(" ", "_"))
-        makedir_if_necessary(save_folder)
-        save_test_folder = os.path.join(save_folder, self.tng_gt_type_test)
-        makedir_if_necessary(save_test_folder)
-        save_dev_folder = os.path.join(save_folder, self.tng_gt_type_dev)
-        makedir_if_necessary(save_dev_folder)
-        save_train_folder = os.path.join(save_folder, self.tng_gt_type_train)
-        makedir_if_necessary(save_train_folder)
-
-        nlp = get_spacy_lm(build_config[self.tng_attr_lang])
-        by_file = self.shuffle_options_dict[build_config[self.tng_attr_shuffle_type]]
-        filelist = os.listdir(folder_path)
-        if not by_file:
-            all_data = []
-        else:
-            random.shuffle(filelist)
-
         build_gb_progress_bar = st.progress(0)
-        trainfilelist = []
-        devfilelist = []
-        testfilelist = []
-        for fileindex in range(len(filelist)):
-            if is_accepted_TEI_filename(filelist[fileindex]):
-                progressoutput.success(f"Process file {filelist[fileindex]}...")
-                try:
-                    brief = tp.TEIFile(
-                        os.path.join(folder_path, filelist[fileindex]),
-                        build_config[self.tng_attr_tr],
-                        entity_dict=build_config[self.tng_attr_tnm][self.tnm.tnm_attr_entity_dict],
-                        nlp=nlp,
-                        with_position_tags=True,
-                    )
-                except Exception as ex:
-                    error_stack = (
-                        " \n \n"
-                        + f"{repr(ex)}"
-                        + "\n \n"
-                        + "\n".join(traceback.TracebackException.from_exception(ex).format())
-                    )
-                    st.error(
-                        f"Groundtruth Building stopped: The Following error occurs, when trying to process TEI-File {filelist[fileindex]} : {error_stack}"
-                    )
-                    return
-
-                raw_ner_data = tp.split_into_sentences(brief.build_tagged_text_line_list())
-                if not by_file:
-                    all_data.extend(raw_ner_data)
-                else:
-                    if fileindex <= (build_config[self.tng_attr_ratio][self.tng_gt_type_test] / 100.0) * len(filelist):
-                        testfilepath = os.path.join(save_test_folder, filelist[fileindex] + ".json")
-                        testfilelist.append(testfilepath + "\n")
-                        with open(
-                            testfilepath,
-                            "w+",
-                        ) as g:
-                            json.dump(raw_ner_data, g)
-                    elif fileindex <= (
-                        (
-                            build_config[self.tng_attr_ratio][self.tng_gt_type_test]
-                            + build_config[self.tng_attr_ratio][self.tng_gt_type_dev]
-                        )
-                        / 100.0
-                    ) * len(filelist):
-                        devfilepath = os.path.join(save_dev_folder, filelist[fileindex] + ".json")
-                        devfilelist.append(devfilepath + "\n")
-                        with open(
-                            devfilepath,
-                            "w+",
-                        ) as g:
-                            json.dump(raw_ner_data, g)
-                    else:
-                        trainfilepath = os.path.join(save_train_folder, filelist[fileindex] + ".json")
-                        trainfilelist.append(trainfilepath + "\n")
-                        with open(
-                            trainfilepath,
-                            "w+",
-                        ) as g:
-                            json.dump(raw_ner_data, g)
-            build_gb_progress_bar.progress(math.floor((fileindex + 1) / len(filelist) * 100))
-        if not by_file:
-            progressoutput.success("Shuffle and save the data...")
-            random.shuffle(all_data)
-            test_list = []
-            dev_list = []
-            train_list = []
-            for data_index in range(len(all_data)):
-                if data_index <= (build_config[self.tng_attr_ratio][self.tng_gt_type_test] / 100.0) * len(all_data):
-                    test_list.append(all_data[data_index])
-                elif data_index <= (
-                    (
-                        build_config[self.tng_attr_ratio][self.tng_gt_type_test]
-                        + build_config[self.tng_attr_ratio][self.tng_gt_type_dev]
-                    )
-                    / 100.0
-                ) * len(all_data):
-                    dev_list.append(all_data[data_index])
-                else:
-                    train_list.append(all_data[data_index])
-            testfilepath = os.path.join(
-                save_test_folder,
-                self.tng_gt_type_test + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".json",
-            )
-            testfilelist.append(testfilepath + "\n")
-            with open(
-                testfilepath,
-                "w+",
-            ) as g:
-                json.dump(test_list, g)
-            devfilepath = os.path.join(
-                save_dev_folder,
-                self.tng_gt_type_dev + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".json",
-            )
-            devfilelist.append(devfilepath + "\n")
-            with open(
-                devfilepath,
-                "w+",
-            ) as g2:
-                json.dump(dev_list, g2)
-            trainfilepath = os.path.join(
-                save_train_folder,
-                self.tng_gt_type_train + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".json",
-            )
-            trainfilelist.append(trainfilepath + "\n")
-            with open(
-                trainfilepath,
-                "w+",
-            ) as h:
-                json.dump(train_list, h)
-        with open(
-            os.path.join(
-                save_folder,
-                build_config[self.tng_attr_name].replace(" ", "_") + ".json",
-            ),
-            "w+",
-        ) as h2:
-            json.dump(build_config, h2)
-        with open(
-            os.path.join(
-                save_folder,
-                self.tng_gt_type_test + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".lst",
-            ),
-            "w+",
-        ) as htest:
-            htest.writelines(testfilelist)
-        with open(
-            os.path.join(
-                save_folder,
-                self.tng_gt_type_dev + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".lst",
-            ),
-            "w+",
-        ) as hdev:
-            hdev.writelines(devfilelist)
-        with open(
-            os.path.join(
-                save_folder,
-                self.tng_gt_type_train + "_" + build_config[self.tng_attr_name].replace(" ", "_") + ".lst",
-            ),
-            "w+",
-        ) as htrain:
-            htrain.writelines(trainfilelist)
-        progressoutput.success(f"Groundtruth {build_config[self.tng_attr_name]} succesfully built.")
+        error = gt_builder.build_groundtruth(
+            build_config,
+            folder_path,
+            save_folder,
+            processes=processes,
+            seed=seed,
+            parse_cache=get_parse_cache(),
+            message_callback=progressoutput.success,
+            progress_callback=build_gb_progress_bar.progress,
+        )
+        if error is not None:
+            st.error(error)
+            return
         st.write(f"Statistics for {build_config[self.tng_attr_name]}")
         self.show_statistics_to_saved_groundtruth(
             save_folder,
@@ -356,17 +209,12 @@ class TEINERGroundtruthBuilder:
         return tablestring
 
     def build_ner_statistics(self, directory):
-        tag_collect = {}
+        tag_collect = Counter()
         for filename in os.listdir(directory):
             if filename.endswith(".json"):
-                with open(os.path.join(directory, filename)) as f:
-                    training_data = json.load(f)
-                for i in range(len(training_data)):
-                    for j in range(len(training_data[i])):
-                        if training_data[i][j][1] in tag_collect.keys():
-                            tag_collect[training_data[i][j][1]] += 1
-                        else:
-                            tag_collect[training_data[i][j][1]] = 1
+                with open(os.path.join(directory, filename), "rb") as f:
+                    training_data = json_io.load(f)
+                tag_collect.update(word[1] for sentence in training_data for word in sentence)
         return {k: v for k, v in sorted(tag_collect.items(), key=lambda item: item[1])}
 
     def show_statistics_to_saved_groundtruth(self, directory, entity_list):
@@ -398,6 +246,14 @@ class TEINERGroundtruthBuilder:
             )
             if "tng_lang" in st.session_state:
                 tng_dict[self.tng_attr_lang] = st.session_state.tng_lang
+            st.selectbox(
+                label="Select a method for the split into sentences:",
+                options=sentence_split_options,
+                key="tng_sentence_split",
+                help="The dependency parse uses the whole language model, the statistical sentence segmenter and the rule-based sentencizer are faster.",
+            )
+            if "tng_sentence_split" in st.session_state:
+                tng_dict[self.tng_attr_sentence_split] = st.session_state.tng_sentence_split
         with col2:
             st.selectbox(
                 label=f"Select a {menu_TEI_reader_config} for Building the groundtruth:",
@@ -464,9 +320,19 @@ class TEINERGroundtruthBuilder:
             self.tng_gt_type_dev: st.session_state.tng_dev_percentage,
             self.tng_gt_type_test: st.session_state.tng_test_percentage,
         }
+        st.number_input(
+            "Number of parallel processes",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            key="tng_processes",
+            help="The TEI-Files are parsed and splitted into sentences in parallel processes, each of which loads its own language model.",
+        )
         if st.button("Build Groundtruth"):
             if self.validate_build_configuration(tng_dict, st.session_state.tng_teifile_folder):
-                self.build_groundtruth(tng_dict, st.session_state.tng_teifile_folder)
+                self.build_groundtruth(
+                    tng_dict, st.session_state.tng_teifile_folder, processes=st.session_state.tng_processes
+                )
 
     def validate_gt_for_delete(self, groundtruth):
         val = True
@@ -601,7 +467,7 @@ class TEINERGroundtruthBuilder:
                     for filepath in os.listdir(save_train_folder)
                     if filepath.endswith(".json")
                 ]
-                with open(
+                with atomic_write(
                     os.path.join(
                         save_folder,
                         testlistfilepath,
@@ -609,7 +475,7 @@ class TEINERGroundtruthBuilder:
                     "w+",
                 ) as htest:
                     htest.writelines(testfilelist)
-                with open(
+                with atomic_write(
                     os.path.join(
                         save_folder,
                         devlistfilepath,
@@ -617,7 +483,7 @@ class TEINERGroundtruthBuilder:
                     "w+",
                 ) as hdev:
                     hdev.writelines(devfilelist)
-                with open(
+                with atomic_write(
                     os.path.join(
                         save_folder,
                         trainlistfilepath,
@@ -7,6 +7,7 @@ from tei_entity_enricher.util.helper import (
     module_path,
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     transform_arbitrary_text_to_latex,
     latex_color_list,
     menu_entity_definition,
@@ -22,6 +23,7 @@ import tei_entity_enricher.menu.ner_task_def as ner_task
 import tei_entity_enricher.menu.tei_reader as tei_reader
 import tei_entity_enricher.menu.tei_ner_gb as gb
 import tei_entity_enricher.util.tei_parser as tp
+from tei_entity_enricher.util.parse_cache import get_parse_cache
 
 
 class TEINERMap:
@@ -304,7 +306,7 @@ class TEINERMap:
                     del mapping[self.tnm_attr_entity_dict][key]
 
                 mapping[self.tnm_attr_template] = False
-                with open(
+                with atomic_write(
                     os.path.join(
                         self.tnm_Folder,
                         mapping[self.tnm_attr_name].replace(" ", "_") + ".json",
@@ -529,6 +531,7 @@ class TEINERMap:
                         st.session_state.tnm_last_test_dict["teifile"],
                         st.session_state.tnm_last_test_dict["tr"],
                         entity_dict=st.session_state.tnm_last_test_dict["tnm"][self.tnm_attr_entity_dict],
+                        parse_cache=get_parse_cache(),
                     )
                     col1, col2 = st.columns([0.2, 0.8])
                     statistics = tei.get_statistics()
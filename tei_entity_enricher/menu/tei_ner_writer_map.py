@@ -7,6 +7,7 @@ from tei_entity_enricher.util.helper import (
     module_path,
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     get_listoutput,
     transform_arbitrary_text_to_latex,
     latex_color_list,
@@ -315,7 +316,7 @@ class TEINERPredWriteMap:
                     del mapping[self.tnw_attr_entity_dict][key]
 
                 mapping[self.tnw_attr_template] = False
-                with open(
+                with atomic_write(
                     os.path.join(
                         self.tnw_Folder,
                         mapping[self.tnw_attr_name].replace(" ", "_") + ".json",
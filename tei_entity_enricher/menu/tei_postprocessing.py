@@ -53,17 +53,15 @@ def el_editor_content_check(ace_editor_content: str) -> Union[bool, str]:
             return (
                 f"An entity (number: {index + 1}, name: {e['name']}) in editor content is missing a valid 'type' value"
             )
-    # redundancy check
+    # redundancy check: an id must not be assigned to different entities (identical entities are allowed)
     ca_el_redundancy_result = True
+    entities_by_id = {"wikidata_id": {}, "gnd_id": {}}
     for entity in ca.data:
-        data_without_entity = [i for i in ca.data if not (i == entity)]
-        _temp_cache = Cache(data_without_entity)
-        _temp_ca_el_redundancy_result_tuple = _temp_cache.check_for_redundancy(
-            usecase="EntityLibrary", wikidata_id=entity["wikidata_id"], gnd_id=entity["gnd_id"]
-        )
-        if any(_temp_ca_el_redundancy_result_tuple):
-            ca_el_redundancy_result = False
-            break
+        for id_key in entities_by_id.keys():
+            if entity[id_key] == "":
+                continue
+            if entities_by_id[id_key].setdefault(entity[id_key], entity) != entity:
+                ca_el_redundancy_result = False
     if ca_el_redundancy_result == False:
         return "Editor content contains a redundancy issue; a wikidata or gnd id is assigned to more than one entity."
     return True
@@ -425,16 +423,16 @@ class TEINERPostprocessing:
                                         identified_cases, cases_to_choose
                                     ):
                                         for case in identified_cases:
-                                            entity_to_update = self.pp_el_library_object.data[case[1]]
-                                            entity_to_update.update(case[0][0][0])
+                                            self.pp_el_library_object.update_entity(case[1], case[0][0][0])
                                         for index, case in enumerate(cases_to_choose):
                                             description_list = [i["description"] for i in case[0][0]]
                                             description_list.append("-- Select none --")
                                             current_selection_index = description_list.index(selectbox_result[index])
                                             if current_selection_index != len(description_list) - 1:
                                                 # ignore '-- Select none --' selections
-                                                entity_to_update = self.pp_el_library_object.data[case[1]]
-                                                entity_to_update.update(case[0][0][current_selection_index])
+                                                self.pp_el_library_object.update_entity(
+                                                    case[1], case[0][0][current_selection_index]
+                                                )
                                         del st.session_state["pp_last_pressed_button"]
                                         if "pp_ace_el_editor_content" in st.session_state:
                                             del st.session_state["pp_ace_el_editor_content"]
@@ -502,10 +500,10 @@ class TEINERPostprocessing:
             if self.pp_el_library_object.data_file is not None:
                 self.el_add_entities_from_file_loader_file_list = self.el_add_entities_from_file_loader_placeholder.file_uploader(
                     label="Add entities from file",
-                    type=["json", "csv"],
+                    type=["json", "csv", "tsv"],
                     accept_multiple_files=True,
                     key=None,
-                    help="Use json or csv files to add entities to the loaded library. Importing multiple files at once is possible, see the documentation for file structure requirements.",
+                    help="Use json, csv or tsv files to add entities to the loaded library. Importing multiple files at once is possible, see the documentation for file structure requirements.",
                 )
                 if len(self.el_add_entities_from_file_loader_file_list) > 0:
 
@@ -524,8 +522,10 @@ class TEINERPostprocessing:
                                 )
                             else:
                                 result_messages.append(
-                                    f"{uploaded_file.name}: {el_add_entities_from_file_single_file_result[0]} entity/ies successfully added to entity library. {el_add_entities_from_file_single_file_result[1]} entity/ies ignored due to redundance issues."
+                                    f"{uploaded_file.name}: {el_add_entities_from_file_single_file_result[0]} entity/ies successfully added to entity library. {el_add_entities_from_file_single_file_result[1]} entity/ies ignored due to structure or redundance issues."
                                 )
+                            for position, _, reason in self.pp_el_library_object.rejected_entities[:10]:
+                                result_messages.append(f"{uploaded_file.name}: entity {position + 1} ignored, {reason}.")
                             with self.el_add_entities_from_file_success_message_placeholder.container():
                                 st.session_state.pp_el_add_from_file_message_list = []
                                 for message in result_messages:
@@ -16,6 +16,7 @@ from tei_entity_enricher.util.helper import (
     module_path,
     local_save_path,
     makedir_if_necessary,
+    atomic_write,
     menu_TEI_reader_config,
 )
 import tei_entity_enricher.menu.tei_ner_gb as gb
@@ -231,7 +232,7 @@ class TEIReader:
 
             def save_config(config):
                 config[self.tr_config_attr_template] = False
-                with open(
+                with atomic_write(
                     os.path.join(
                         self.config_Folder,
                         config[self.tr_config_attr_name].replace(" ", "_") + ".json",
@@ -0,0 +1,184 @@
+"""Headless n-tee: builds groundtruths, predicts TEI-Files and writes predictions back without the Streamlit app.
+
+Every subcommand reads its settings from a config JSON. Entries for TEI Reader Configs ("tr"), TEI Read Entity
+Mappings ("tnm") and TEI Write Entity Mappings ("tnw") can be given inline or as path to a JSON file, e.g. one of
+the templates or one of the configs saved by the app.
+
+build-gt: {"name": ..., "lang": "German", "tr": ..., "tnm": ..., "ratio": {"train": 80, "dev": 10, "test": 10},
+           "shuffle_type": "Shuffle by TEI File", "input_folder": ..., optional: "sentence_split", "output_folder",
+           "processes", "seed", "parse_cache"}
+predict: {"model": ..., "input": TEI-File or folder, "output_folder": ..., "lang": "German", "tr": ..., "tnw": ...,
+          optional: "sentence_split", "data_format" ("JSON" or "JSON-lines"), "processes" (for the write-back),
+          "workdir" (directory containing tf2_neiss_nlp, default: current directory), "parse_cache"}
+write-back: {"output_folder": folder of a finished prediction, "tr": ..., "tnw": ...,
+             optional: "processes", "data_format"}
+
+"parse_cache" caches the parse results of the TEI-Files: true for the cache folder of the app or the path of a
+cache folder (default: no cache).
+"resume": true continues an interrupted run of the step with the same config (default: false). All output files are
+written atomically, so existing ones are complete and are not written again: build-gt skips the TEI-Files whose
+groundtruth file exists (only for "Shuffle by TEI File" and with the same "seed"), predict skips a completed
+preprocessing and write-back skips the TEI-Files already written.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import tei_entity_enricher.util.groundtruth_builder as gt_builder
+import tei_entity_enricher.util.parse_cache as parse_cache
+import tei_entity_enricher.util.prediction_pipeline as prediction
+from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary, MessageType
+from tei_entity_enricher.util.spacy_lm import sentence_split_parser
+
+logger = logging.getLogger(__name__)
+
+
+def load_config_entry(value):
+    if isinstance(value, str):
+        with open(value) as f:
+            return json.load(f)
+    return value
+
+
+def get_config_value(config, key, default=None, required=True):
+    if key not in config:
+        if required:
+            raise ValueError(f'The config file does not contain the entry "{key}"!')
+        return default
+    return config[key]
+
+
+def get_parse_cache(config):
+    value = get_config_value(config, "parse_cache", False, required=False)
+    if value is True:
+        return parse_cache.get_parse_cache()
+    if isinstance(value, str):
+        return parse_cache.ParseCache(value)
+    return None
+
+
+def log_progress(percentage):
+    logger.debug(f"{percentage}%")
+
+
+def build_gt(config):
+    build_config = {
+        gt_builder.tng_attr_name: get_config_value(config, gt_builder.tng_attr_name),
+        gt_builder.tng_attr_tr: load_config_entry(get_config_value(config, gt_builder.tng_attr_tr)),
+        gt_builder.tng_attr_tnm: load_config_entry(get_config_value(config, gt_builder.tng_attr_tnm)),
+        gt_builder.tng_attr_lang: get_config_value(config, gt_builder.tng_attr_lang),
+        gt_builder.tng_attr_sentence_split: get_config_value(
+            config, gt_builder.tng_attr_sentence_split, sentence_split_parser, required=False
+        ),
+        gt_builder.tng_attr_ratio: get_config_value(config, gt_builder.tng_attr_ratio),
+        gt_builder.tng_attr_shuffle_type: get_config_value(config, gt_builder.tng_attr_shuffle_type),
+    }
+    output_folder = get_config_value(
+        config,
+        "output_folder",
+        os.path.join(local_save_path, "TNG", build_config[gt_builder.tng_attr_name].replace(" ", "_")),
+        required=False,
+    )
+    return gt_builder.build_groundtruth(
+        build_config,
+        get_config_value(config, "input_folder"),
+        output_folder,
+        processes=get_config_value(config, "processes", 1, required=False),
+        seed=get_config_value(config, "seed", required=False),
+        parse_cache=get_parse_cache(config),
+        resume=get_config_value(config, "resume", False, required=False),
+        message_callback=logger.info,
+        progress_callback=log_progress,
+    )
+
+
+def predict(config):
+    model = get_config_value(config, "model")
+    if not os.path.isdir(model):
+        return "Invalid ner model path!"
+    output_folder = get_config_value(config, "output_folder")
+    makedir_if_necessary(output_folder)
+    data_format = get_config_value(config, "data_format", prediction.data_format_json, required=False)
+    if get_config_value(config, "resume", False, required=False) and prediction.has_preprocessed_data(
+        output_folder, data_format
+    ):
+        logger.info("Skip the preprocessing, it was already completed by an earlier run.")
+    else:
+        error = prediction.preprocess_tei_files(
+            prediction.get_tei_filelist(get_config_value(config, "input")),
+            load_config_entry(get_config_value(config, "tr")),
+            get_config_value(config, "lang"),
+            output_folder,
+            sentence_split=get_config_value(config, "sentence_split", sentence_split_parser, required=False),
+            data_format=data_format,
+            parse_cache=get_parse_cache(config),
+            message_callback=logger.info,
+            progress_callback=log_progress,
+        )
+        if error is not None:
+            return error
+    workdir = get_config_value(config, "workdir", os.getcwd(), required=False)
+    command = prediction.get_prediction_command(
+        workdir, model, os.path.join(output_folder, prediction.data_to_predict_filename), output_folder
+    )
+    logger.info(f"Run prediction: {' '.join(command)}")
+    return_code = subprocess.call(command, cwd=workdir)
+    if return_code != 0:
+        return f"process finished with error code: {return_code}"
+    return write_back(config)
+
+
+def write_back(config):
+    message_type, message = prediction.write_predictions_to_tei_files(
+        get_config_value(config, "output_folder"),
+        load_config_entry(get_config_value(config, "tr")),
+        load_config_entry(get_config_value(config, "tnw")),
+        processes=get_config_value(config, "processes", 1, required=False),
+        data_format=get_config_value(config, "data_format", prediction.data_format_json, required=False),
+        resume=get_config_value(config, "resume", False, required=False),
+        message_callback=logger.info,
+        progress_callback=log_progress,
+    )
+    if message_type == MessageType.error:
+        return message
+    if message_type is not None:
+        logger.warning(message)
+    return None
+
+
+commands = {
+    "build-gt": build_gt,
+    "predict": predict,
+    "write-back": write_back,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Headless n-tee: groundtruth building, prediction and write-back of TEI-Files",
+        epilog=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(commands.keys()), help="the step to run")
+    parser.add_argument("config", help="path to the config JSON of the step")
+    parser.add_argument("--verbose", action="store_true", help="log the progress in percent as well")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level="DEBUG" if args.verbose else "INFO")
+    try:
+        with open(args.config) as f:
+            config = json.load(f)
+        error = commands[args.command](config)
+    except (OSError, ValueError) as ex:
+        error = repr(ex)
+    if error is not None:
+        logger.error(error)
+        return 1
+    logger.info(f"{args.command} succesfully finished.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
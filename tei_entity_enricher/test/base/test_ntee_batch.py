@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from tei_entity_enricher.scripts import ntee_batch
+
+
+class TestNteeBatch(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+
+    def tearDown(self):
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def write_config(self, config):
+        filepath = os.path.join(self.tempdir.name, "config.json")
+        with open(filepath, "w") as f:
+            json.dump(config, f)
+        return filepath
+
+    # tests
+    def test_headless_import(self):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, tei_entity_enricher.scripts.ntee_batch; print('streamlit' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(output.stdout.strip(), "False", "ntee-batch should not import streamlit")
+
+    def test_invalid_configs(self):
+        self.assertEqual(
+            ntee_batch.main(["build-gt", os.path.join(self.tempdir.name, "missing.json")]),
+            1,
+            "a missing config file should lead to exit code 1",
+        )
+        self.assertEqual(
+            ntee_batch.main(["write-back", self.write_config({"output_folder": self.tempdir.name})]),
+            1,
+            "a config without all necessary entries should lead to exit code 1",
+        )
+        self.assertEqual(
+            ntee_batch.main(["predict", self.write_config({"model": os.path.join(self.tempdir.name, "no_model")})]),
+            1,
+            "an invalid model path should lead to exit code 1",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+
+from tei_entity_enricher.interface.postprocessing.connectivity_state import ConnectivityState
+from tei_entity_enricher.interface.postprocessing.gnd_connector import GndConnector
+from tei_entity_enricher.interface.postprocessing.wikidata_connector import WikidataConnector
+from tei_entity_enricher.test.interface.test_postprocessing import test_http_executor
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
+
+
+class StubSparqlWikidataConnector(WikidataConnector):
+    # answers the sparql queries with all queried entities and counts the queries
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.query_count = 0
+
+    def _query_wikidata_sparql_endpoint(self, query, use_cache=True):
+        self.query_count += 1
+        return [{"item": {"type": "uri", "value": "http://www.wikidata.org/entity/Q64"}}]
+
+
+class TestPostprocessingConnectivityState(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        use_temporary_response_cache(self)
+        self.server = test_http_executor.StubApiServer(delay=0)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def get_gnd_connector(self, state, base_urls):
+        con = GndConnector("118540238", 0, False, False, connectivity_state=state)
+        con.apilist = [dict(con.apilist[0], name=f"stub{index}", baseUrl=url) for index, url in enumerate(base_urls)]
+        con.remaining_apis_to_check = [i for i, _ in enumerate(con.apilist)]
+        return con
+
+    def get_wikidata_connector(self, state):
+        con = StubSparqlWikidataConnector(check_connectivity=False, show_printmessages=False, connectivity_state=state)
+        con.wikidata_web_api_baseUrl = self.server.url + "/w/api.php?search={}&language={}&uselang={}&limit={}"
+        return con
+
+    # tests
+    def test_state(self):
+        state = ConnectivityState(ttl=0.2, failure_ttl=0.1)
+        state.set("passed", 1)
+        state.set("failed", -1, passed=False)
+        self.assertEqual((state.get("passed"), state.get("failed"), state.get("unknown")), (1, -1, None))
+        time.sleep(0.15)
+        self.assertEqual((state.get("passed"), state.get("failed")), (1, None), "failures should expire earlier")
+        state.invalidate("passed")
+        self.assertIsNone(state.get("passed"))
+
+    def test_gnd_connector(self):
+        state = ConnectivityState()
+        base_urls = [self.server.url + "/unknown/{}", self.server.url + "/gnd/{}"]
+        con = self.get_gnd_connector(state, base_urls)
+        self.assertEqual(con.connectivitycheck_loop(), 0)
+        self.assertEqual((con.apiindex, len(self.server.request_times)), (1, 2))
+        for _ in range(3):
+            other_con = self.get_gnd_connector(state, base_urls)
+            self.assertEqual(other_con.connectivitycheck_loop(), 0)
+            self.assertEqual((other_con.apiindex, other_con.connection_established), (1, True))
+        self.assertEqual(len(self.server.request_times), 2, "the apis should not be checked again")
+        failing_urls = [self.server.url + "/unknown/{}"]
+        self.assertEqual(self.get_gnd_connector(state, failing_urls).connectivitycheck_loop(), -1)
+        con = self.get_gnd_connector(state, failing_urls)
+        self.assertEqual(con.connectivitycheck_loop(), -1)
+        self.assertFalse(con.connection_established)
+        self.assertEqual(len(self.server.request_times), 3, "failed checks should be reused too")
+
+    def test_wikidata_connector(self):
+        state = ConnectivityState()
+        con = self.get_wikidata_connector(state)
+        for _ in range(3):
+            self.assertEqual(con.connectivity_check(), 0)
+            self.assertTrue(con.connection_established)
+        other_con = self.get_wikidata_connector(state)
+        self.assertEqual(other_con.connectivity_check(), 0)
+        self.assertEqual((len(self.server.request_times), con.query_count, other_con.query_count), (1, 1, 0))
+        state.invalidate()
+        self.assertEqual(other_con.connectivity_check(), 0)
+        self.assertEqual((len(self.server.request_times), other_con.query_count), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
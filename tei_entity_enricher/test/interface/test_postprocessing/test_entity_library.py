@@ -1,13 +1,43 @@
+import csv
+import os
+import re
 import unittest
 import tempfile
+from unittest import mock
 from tei_entity_enricher.interface.postprocessing.entity_library import EntityLibrary
+from tei_entity_enricher.interface.postprocessing.entity_library_journal import EntityLibraryJournal
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
 
 # todo: complete
 
 
+class RecordingEntityLibrary(EntityLibrary):
+    # answers the sparql queries with the triples of wikidata_triples and records the queries
+    def __init__(self, wikidata_triples, **kwargs):
+        super().__init__(**kwargs)
+        self.wikidata_triples = wikidata_triples
+        self.queries = []
+
+    def _query_wikidata_sparql_endpoint(self, query):
+        self.queries.append(query)
+        items = re.search(r"VALUES \?item {([^}]*)}", query).group(1).split()
+        fields = re.findall(r"\((\d+) (\S+)\)", query)
+        return [
+            {
+                "item": {"type": "uri", "value": "http://www.wikidata.org/entity/" + item[3:]},
+                "field": {"type": "literal", "value": field},
+                "value": {"type": "literal", "value": value},
+            }
+            for item in items
+            for field, property in fields
+            for value in self.wikidata_triples.get((item[3:], property), [])
+        ]
+
+
 class TestPostprocessingEntityLibrary(unittest.TestCase):
     # auxiliaries
     def setUp(self):
+        use_temporary_response_cache(self)
         self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
 
     def tearDown(self):
@@ -109,3 +139,230 @@ class TestPostprocessingEntityLibrary(unittest.TestCase):
                 str,
                 "a string with an error should be returned because the passed gnd_id is already assigned to an entity in entity library",
             )
+
+    def test_EntityLibrary_find_entities(self):
+        def get_entity(name, further_names, type, wikidata_id=""):
+            return {
+                "name": name,
+                "furtherNames": further_names,
+                "type": type,
+                "description": "",
+                "wikidata_id": wikidata_id,
+                "gnd_id": "",
+                "furtherIds": {},
+            }
+
+        def find_by_scan(data, searchstring, type=None):
+            return [
+                entity
+                for entity in data
+                if (type is None or entity["type"] == type)
+                and any(searchstring.lower() in name.lower() for name in [entity["name"]] + entity["furtherNames"])
+            ]
+
+        el = EntityLibrary(show_printmessages=False)
+        el.data = [
+            get_entity("Berlin", ["Berlin-Mitte", "Bärlin"], "place"),
+            get_entity("Herwarth Walden", ["Georg Lewin", "Walden, Herwarth"], "person"),
+            get_entity("Nell Walden", [], "person"),
+            get_entity("Der Sturm", ["Sturm"], "organisation"),
+            get_entity("Walden", [], "place"),
+            get_entity("BERLINER SECESSION", ["Secession"], "organisation"),
+        ]
+        searchstrings = ["Berlin", "berLIN", "Walden", "alden, H", "in", "e", "", "Sturm", "xyz", "n-M", "ärl"]
+        for searchstring in searchstrings:
+            for type in [None, "place", "person", "organisation", "unknown"]:
+                self.assertEqual(
+                    el.find_entities(searchstring, type),
+                    find_by_scan(el.data, searchstring, type),
+                    f"find_entities() should find the same entities as a scan for {searchstring} ({type})",
+                )
+        el.add_entities([get_entity("Franz Marc", ["Marc, Franz"], "person", "Q44054")])
+        el.update_entity(2, {"furtherNames": ["Nell Roslund"]})
+        for searchstring in ["Franz", "Roslund", "Walden"]:
+            self.assertEqual(
+                el.find_entities(searchstring, "person"),
+                find_by_scan(el.data, searchstring, "person"),
+                f"added and updated entities should be found for {searchstring}",
+            )
+        el.data = [get_entity("Dresden", [], "place")]
+        self.assertEqual(el.find_entities("Berlin"), [], "a new data list should be indexed again")
+        self.assertEqual(el.find_entities("dresden", "place"), el.data)
+
+    def test_EntityLibrary_add_entities_in_bulk(self):
+        def get_entity(name, wikidata_id="", gnd_id=""):
+            return {
+                "name": name,
+                "furtherNames": [],
+                "type": "person",
+                "description": "",
+                "wikidata_id": wikidata_id,
+                "gnd_id": gnd_id,
+                "furtherIds": {},
+            }
+
+        el = EntityLibrary(show_printmessages=False)
+        el.data = [get_entity("Herwarth Walden", "Q88934", "118629662")]
+        data = [get_entity(f"Person {number}", f"Q{number}", str(number)) for number in range(1000)]
+        data[10]["furtherNames"] = "Person"
+        data[20]["wikidata_id"] = "Q88934"
+        data[30]["gnd_id"] = "5"
+        data[40]["unknown_key"] = ""
+        data.append(get_entity("Nell Walden"))
+        data.append(get_entity("Nell Walden"))
+        added_entities_amount, rejected_entities = el.add_entities_in_bulk(iter(data))
+        self.assertEqual(added_entities_amount, 998)
+        self.assertEqual(
+            [(position, reason) for position, _, reason in rejected_entities],
+            [
+                (10, "furtherNames value is not a list"),
+                (20, "wikidata_id Q88934 is already assigned to an entity in entity library"),
+                (30, "gnd_id 5 is already assigned to entity 6"),
+                (40, "unexpected key 'unknown_key'"),
+            ],
+        )
+        self.assertEqual(len(el.data), 999, "entities without ids should not be rejected")
+        self.assertEqual(el.find_entities("Person 999"), [data[999]], "added entities should be indexed")
+        _, rejected_entities = el.add_entities_in_bulk([get_entity("Person", "Q999")])
+        self.assertEqual(rejected_entities[0][2], "wikidata_id Q999 is already assigned to an entity in entity library")
+        self.assertEqual(
+            el.add_entities([get_entity("Franz Marc", "Q44054"), get_entity("Marc", "Q44054")]),
+            (1, 1),
+            "add_entities() should reject duplicates in the added data too",
+        )
+
+    def test_EntityLibrary_add_entities_from_file(self):
+        csv_filepath = os.path.join(self.tempdir.name, "entities.csv")
+        with open(csv_filepath, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "Type", "Wikidata_id", "GND_id", "Description", "FurtherNames\\0"])
+            for number in range(25):
+                writer.writerow([f"Person {number}", "person", f"Q{number % 20}", "", "", f"P. {number}"])
+            # a row with more fields than the header row
+            writer.writerow(["Person 25", "person", "Q25", "", "", "P. 25", "Pers. 25"])
+            writer.writerow(["Person 26", "person", "Q26", "", "", "P. 26"])
+        el = EntityLibrary(show_printmessages=False)
+        el.data = []
+        self.assertEqual(el.add_entities_from_file(csv_filepath, chunk_size=7), (21, 6))
+        self.assertEqual(el.data[3]["furtherNames"], ["P. 3"])
+        self.assertEqual(el.data[-1]["name"], "Person 26", "the rows after an invalid row should be imported")
+        self.assertEqual(el.rejected_entities[-1][2], "unexpected key 'fields without column'")
+        self.assertEqual(
+            el.rejected_entities[0][2],
+            "wikidata_id Q0 is already assigned to entity 1",
+            "duplicates in previous chunks should be found",
+        )
+        self.assertIsNone(el.add_entities_from_file(csv_filepath + ".missing"))
+        self.assertEqual(el.rejected_entities, [])
+
+    def test_EntityLibrary_save_library_journal(self):
+        data_file = os.path.join(self.tempdir.name, "entity_library.json")
+        journal_file = data_file + ".journal"
+        el = EntityLibrary(data_file=data_file, show_printmessages=False)
+        with open(data_file, "rb") as f:
+            library_file_content = f.read()
+        entities = [
+            {
+                "name": f"Person {number}",
+                "furtherNames": [],
+                "type": "person",
+                "description": "",
+                "wikidata_id": f"Q{number}",
+                "gnd_id": "",
+                "furtherIds": {},
+            }
+            for number in range(3)
+        ]
+        el.add_entities(entities)
+        el.update_entity(0, {"description": "capital of Germany"})
+        self.assertTrue(el.save_library())
+        with open(data_file, "rb") as f:
+            self.assertEqual(f.read(), library_file_content, "the changes should only be appended to the journal")
+        with open(journal_file, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3, "the stamp of the library file and the two changes expected")
+        # an interrupted append leaves an incomplete last line
+        with open(journal_file, "a", encoding="utf-8") as f:
+            f.write('{"op": "update", "position": 1, "val')
+        el.update_entity(1, {"description": "author"})
+        el.save_library()
+        reloaded_el = EntityLibrary(data_file=data_file, show_printmessages=False)
+        self.assertEqual(reloaded_el.data, el.data, "the journal should be replayed on loading")
+        self.assertEqual(reloaded_el.data[0]["description"], "capital of Germany")
+        self.assertEqual(reloaded_el.find_entities("Person 2"), [reloaded_el.data[3]])
+        self.assertEqual(len(EntityLibrary(data_file=data_file, show_printmessages=False, use_journal=False).data), 1)
+        self.assertTrue(reloaded_el.save_library(compact=True))
+        self.assertFalse(os.path.exists(journal_file), "the journal should be cleared after compaction")
+        self.assertEqual(EntityLibrary(data_file=data_file, show_printmessages=False).data, el.data)
+        reloaded_el.data = reloaded_el.data[:2]
+        reloaded_el.add_entities(entities[2:])
+        reloaded_el.save_library()
+        self.assertFalse(os.path.exists(journal_file), "replaced data should be saved completely")
+        self.assertEqual(len(EntityLibrary(data_file=data_file, show_printmessages=False).data), 3)
+
+    def test_EntityLibrary_save_library_interrupted_compaction(self):
+        data_file = os.path.join(self.tempdir.name, "entity_library.json")
+        journal_file = data_file + ".journal"
+        el = EntityLibrary(data_file=data_file, show_printmessages=False)
+        el.add_entities(
+            [
+                {
+                    "name": "Berlin",
+                    "furtherNames": [],
+                    "type": "place",
+                    "description": "",
+                    "wikidata_id": "Q1",
+                    "gnd_id": "",
+                    "furtherIds": {},
+                }
+            ]
+        )
+        el.save_library()
+        # the process dies after rewriting the library file, but before clearing the journal
+        with mock.patch.object(EntityLibraryJournal, "clear", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                el.save_library(compact=True)
+        self.assertTrue(os.path.exists(journal_file))
+        reloaded_el = EntityLibrary(data_file=data_file, show_printmessages=False)
+        self.assertEqual(
+            [entity["wikidata_id"] for entity in reloaded_el.data],
+            ["", "Q1"],
+            "the journal of the previous library file should not be replayed",
+        )
+        self.assertFalse(os.path.exists(journal_file), "the outdated journal should be moved aside")
+        self.assertTrue(os.path.exists(journal_file + ".old"))
+        reloaded_el.update_entity(1, {"description": "capital of Germany"})
+        reloaded_el.save_library()
+        self.assertEqual(EntityLibrary(data_file=data_file, show_printmessages=False).data, reloaded_el.data)
+
+    def test_EntityLibrary_get_data_of_wikidata_entities(self):
+        wikidata_triples = {
+            ("Q64", "wdt:P227"): ["2004272-3"],
+            ("Q64", "rdfs:label"): ["Berlin", "Berlín"],
+            ("Q64", "skos:altLabel"): ["Berlin", "Berlin, Germany"],
+            ("Q64", "wdt:P1566"): ["2950159", "6547383"],
+            ("Q64", "wdt:P214"): ["122530980"],
+            ("Q1055", "rdfs:label"): ["Hamburg"],
+            ("Q1055", "wdt:P1566"): ["2911298"],
+        }
+        el = RecordingEntityLibrary(wikidata_triples, show_printmessages=False)
+        el.furtherIds_config = {
+            "geonames.com": ["wdt:P1566", "https://www.geonames.org/{}"],
+            "viaf.org": ["wdt:P214", "https://viaf.org/viaf/{}"],
+        }
+        wikidata_ids = ["Q64", "Q1055", "Q2", "Q64", "", "Q1; DROP"] + [f"Q{number}" for number in range(100, 105)]
+        result = el.get_data_of_wikidata_entities(wikidata_ids, chunk_size=3)
+        self.assertEqual(len(el.queries), 3, "the 8 distinct item ids should be queried in chunks of 3")
+        self.assertEqual(set(result.keys()), set(wikidata_ids), "every passed id should have an entry")
+        self.assertEqual(result["Q64"]["gnd_id"], "2004272-3")
+        self.assertEqual(sorted(result["Q64"]["furtherNames"]), ["Berlin", "Berlin, Germany", "Berlín"])
+        self.assertEqual(
+            result["Q64"]["furtherIds"], {"geonames.com": ["2950159", "6547383"], "viaf.org": ["122530980"]}
+        )
+        self.assertEqual(
+            result["Q1055"],
+            {"gnd_id": "", "furtherNames": ["Hamburg"], "furtherIds": {"geonames.com": ["2911298"], "viaf.org": []}},
+        )
+        empty_data = {"gnd_id": "", "furtherNames": [], "furtherIds": {"geonames.com": [], "viaf.org": []}}
+        for wikidata_id in ["Q2", "", "Q1; DROP"]:
+            self.assertEqual(result[wikidata_id], empty_data, f"{wikidata_id} should get empty values")
+        self.assertFalse(any("DROP" in query for query in el.queries), "invalid ids should not be queried")
@@ -1,11 +1,13 @@
 import unittest
 import tempfile
 from tei_entity_enricher.interface.postprocessing.gnd_connector import GndConnector
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
 
 
 class TestPostprocessingGndConnector(unittest.TestCase):
     # auxiliaries
     def setUp(self):
+        use_temporary_response_cache(self)
         self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
 
     def tearDown(self):
@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tei_entity_enricher.interface.postprocessing.gnd_connector import GndConnector
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor
+from tei_entity_enricher.interface.postprocessing.wikidata_connector import WikidataConnector
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
+
+
+class StubApiServer(ThreadingHTTPServer):
+    # answers /gnd/<id> like a gnd api and /w/api.php like the search of wikidata web api after a delay,
+    # records the maximum number of requests, which have been answered at the same time
+    daemon_threads = True
+
+    def __init__(self, delay=0.1):
+        super().__init__(("127.0.0.1", 0), StubApiHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running_requests = 0
+        self.max_running_requests = 0
+        self.request_times = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.running_requests += 1
+            server.max_running_requests = max(server.max_running_requests, server.running_requests)
+            server.request_times.append(time.monotonic())
+        time.sleep(server.delay)
+        url = urlparse(self.path)
+        data = None
+        if url.path.startswith("/gnd/") and url.path != "/gnd/missing":
+            gnd_id = url.path[len("/gnd/") :]
+            data = {"preferredName": f"Name {gnd_id}", "variantName": [f"Variant {gnd_id}"], "@type": "person"}
+        elif url.path == "/w/api.php":
+            search = parse_qs(url.query)["search"][0]
+            data = {
+                "searchinfo": {"search": search},
+                "search": [{"id": f"Q{len(search)}", "label": search, "match": {"text": search}}],
+                "success": 1,
+            }
+        with server.lock:
+            server.running_requests -= 1
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200 if data is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPostprocessingHttpExecutor(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        use_temporary_response_cache(self)
+        self.server = StubApiServer()
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def get_gnd_connector(self, gnd_id, http_executor):
+        con = GndConnector(gnd_id, 0, False, False, http_executor=http_executor)
+        con.apilist = [dict(con.apilist[0], name="stub", baseUrl=self.server.url + "/gnd/{}")]
+        return con
+
+    # tests
+    def test_map(self):
+        executor = HttpExecutor(max_workers=4, max_requests_per_host=2, min_request_interval=0)
+        lock = threading.Lock()
+        running = {"current": 0, "max": 0}
+
+        def request(item):
+            with executor.host_slot(f"http://host{item % 2}.example/{item}"):
+                with lock:
+                    running["current"] += 1
+                    running["max"] = max(running["max"], running["current"])
+                time.sleep(0.05)
+                with lock:
+                    running["current"] -= 1
+            return item * 2
+
+        self.assertEqual(executor.map(request, range(8)), [item * 2 for item in range(8)], "results keep the order")
+        self.assertEqual(running["max"], 4, "2 requests per host should run at the same time")
+        with self.assertRaises(ZeroDivisionError):
+            executor.map(lambda item: 1 / item, [1, 0, 2])
+
+    def test_min_request_interval(self):
+        executor = HttpExecutor(max_workers=4, max_requests_per_host=4, min_request_interval=0.05)
+        self.server.delay = 0
+        self.get_gnd_connector([str(number) for number in range(5)], executor).get_gnd_data()
+        request_times = sorted(self.server.request_times)
+        self.assertGreaterEqual(
+            min(later - earlier for earlier, later in zip(request_times, request_times[1:])),
+            0.04,
+            "the requests to one host should start with the minimal interval",
+        )
+
+    def test_gnd_connector(self):
+        gnd_ids = [str(number) for number in range(10)] + ["missing"]
+        serial_con = self.get_gnd_connector(gnd_ids, HttpExecutor(max_workers=1, min_request_interval=0))
+        start = time.monotonic()
+        serial_result = serial_con.get_gnd_data(["name", "furtherNames"])
+        serial_time = time.monotonic() - start
+        self.assertEqual(self.server.max_running_requests, 1)
+        con = self.get_gnd_connector(
+            gnd_ids, HttpExecutor(max_workers=8, max_requests_per_host=4, min_request_interval=0)
+        )
+        start = time.monotonic()
+        result = con.get_gnd_data(["name", "furtherNames"])
+        concurrent_time = time.monotonic() - start
+        self.assertEqual(result, serial_result, "concurrent requests should deliver the same data")
+        self.assertEqual(list(result.keys()), gnd_ids, "the results should keep the order of the gnd ids")
+        self.assertEqual(result["3"], {"name": "Name 3", "furtherNames": ["Variant 3"]})
+        self.assertEqual(result["missing"], {"name": [], "furtherNames": []})
+        self.assertEqual(self.server.max_running_requests, 4, "4 requests should be sent to the api at the same time")
+        self.assertLess(concurrent_time, serial_time / 2)
+
+    def test_wikidata_connector(self):
+        input = [("Berlin", "place"), ("Franz Marc", "person"), ("Berlin", "place"), ("Der Sturm", "organisation")]
+        con = WikidataConnector(
+            input,
+            False,
+            show_printmessages=False,
+            http_executor=HttpExecutor(max_workers=4, max_requests_per_host=4, min_request_interval=0),
+        )
+        con.wikidata_web_api_baseUrl = self.server.url + "/w/api.php?search={}&language={}&uselang={}&limit={}"
+        result = con.get_wikidata_search_results(filter_for_correct_type=False)
+        self.assertEqual(
+            list(result.keys()), [("Berlin", "place"), ("Franz Marc", "person"), ("Der Sturm", "organisation")]
+        )
+        self.assertEqual(result[("Franz Marc", "person")][0], 1)
+        self.assertEqual(result[("Franz Marc", "person")][1]["search"][0]["id"], "Q10")
+        self.assertEqual(self.server.max_running_requests, 3, "the distinct search strings should be queried at once")
+        con.wikidata_web_api_baseUrl = self.server.url + "/unknown/{}{}{}{}"
+        self.assertFalse(con.get_wikidata_search_results(filter_for_correct_type=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import gzip
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from tei_entity_enricher.interface.postprocessing.http_session import SparqlClient, create_session
+from tei_entity_enricher.interface.postprocessing.io import FileReader
+from tei_entity_enricher.util.exceptions import FileNotFound
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
+
+
+entities_csv = "name;type;wikidata_id;gnd_id;description;furtherNames\\0\r\n" + "".join(
+    f'Person {number};person;Q{number};;"Zeile\r\n{number}";\r\n' for number in range(2000)
+)
+
+
+class StubSparqlHandler(BaseHTTPRequestHandler):
+    # answers /sparql like a sparql endpoint with the length of the query, /flaky with the status 503
+    # for the first request, /data.json with a json object and /entities.csv with a gzip compressed csv file;
+    # records the client ports of the connections
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self, query):
+        server = self.server
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.requests.append((self.command, urlparse(self.path).path))
+        path = urlparse(self.path).path
+        status = 200
+        if path == "/entities.csv":
+            body = gzip.compress(entities_csv.encode("utf-8"))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if path == "/sparql":
+            data = {"head": {"vars": ["length"]}, "results": {"bindings": [{"length": {"value": str(len(query))}}]}}
+        elif path == "/flaky" and server.requests.count(("GET", "/flaky")) == 1:
+            status, data = 503, {}
+        elif path in ["/flaky", "/data.json"]:
+            data = {"name": "Berlin", "user_agent": self.headers.get("User-Agent")}
+        else:
+            status, data = 404, {}
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_request(parse_qs(urlparse(self.path).query).get("query", [""])[0])
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        self.handle_request(parse_qs(body)["query"][0])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPostprocessingHttpSession(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        use_temporary_response_cache(self)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSparqlHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.client_ports = set()
+        self.server.requests = []
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    # tests
+    def test_sparql_client(self):
+        client = SparqlClient(self.url + "/sparql", session=create_session(backoff_factor=0), max_get_length=100)
+        short_query = "SELECT ?length WHERE { }"
+        long_query = "SELECT ?length WHERE { VALUES ?item { " + "wd:Q64 " * 50 + "} }"
+        self.assertEqual(client.select(short_query), [{"length": {"value": str(len(short_query))}}])
+        self.assertEqual(client.select(long_query), [{"length": {"value": str(len(long_query))}}])
+        self.assertEqual(
+            self.server.requests, [("GET", "/sparql"), ("POST", "/sparql")], "long queries should be sent by POST"
+        )
+        self.assertEqual(len(self.server.client_ports), 1, "the queries should use the same connection")
+        with self.assertRaises(requests.HTTPError):
+            SparqlClient(self.url + "/unknown", session=create_session(backoff_factor=0)).select(short_query)
+
+    def test_retries(self):
+        session = create_session(retries=2, backoff_factor=0)
+        response = session.get(self.url + "/flaky")
+        self.assertEqual(response.status_code, 200, "the request should be repeated after the status 503")
+        self.assertEqual(self.server.requests, [("GET", "/flaky"), ("GET", "/flaky")])
+
+    def test_file_reader_web_stream(self):
+        rows = FileReader(filepath=self.url + "/entities.csv", origin="web").iterrows_csv(";")
+        self.assertEqual(
+            next(rows),
+            {
+                "name": "Person 0",
+                "type": "person",
+                "wikidata_id": "Q0",
+                "gnd_id": "",
+                "description": "Zeile\r\n0",
+                "furtherNames": [],
+                "furtherIds": {},
+            },
+            "quoted line breaks should be kept",
+        )
+        self.assertEqual(sum(1 for _ in rows), 1999)
+        rows = FileReader(filepath=self.url + "/entities.csv", origin="web").iterrows_csv(";", False)
+        self.assertEqual(next(rows)[:2], ["name", "type"])
+        rows.close()
+        with self.assertRaises(FileNotFound):
+            next(FileReader(filepath=self.url + "/missing.csv", origin="web").iterrows_csv())
+
+    def test_file_reader_web(self):
+        for _ in range(3):
+            result = FileReader(filepath=self.url + "/data.json", origin="web").loadfile_json()
+            self.assertEqual(result["name"], "Berlin")
+            self.assertIn("Mozilla", result["user_agent"], "the headers of FileReader should be sent")
+        self.assertEqual(len(self.server.client_ports), 1, "FileReader should reuse the connection of the session")
+        with self.assertRaises(FileNotFound):
+            FileReader(filepath=self.url + "/missing.json", origin="web").loadfile_json()
+
+
+if __name__ == "__main__":
+    unittest.main()
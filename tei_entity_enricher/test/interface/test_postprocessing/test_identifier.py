@@ -1,11 +1,13 @@
 import unittest
 import tempfile
 from tei_entity_enricher.interface.postprocessing.identifier import Identifier
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
 
 
 class TestPostprocessingIdentifier(unittest.TestCase):
     # auxiliaries
     def setUp(self):
+        use_temporary_response_cache(self)
         self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
 
     def tearDown(self):
@@ -1,3 +1,4 @@
+import io
 import unittest
 import tempfile
 import os
@@ -7,11 +8,14 @@ from tei_entity_enricher.interface.postprocessing.io import (
     Cache,
 )
 from tei_entity_enricher.util.helper import module_path, local_save_path
+from tei_entity_enricher.util.exceptions import BadFormat, FileNotFound
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
 
 
 class TestPostprocessingIo(unittest.TestCase):
     # auxiliaries
     def setUp(self):
+        use_temporary_response_cache(self)
         self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
 
     def tearDown(self):
@@ -89,6 +93,58 @@ class TestPostprocessingIo(unittest.TestCase):
                     "loadfile_csv() should not return None",
                 )
 
+    def test_FileReader_iterrows_csv(self):
+        csv_filepath = os.path.join(module_path, "util", "csv_file_for_tests.csv")
+        fr = FileReader(filepath=csv_filepath, origin="local", show_printmessages=False)
+        rows = fr.iterrows_csv()
+        self.assertEqual(
+            next(rows),
+            {
+                "name": "Berlin",
+                "type": "place",
+                "wikidata_id": "Q64",
+                "gnd_id": "",
+                "description": "",
+                "furtherNames": ["Stadt an der Spree", "Hauptstadt"],
+                "furtherIds": {},
+            },
+            "iterrows_csv() should yield entity dicts",
+        )
+        self.assertEqual(len(list(rows)), 1, "the remaining row should be yielded")
+        with open(csv_filepath, "rb") as f:
+            uploaded_file = io.BytesIO(f.read())
+        self.assertEqual(FileReader(file=uploaded_file).loadfile_csv(), fr.loadfile_csv())
+        tsv_filepath = os.path.join(self.tempdir.name, "entities.tsv")
+        with open(tsv_filepath, "w", encoding="utf-8") as f:
+            f.write("name\ttype\twikidata_id\tgnd_id\tdescription\tfurtherNames\\0\n")
+            f.write("Kraków\tplace\tQ31487\t\tStadt, Polen\tKrakau\n")
+        self.assertEqual(
+            FileReader(filepath=tsv_filepath, origin="local").loadfile_tsv(),
+            [
+                {
+                    "name": "Kraków",
+                    "type": "place",
+                    "wikidata_id": "Q31487",
+                    "gnd_id": "",
+                    "description": "Stadt, Polen",
+                    "furtherNames": ["Krakau"],
+                    "furtherIds": {},
+                }
+            ],
+        )
+        with self.assertRaises(FileNotFound):
+            next(FileReader(filepath=tsv_filepath + ".missing", origin="local").iterrows_tsv())
+
+    def test_FileReader_iter_gnd_ids_of_beacon(self):
+        fr = FileReader(filepath=os.path.join(module_path, "util", "beacon_file_for_tests.txt"), origin="local")
+        self.assertEqual(
+            list(fr.iter_gnd_ids_of_beacon()),
+            Cache(data=fr.loadfile_beacon(), show_printmessages=False).get_gnd_ids_of_beacon_file(),
+            "the streamed gnd ids should be the same as those of get_gnd_ids_of_beacon_file()",
+        )
+        with self.assertRaises(BadFormat):
+            list(FileReader(file="#FORMAT: BEACON\n118540238|Goethe\n").iter_gnd_ids_of_beacon())
+
     def test_Cache_init(self):
         for fr in self.get_FileReaders():
             if ".json" in fr.filepath:
@@ -117,6 +173,37 @@ class TestPostprocessingIo(unittest.TestCase):
             "any(check_for_redundancy()) should return False",
         )
 
+    def test_Cache_redundancy_check_with_indexes(self):
+        test_list = [
+            {"name": "A", "furtherNames": [], "type": "place", "description": "", "wikidata_id": "Q1", "gnd_id": ""},
+            {"name": "B", "furtherNames": [], "type": "place", "description": "", "wikidata_id": "", "gnd_id": "2"},
+        ]
+        c = Cache(data=test_list, show_printmessages=False)
+        self.assertEqual(c.check_for_redundancy("EntityLibrary", "Q1", "3"), (True, False))
+        self.assertEqual(c.check_for_redundancy("EntityLibrary", "", ""), (False, False), "empty ids are no redundancy")
+        self.assertEqual(c.check_for_redundancy("EntityLibrary", "Q3", "2"), (False, True))
+        test_list.append(dict(test_list[0], wikidata_id="Q3"))
+        self.assertEqual(
+            c.check_for_redundancy("EntityLibrary", "Q3", ""),
+            (True, False),
+            "appended entities should be found without calling index_added_entities()",
+        )
+        test_list[0]["wikidata_id"] = "Q4"
+        c.reset_indexes()
+        self.assertEqual(c.check_for_redundancy("EntityLibrary", "Q1", ""), (False, False))
+        c.data = []
+        self.assertEqual(c.check_for_redundancy("EntityLibrary", "Q4", ""), (False, False))
+        test_dict = {
+            "123": {"name": "Max Mustermann", "types": ["person"]},
+            "456": {"name": "Maxine Musterfrau", "types": ["person", "author"]},
+        }
+        c = Cache(data=test_dict, show_printmessages=False)
+        self.assertEqual(c.check_for_redundancy("GndConnector", None, "789", "types", ["person"]), (False, True))
+        self.assertEqual(c.check_for_redundancy("GndConnector", None, "456", "types", ["author"]), (True, False))
+        test_dict["789"] = {"name": "Erika Mustermann", "types": ["author"]}
+        self.assertEqual(c.check_for_redundancy("GndConnector", None, "000", "name", "Erika Mustermann"), (False, True))
+        self.assertEqual(c.check_for_redundancy("GndConnector", None, "000", "types", ["author"]), (False, True))
+
     def test_Cache_json_stucture_check(self):
         test_dict_true = {
             "123": {"name": "Max Mustermann"},
@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tei_entity_enricher.interface.postprocessing.gnd_connector import GndConnector
+from tei_entity_enricher.interface.postprocessing.http_session import SparqlClient, create_session
+from tei_entity_enricher.interface.postprocessing.io import FileReader
+from tei_entity_enricher.interface.postprocessing.response_cache import ResponseCache
+from tei_entity_enricher.util.exceptions import FileNotFound, NotCached
+
+
+def use_temporary_response_cache(test_case):
+    # lets FileReader and SparqlClient use an empty cache in a temporary dir instead of the shared cache of the user
+    # until the end of the test
+    tempdir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(tempdir.cleanup)
+    cache = ResponseCache(os.path.join(tempdir.name, "response_cache.sqlite"))
+    test_case.addCleanup(cache.close)
+    for module in ["io", "http_session"]:
+        patcher = mock.patch(
+            f"tei_entity_enricher.interface.postprocessing.{module}.get_response_cache", return_value=cache
+        )
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    return cache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # answers /sparql like a sparql endpoint with the query and /data/<name>.json with a json object,
+    # counts the requests
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        url = urlparse(self.path)
+        status = 200
+        if url.path == "/sparql":
+            query = parse_qs(url.query)["query"][0]
+            data = {"head": {"vars": ["query"]}, "results": {"bindings": [{"query": {"value": query}}]}}
+        elif url.path.startswith("/data/"):
+            data = {"name": url.path[len("/data/") : -len(".json")]}
+        else:
+            status, data = 404, {}
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPostprocessingResponseCache(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.request_count = 0
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"http://{self.host}"
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        self.tempdir.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def get_cache(self, **kwargs):
+        settings = {
+            "db_path": os.path.join(self.tempdir.name, "response_cache.sqlite"),
+            "hosts": {self.host: "stub"},
+            "ttls": {"stub": 3600},
+        }
+        settings.update(kwargs)
+        cache = ResponseCache(**settings)
+        self.caches.append(cache)
+        return cache
+
+    def load_json(self, name, cache):
+        return FileReader(filepath=f"{self.url}/data/{name}.json", origin="web", response_cache=cache).loadfile_json()
+
+    # tests
+    def test_file_reader(self):
+        cache = self.get_cache()
+        for _ in range(3):
+            self.assertEqual(self.load_json("Berlin", cache), {"name": "Berlin"})
+        self.assertEqual(self.server.request_count, 1, "repeated loads should be answered by the cache")
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(self.load_json("Berlin", self.get_cache()), {"name": "Berlin"}, "the cache should persist")
+        self.assertEqual(self.server.request_count, 1)
+        with self.assertRaises(FileNotFound):
+            FileReader(filepath=self.url + "/missing.json", origin="web", response_cache=cache).loadfile_json()
+        self.load_json("Berlin", self.get_cache(hosts={}))
+        self.assertEqual(self.server.request_count, 3, "responses of not configured hosts should not be cached")
+
+    def test_local_file_reader(self):
+        filepath = os.path.join(self.tempdir.name, "local.json")
+        with open(filepath, "w") as f:
+            f.write('{"name": "Berlin"}')
+        with mock.patch("tei_entity_enricher.interface.postprocessing.io.get_response_cache") as get_response_cache:
+            self.assertEqual(FileReader(filepath=filepath, origin="local").loadfile_json(), {"name": "Berlin"})
+        self.assertEqual(get_response_cache.call_count, 0, "local files should not need the response cache")
+
+    def test_sparql_client(self):
+        client = SparqlClient(self.url + "/sparql", session=create_session(), response_cache=self.get_cache())
+        query = "SELECT ?item WHERE { VALUES ?item { wd:Q64 } }"
+        for _ in range(2):
+            self.assertEqual(client.select(query), [{"query": {"value": query}}])
+        client.select(query + " LIMIT 1")
+        self.assertEqual(self.server.request_count, 2, "only the unknown query should be sent")
+        client.select(query, use_cache=False)
+        self.assertEqual(self.server.request_count, 3, "queries without cache should always be sent")
+
+    def test_connectivity_check_without_cache(self):
+        cache = self.get_cache()
+        gnd_url = self.url + "/data/{}.json"
+        FileReader(filepath=gnd_url.format("118540238"), origin="web", response_cache=cache).loadfile_json()
+        # the stub server goes offline
+        self.server.shutdown()
+        self.server.server_close()
+        con = GndConnector("118540238", 0, False, False)
+        con.apilist = [dict(con.apilist[0], baseUrl=gnd_url)]
+        with mock.patch("tei_entity_enricher.interface.postprocessing.io.get_response_cache", return_value=cache):
+            self.assertFalse(con.connectivitycheck_single(0), "the check should fail offline despite cached responses")
+
+    def test_ttl_and_cache_only(self):
+        cache = self.get_cache(ttls={"stub": 0.2})
+        self.load_json("Berlin", cache)
+        time.sleep(0.3)
+        self.load_json("Berlin", cache)
+        self.assertEqual(self.server.request_count, 2, "expired responses should be requested again")
+        time.sleep(0.3)
+        offline_cache = self.get_cache(ttls={"stub": 0.2}, cache_only=True)
+        self.assertEqual(self.load_json("Berlin", offline_cache), {"name": "Berlin"}, "expired responses are served")
+        with self.assertRaises(NotCached):
+            self.load_json("Hamburg", offline_cache)
+        self.assertEqual(self.server.request_count, 2, "no requests should be sent in cache-only mode")
+
+    def test_eviction(self):
+        cache = self.get_cache(max_size=50)
+        for name in ["Berlin", "Hamburg", "Bremen"]:
+            self.load_json(name, cache)
+            time.sleep(0.01)
+        self.assertLessEqual(cache.get_size(), 50)
+        self.load_json("Bremen", cache)
+        self.assertEqual(self.server.request_count, 3, "the most recently used response should be kept")
+        self.load_json("Berlin", cache)
+        self.assertEqual(self.server.request_count, 4, "the least recently used response should be removed")
+        self.assertGreater(cache.clear("stub"), 0)
+        self.assertEqual(cache.get_size(), 0)
+
+    def test_eviction_to_low_water_mark(self):
+        cache = self.get_cache(max_size=1000, low_water_ratio=0.8)
+        for _ in range(20):
+            cache.store("stub", "entry", "x" * 98)
+        self.assertEqual(cache._size, cache.get_size(), "replaced responses should not be counted twice")
+        for index in range(10):
+            cache.store("stub", f"entry{index}", "x" * 98)
+        self.assertLessEqual(cache.get_size(), 800, "the responses should be removed down to the low water mark")
+        with mock.patch.object(cache, "_evict", wraps=cache._evict) as evict:
+            cache.store("stub", "entry10", "x" * 98)
+            self.assertEqual(evict.call_count, 0, "not every new response should require an eviction")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,37 @@
+import re
 import unittest
 import tempfile
+from tei_entity_enricher.interface.postprocessing.http_executor import HttpExecutor
+from tei_entity_enricher.interface.postprocessing.http_session import get_sparql_client
 from tei_entity_enricher.interface.postprocessing.wikidata_connector import (
     WikidataConnector,
 )
+from tei_entity_enricher.test.interface.test_postprocessing.test_response_cache import use_temporary_response_cache
+
+
+class RecordingWikidataConnector(WikidataConnector):
+    # answers the sparql queries with the entities of typed_entities, which are of one of the filtered classes,
+    # and records the queries
+    def __init__(self, typed_entities, **kwargs):
+        super().__init__(**kwargs)
+        self.typed_entities = typed_entities
+        self.queries = []
+
+    def _query_wikidata_sparql_endpoint(self, query, use_cache=True):
+        self.queries.append(query)
+        items = re.search(r"VALUES \?item {([^}]*)}", query).group(1).split()
+        classes = re.search(r"FILTER \(\?o IN \(([^)]*)\)\)", query).group(1).split(", ")
+        return [
+            {"item": {"type": "uri", "value": "http://www.wikidata.org/entity/" + item[3:]}}
+            for item in items
+            if self.typed_entities.get(item[3:]) in classes
+        ]
 
 
 class TestPostprocessingWikidataConnector(unittest.TestCase):
     # auxiliaries
     def setUp(self):
+        use_temporary_response_cache(self)
         self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
 
     def tearDown(self):
@@ -62,6 +86,43 @@ class TestPostprocessingWikidataConnector(unittest.TestCase):
                 "from get_wikidata_search_results() returned lists in dict should have an dict value on index 1",
             )
 
+    def test_check_wikidata_entity_types(self):
+        connector = RecordingWikidataConnector(
+            {"Q64": "wd:Q515", "Q1055": "wd:Q27096213", "Q5": "wd:Q5", "Q101": "wd:Q515"},
+            check_connectivity=False,
+            show_printmessages=False,
+        )
+        connector.link_suggestion_categories = {
+            "place": [["Q515", "Q27096213"], "", True],
+            "person": [["Q5"], "", True],
+        }
+        entity_ids = ["Q64", "Q5", "Q1055", "L7", "Q64"] + [f"Q{number}" for number in range(100, 104)]
+        self.assertEqual(
+            connector.check_wikidata_entity_types(entity_ids, "place", chunk_size=4),
+            {
+                "Q64": True,
+                "Q5": False,
+                "Q1055": True,
+                "L7": False,
+                "Q100": False,
+                "Q101": True,
+                "Q102": False,
+                "Q103": False,
+            },
+        )
+        self.assertEqual(len(connector.queries), 2, "the 7 distinct item ids should be queried in chunks of 4")
+        self.assertTrue(connector.check_wikidata_entity_type("Q5", "person"))
+        self.assertFalse(connector.check_wikidata_entity_type("Q64", "person"))
+        self.assertIsNone(connector.check_wikidata_entity_types(entity_ids, "work"), "unknown types return None")
+        self.assertEqual(len(connector.queries), 4)
+
+    def test_sparql_client(self):
+        connector = WikidataConnector(check_connectivity=False, show_printmessages=False)
+        self.assertIs(connector.sparql_client, get_sparql_client(), "the shared sparql client should be used")
+        http_executor = HttpExecutor()
+        connector = WikidataConnector(check_connectivity=False, show_printmessages=False, http_executor=http_executor)
+        self.assertIs(connector.sparql_client.http_executor, http_executor, "the passed executor should be used")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,46 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from tei_entity_enricher.util.helper import atomic_write
+
+
+class TestHelper(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+
+    def tearDown(self):
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def read(self, filepath):
+        with open(filepath, encoding="utf8") as f:
+            return f.read()
+
+    # tests
+    def test_atomic_write(self):
+        filepath = os.path.join(self.tempdir.name, "config.json")
+        with atomic_write(filepath, encoding="utf8") as f:
+            f.write('{"name": "Erste Fassung"}')
+        self.assertEqual(self.read(filepath), '{"name": "Erste Fassung"}')
+        os.chmod(filepath, 0o640)
+        with self.assertRaises(KeyboardInterrupt):
+            with atomic_write(filepath, encoding="utf8") as f:
+                f.write('{"name": "Unterbro')
+                raise KeyboardInterrupt()
+        self.assertEqual(self.read(filepath), '{"name": "Erste Fassung"}', "an interrupted write should change nothing")
+        self.assertEqual(os.listdir(self.tempdir.name), ["config.json"], "the temporary file should be removed")
+        with atomic_write(filepath, backup=True, encoding="utf8") as f:
+            f.write('{"name": "Zweite Fassung"}')
+        self.assertEqual(self.read(filepath), '{"name": "Zweite Fassung"}')
+        self.assertEqual(self.read(filepath + ".bak"), '{"name": "Erste Fassung"}')
+        self.assertEqual(stat.S_IMODE(os.stat(filepath).st_mode), 0o640, "the permissions should be kept")
+        with atomic_write(filepath, "wb", backup=True) as f:
+            f.write(b"{}")
+        self.assertEqual(self.read(filepath + ".bak"), '{"name": "Zweite Fassung"}', "the backup should be rotated")
+        self.assertEqual(sorted(os.listdir(self.tempdir.name)), ["config.json", "config.json.bak"])
+
+
+if __name__ == "__main__":
+    unittest.main()
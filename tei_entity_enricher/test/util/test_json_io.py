@@ -0,0 +1,54 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from tei_entity_enricher.util import json_io
+
+available_backends = [json_io.backend_json] + ([json_io.backend_orjson] if json_io.orjson is not None else [])
+
+
+class TestJsonIo(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+        self.backend = json_io.get_backend()
+
+    def tearDown(self):
+        json_io.set_backend(self.backend)
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def get_data(self):
+        return {
+            "sentences": [[["Herwarth", "B-person"], ["Walden", "I-person"]], [["Bärlin", "B-place"], [".", "O"]]],
+            "statistics": {1: 2.5, "O": 10},
+            "empty": None,
+        }
+
+    # tests
+    def test_backends(self):
+        data = self.get_data()
+        # json encodes non-string keys as strings
+        expected_data = json.loads(json.dumps(data))
+        for backend in available_backends:
+            json_io.set_backend(backend)
+            self.assertEqual(json_io.loads(json_io.dumps(data)), expected_data, f"{backend} dumps/loads")
+            for mode, encoding in [("w", "utf-8"), ("w", "latin-1"), ("wb", None)]:
+                filepath = os.path.join(self.tempdir.name, f"{backend}_{mode}_{encoding}.json")
+                with open(filepath, mode, encoding=encoding) as f:
+                    json_io.dump(data, f, indent="\t")
+                with open(filepath, mode.replace("w", "r"), encoding=encoding) as f:
+                    self.assertEqual(json_io.load(f), expected_data, f"{backend} dump/load to {filepath}")
+            self.assertEqual(json_io.dumps([10**30]), f"[{10**30}]", "large integers should be encoded")
+            string_file = io.StringIO()
+            json_io.dump(data, string_file)
+            self.assertEqual(json.loads(string_file.getvalue()), expected_data)
+            with self.assertRaises(ValueError, msg=f"{backend} should raise a ValueError for invalid JSON"):
+                json_io.loads('[["Walden", "I-person"')
+        with self.assertRaises(ValueError):
+            json_io.set_backend("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import spacy
+
+from tei_entity_enricher.test.util.test_tei_parser import tei_documents
+from tei_entity_enricher.util.helper import module_path
+from tei_entity_enricher.util.parse_cache import ParseCache, get_content_hash
+from tei_entity_enricher.util.tei_parser import TEIFile, build_tagged_line_lists
+
+
+class TestParseCache(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+        self.cache_dir = os.path.join(self.tempdir.name, "cache")
+        with open(os.path.join(module_path, "templates", "TR_Configs", "Standard.json")) as f:
+            self.tr_config = json.load(f)
+        with open(os.path.join(module_path, "templates", "TNM", "UJWA_Edition.json")) as f:
+            self.entity_dict = json.load(f)["entity_dict"]
+        self.nlp = spacy.blank("de")
+        self.nlp.add_pipe("sentencizer")
+
+    def tearDown(self):
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def write_tei_file(self, name, content):
+        filepath = os.path.join(self.tempdir.name, name + ".xml")
+        with open(filepath, "w", encoding="utf8") as f:
+            f.write(content)
+        return filepath
+
+    def get_tei_file(self, filepath, parse_cache, entity_dict=None):
+        return TEIFile(
+            filepath,
+            self.tr_config,
+            entity_dict=self.entity_dict if entity_dict is None else entity_dict,
+            nlp=self.nlp,
+            with_position_tags=True,
+            parse_cache=parse_cache,
+        )
+
+    def get_results(self, tei_file):
+        return (
+            tei_file.get_parsed_data(),
+            tei_file.build_tagged_text_line_list(),
+            tei_file.build_tagged_note_line_list(),
+        )
+
+    # tests
+    def test_cached_results(self):
+        filepath = self.write_tei_file("letter", tei_documents["letter"])
+        expected = self.get_results(self.get_tei_file(filepath, None))
+        parse_cache = ParseCache(self.cache_dir)
+        self.assertEqual(self.get_results(self.get_tei_file(filepath, parse_cache)), expected)
+        self.assertEqual((parse_cache.hits, parse_cache.misses), (0, 3), "the first parsing should fill the cache")
+        self.assertEqual(self.get_results(self.get_tei_file(filepath, parse_cache)), expected)
+        self.assertEqual((parse_cache.hits, parse_cache.misses), (3, 3), "the second parsing should use the cache")
+        # other entity mappings and other sentence splits lead to new entries
+        self.get_tei_file(filepath, parse_cache, entity_dict={})
+        self.nlp = spacy.blank("de")
+        self.nlp.add_pipe("sentencizer", config={"punct_chars": ["!"]})
+        self.get_tei_file(filepath, parse_cache).build_tagged_text_line_list()
+        self.assertEqual((parse_cache.hits, parse_cache.misses), (4, 5))
+        tei_files = [self.get_tei_file(filepath, parse_cache)]
+        build_tagged_line_lists(tei_files, self.nlp, use_notes=True)
+        self.assertEqual((parse_cache.hits, parse_cache.misses), (6, 6), "only the notes should be split again")
+
+    def test_invalidate(self):
+        parse_cache = ParseCache(self.cache_dir)
+        filepaths = [self.write_tei_file(name, content) for name, content in tei_documents.items()]
+        for filepath in filepaths:
+            self.get_tei_file(filepath, parse_cache).build_tagged_text_line_list()
+        self.assertEqual(parse_cache.invalidate(filepaths[0]), 2, "the parse results and the sentences are removed")
+        self.assertTrue(
+            all(name.startswith(get_content_hash(filepaths[1])) for name in os.listdir(self.cache_dir)),
+            "only the entries of the other file should be left",
+        )
+        self.assertEqual(parse_cache.clear(), 2)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_lru_eviction(self):
+        parse_cache = ParseCache(self.cache_dir)
+        for index in range(3):
+            parse_cache.store(f"entry{index}", "x" * 100)
+            time.sleep(0.01)
+        self.assertIsNotNone(parse_cache.load("entry0"), "loading should mark entry0 as recently used")
+        parse_cache.max_size = 250
+        parse_cache.store("entry3", "x" * 100)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["entry0.json", "entry3.json"])
+        self.assertLessEqual(parse_cache.get_size(), 250)
+
+    def test_eviction_to_low_water_mark(self):
+        parse_cache = ParseCache(self.cache_dir, max_size=1000, low_water_ratio=0.8)
+        for _ in range(20):
+            parse_cache.store("entry", "x" * 100)
+        self.assertEqual(parse_cache._size, parse_cache.get_size(), "replaced entries should not be counted twice")
+        for index in range(9):
+            parse_cache.store(f"entry{index}", "x" * 100)
+        self.assertLessEqual(parse_cache.get_size(), 800, "the entries should be removed down to the low water mark")
+        with mock.patch.object(parse_cache, "evict", wraps=parse_cache.evict) as evict:
+            parse_cache.store("entry9", "x" * 100)
+            self.assertEqual(evict.call_count, 0, "not every new entry should require an eviction")
+
+    def test_broken_entry(self):
+        filepath = self.write_tei_file("letter", tei_documents["letter"])
+        parse_cache = ParseCache(self.cache_dir)
+        expected = self.get_tei_file(filepath, parse_cache).get_parsed_data()
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "w") as f:
+                f.write('{"text": ')
+        with self.assertLogs("tei_entity_enricher.util.parse_cache", level="WARNING"):
+            self.assertEqual(self.get_tei_file(filepath, parse_cache).get_parsed_data(), expected)
+        self.assertEqual(self.get_tei_file(filepath, parse_cache).get_parsed_data(), expected)
+        self.assertEqual(parse_cache.hits, 1, "the broken entry should be replaced")
+
+
+if __name__ == "__main__":
+    unittest.main()
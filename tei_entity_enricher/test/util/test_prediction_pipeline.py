@@ -0,0 +1,224 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import spacy
+
+import tei_entity_enricher.util.tei_parser as tp
+from tei_entity_enricher.test.util.test_tei_parser import tei_documents
+from tei_entity_enricher.util.helper import module_path, MessageType
+from tei_entity_enricher.util.prediction_pipeline import (
+    _iterate_preprocessed_tei_files,
+    _no_output,
+    _write_preprocessed_data_as_jsonl,
+    data_format_jsonl,
+    data_to_predict_filename,
+    imap_bounded,
+    iterate_json_array,
+    iterate_jsonl,
+    predict_file_dict_filename,
+    predict_file_dict_jsonl_filename,
+    prediction_result_filename,
+    prediction_result_jsonl_filename,
+    write_predictions_to_tei_files,
+)
+
+
+class TestPredictionPipeline(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+        with open(os.path.join(module_path, "templates", "TR_Configs", "Standard.json")) as f:
+            self.tr_config = json.load(f)
+        with open(os.path.join(module_path, "templates", "TNW", "UJWA_Prediction_Writer.json")) as f:
+            self.tnw_config = json.load(f)
+
+    def tearDown(self):
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def get_nlp(self):
+        nlp = spacy.blank("de")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    def prepare_prediction(self, out_dir, broken_files=[]):
+        # uses the sentences of the TEI-Files themselves as prediction results
+        nlp = self.get_nlp()
+        input_dir = os.path.join(self.tempdir.name, "input")
+        os.makedirs(input_dir, exist_ok=True)
+        os.makedirs(out_dir)
+        all_data = []
+        file_dict = {}
+        for index in range(3):
+            for name, content in tei_documents.items():
+                filepath = os.path.join(input_dir, f"{name}{index}.xml")
+                with open(filepath, "w", encoding="utf8") as f:
+                    # TEI_Writer does not support processing instructions inside of the text
+                    f.write(content.replace("<?pi inhalt?>", ""))
+                brief = tp.TEIFile(filepath, self.tr_config, nlp=nlp, with_position_tags=True)
+                file_dict[filepath] = {"begin": len(all_data)}
+                all_data.extend(tp.split_into_sentences(brief.build_tagged_text_line_list()))
+                file_dict[filepath]["end"] = len(all_data)
+                all_data.extend(tp.split_into_sentences(brief.build_tagged_note_line_list()))
+                file_dict[filepath]["note_end"] = len(all_data)
+                if f"{name}{index}" in broken_files:
+                    # the predictions of this file do not match its text anymore
+                    all_data[file_dict[filepath]["begin"]][0][0] = "Unpassend"
+        with open(os.path.join(out_dir, prediction_result_filename), "w") as f:
+            json.dump(all_data, f)
+        with open(os.path.join(out_dir, predict_file_dict_filename), "w") as f:
+            json.dump(file_dict, f)
+        return all_data, file_dict
+
+    def get_output_files(self, out_dir):
+        output = {}
+        for filename in sorted(os.listdir(out_dir)):
+            if filename.endswith(".xml"):
+                with open(os.path.join(out_dir, filename), encoding="utf8") as f:
+                    output[filename] = f.read()
+        return output
+
+    # tests
+    def test_parallel_write_back(self):
+        for broken_files in [[], ["letter1"], ["letter1", "notes_and_strings2"]]:
+            results = []
+            for processes in [1, 3]:
+                out_dir = os.path.join(self.tempdir.name, f"out_{len(broken_files)}_{processes}")
+                self.prepare_prediction(out_dir, broken_files)
+                message = write_predictions_to_tei_files(out_dir, self.tr_config, self.tnw_config, processes=processes)
+                results.append((message, self.get_output_files(out_dir)))
+            self.assertEqual(results[0], results[1], "parallel write back differs from the sequential write back")
+            message_type, message = results[0][0]
+            self.assertEqual(len(results[0][1]), 6 - len(broken_files), "every file without errors should be written")
+            if len(broken_files) == 0:
+                self.assertIsNone(message_type, f"no errors expected, but got: {message}")
+            else:
+                self.assertEqual(message_type, MessageType.warning, "errors in some of the files should be reported")
+                for broken_file in broken_files:
+                    self.assertIn(broken_file + ".xml", message, f"{broken_file} should be reported as failed")
+
+    def test_resume_write_back(self):
+        out_dir = os.path.join(self.tempdir.name, "out")
+        self.prepare_prediction(out_dir)
+        write_predictions_to_tei_files(out_dir, self.tr_config, self.tnw_config)
+        output = self.get_output_files(out_dir)
+        os.remove(os.path.join(out_dir, "letter1.xml"))
+        with open(os.path.join(out_dir, "letter2.xml"), "w", encoding="utf8") as f:
+            f.write("<TEI/>")
+        message_type, message = write_predictions_to_tei_files(out_dir, self.tr_config, self.tnw_config, resume=True)
+        self.assertIsNone(message_type, f"no errors expected, but got: {message}")
+        resumed_output = self.get_output_files(out_dir)
+        self.assertEqual(resumed_output["letter1.xml"], output["letter1.xml"], "missing files should be written")
+        self.assertEqual(resumed_output["letter2.xml"], "<TEI/>", "existing files should be skipped")
+        self.assertEqual(
+            [filename for filename in os.listdir(out_dir) if filename.endswith(".tmp")],
+            [],
+            "no temporary files should be left",
+        )
+
+    def prepare_jsonl_prediction(self, out_dir, filelist):
+        # preprocesses the TEI-Files into JSON-lines and uses the sentences themselves as prediction results
+        os.makedirs(out_dir)
+        results = _iterate_preprocessed_tei_files(filelist, self.tr_config, self.get_nlp(), _no_output, _no_output)
+        self.assertIsNone(
+            _write_preprocessed_data_as_jsonl(filelist, results, out_dir), "preprocessing should not fail"
+        )
+        with open(os.path.join(out_dir, data_to_predict_filename)) as f:
+            return json.load(f)
+
+    def test_jsonl_write_back(self):
+        json_out_dir = os.path.join(self.tempdir.name, "out_json")
+        all_data, file_dict = self.prepare_prediction(json_out_dir)
+        write_predictions_to_tei_files(json_out_dir, self.tr_config, self.tnw_config)
+        expected_output = self.get_output_files(json_out_dir)
+        for pred_filename in [prediction_result_filename, prediction_result_jsonl_filename]:
+            for processes in [1, 3]:
+                out_dir = os.path.join(self.tempdir.name, f"out_{pred_filename}_{processes}")
+                data = self.prepare_jsonl_prediction(out_dir, list(file_dict.keys()))
+                self.assertEqual(data, all_data, "the JSON-lines preprocessing should produce the same input data")
+                self.assertEqual(
+                    {
+                        entry["path"]: {k: entry[k] for k in ["begin", "end", "note_end"]}
+                        for entry in iterate_jsonl(os.path.join(out_dir, predict_file_dict_jsonl_filename))
+                    },
+                    file_dict,
+                    "the JSON-lines file dict should assign the same sentences to the files",
+                )
+                with open(os.path.join(out_dir, pred_filename), "w") as f:
+                    if pred_filename == prediction_result_filename:
+                        json.dump(data, f)
+                    else:
+                        f.writelines(json.dumps({"sentence": sentence}) + "\n" for sentence in data)
+                message = write_predictions_to_tei_files(
+                    out_dir, self.tr_config, self.tnw_config, processes=processes, data_format=data_format_jsonl
+                )
+                self.assertEqual(message, (None, None), f"no errors expected for {pred_filename}")
+                self.assertEqual(
+                    self.get_output_files(out_dir),
+                    expected_output,
+                    f"JSON-lines write back from {pred_filename} differs from the JSON write back",
+                )
+
+    def test_jsonl_write_back_with_missing_sentences(self):
+        all_data, file_dict = self.prepare_prediction(os.path.join(self.tempdir.name, "out_json"))
+        out_dir = os.path.join(self.tempdir.name, "out_jsonl")
+        data = self.prepare_jsonl_prediction(out_dir, list(file_dict.keys()))
+        with open(os.path.join(out_dir, prediction_result_filename), "w") as f:
+            json.dump(data[: file_dict[list(file_dict.keys())[-1]]["begin"]], f)
+        message_type, message = write_predictions_to_tei_files(
+            out_dir, self.tr_config, self.tnw_config, data_format=data_format_jsonl
+        )
+        self.assertEqual(message_type, MessageType.warning, "the file without prediction results should be reported")
+        self.assertIn(os.path.basename(list(file_dict.keys())[-1]), message)
+        self.assertEqual(len(self.get_output_files(out_dir)), len(file_dict) - 1, "the other files should be written")
+
+    def test_iterate_json_array(self):
+        values = [[["Wien", "B-place"]], 12345, -1.5e3, 'te"xt ] ,', {"a": [1, 2]}, True, None, [], 7]
+        filepath = os.path.join(self.tempdir.name, "array.json")
+        for text in [
+            json.dumps(values),
+            json.dumps(values, indent=4),
+            " [ " + " , ".join(map(json.dumps, values)) + " ] ",
+        ]:
+            with open(filepath, "w") as f:
+                f.write(text)
+            for chunk_size in [1, 2, 7, 1 << 16]:
+                self.assertEqual(
+                    list(iterate_json_array(filepath, chunk_size=chunk_size)),
+                    values,
+                    f"streamed array differs with chunk size {chunk_size}",
+                )
+        with open(filepath, "w") as f:
+            f.write("[]")
+        self.assertEqual(list(iterate_json_array(filepath, chunk_size=1)), [], "empty array expected")
+        for invalid in ["[1, 2", "[1 2]", "{}"]:
+            with open(filepath, "w") as f:
+                f.write(invalid)
+            with self.assertRaises(ValueError, msg=f"{invalid} should be rejected"):
+                list(iterate_json_array(filepath, chunk_size=2))
+
+    def test_imap_bounded(self):
+        consumed_tasks = []
+
+        def tasks():
+            for number in range(20):
+                consumed_tasks.append(number)
+                yield -number
+
+        with multiprocessing.Pool(processes=2) as pool:
+            for index, result in enumerate(imap_bounded(pool, abs, tasks(), 4)):
+                self.assertEqual(result, index, "the results should be yielded in the order of the tasks")
+                self.assertLessEqual(
+                    len(consumed_tasks) - (index + 1), 4, "at most 4 tasks should be taken ahead of the results"
+                )
+        self.assertEqual(len(consumed_tasks), 20)
+
+    def test_missing_prediction_results(self):
+        message_type, _ = write_predictions_to_tei_files(self.tempdir.name, self.tr_config, self.tnw_config)
+        self.assertEqual(message_type, MessageType.error, "missing prediction results should be reported as error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+import spacy
+
+from tei_entity_enricher.util.spacy_lm import get_spacy_lm, get_sentence_pipe_names
+
+
+class TestSpacyLm(unittest.TestCase):
+    # tests
+    def test_get_sentence_pipe_names(self):
+        nlp = spacy.blank("de")
+        nlp.add_pipe("sentencizer")
+        nlp.add_pipe("tagger")
+        self.assertEqual(
+            get_sentence_pipe_names(nlp), ["sentencizer"], "only the sentencizer is needed for the sentence split"
+        )
+        nlp = spacy.blank("de")
+        nlp.add_pipe("tok2vec")
+        nlp.add_pipe("tagger")
+        nlp.add_pipe("parser")
+        nlp.add_pipe("ner")
+        self.assertEqual(
+            get_sentence_pipe_names(nlp),
+            ["tok2vec", "parser"],
+            "the parser and its embedding layer are needed for the sentence split",
+        )
+
+    def test_unknown_sentence_split(self):
+        with self.assertRaises(ValueError, msg="an unknown sentence split should be rejected"):
+            get_spacy_lm("German", "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
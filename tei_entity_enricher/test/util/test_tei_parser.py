@@ -0,0 +1,204 @@
+import io
+import json
+import os
+import re
+import tempfile
+import unittest
+
+import spacy
+
+from tei_entity_enricher.util.helper import module_path
+from tei_entity_enricher.util.tei_parser import (
+    TEIFile,
+    assemble_text,
+    build_tagged_line_lists,
+    engine_soup,
+    engine_stream,
+)
+
+tei_documents = {
+    "letter": """<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0">
+  <teiHeader><fileDesc><titleStmt><title>Brief an <persName>Herwarth Walden</persName></title></titleStmt></fileDesc></teiHeader>
+  <text>
+    <body>
+      <div type="letter">
+        <opener><dateline><placeName>Berlin</placeName>, <date when="1912-03-01">1. März 1912</date></dateline>
+        <address><addrLine>Potsdamer Str. 134a</addrLine></address></opener>
+        <p>Lieber <rs type="person" subtype="person">Herr <persName>Walden</persName></rs>,<lb/>ich komme
+        am <date>Montag</date> nach <placeName>Dresden</placeName><!-- Kommentar -->und<pb n="2"/>bleibe dort.
+        <note type="footnote">Gemeint ist <persName>Nell Walden</persName>.<note>verschachtelt</note></note></p>
+        <p>   </p>
+        <closer>Ihr <persName>Franz Marc</persName></closer>
+        <postscript><p>Grüße an <orgName>Der Sturm</orgName>.</p></postscript>
+        <app><lem>richtig</lem><rdg>falsch</rdg></app>
+      </div>
+    </body>
+  </text>
+</TEI>
+""",
+    "notes_and_strings": """<TEI xmlns="http://www.tei-c.org/ns/1.0" xmlns:ex="http://example.org/ns">
+<text>Einleitender Text<!-- c --><note>Randnotiz über <placeName>Wien</placeName></note>
+<rdg>ausgeschlossen</rdg><ex:div ex:type="x"><p xml:id="p1">Text mit <rs type="place">Prag</rs> &amp; mehr<?pi inhalt?></p></ex:div>
+<body><p>Zweiter<lb/>Absatz</p></body></text>
+<text><body><p>Ignoriert</p></body></text>
+</TEI>
+""",
+}
+
+
+class TestTEIParser(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()  # use this dir for tests
+
+    def tearDown(self):
+        self.tempdir.cleanup()  # remove temp dir after all tests of this class are done
+
+    def get_templates(self, config_dir):
+        templates = []
+        template_dir = os.path.join(module_path, "templates", config_dir)
+        for filename in sorted(os.listdir(template_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(template_dir, filename), encoding="utf8") as f:
+                    templates.append(json.load(f))
+        return templates
+
+    def write_tei_file(self, name, content):
+        filepath = os.path.join(self.tempdir.name, name + ".xml")
+        with open(filepath, "w", encoding="utf8") as f:
+            f.write(content)
+        return filepath
+
+    def get_results(self, tei_file):
+        return {
+            "text": tei_file.get_text(),
+            "tagged_text": tei_file.get_tagged_text(),
+            "statistics": tei_file.get_statistics(),
+            "notes": tei_file.get_notes(),
+            "tagged_notes": tei_file.get_tagged_notes(),
+            "note_statistics": tei_file.get_note_statistics(),
+        }
+
+    def get_nlp(self):
+        # blank pipeline with a rule based sentence split, so that no language model has to be downloaded
+        nlp = spacy.blank("de")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    def get_tei_files(self, nlp, with_position_tags):
+        tr_config = self.get_templates("TR_Configs")[0]
+        tnm = self.get_templates("TNM")[-1]
+        return [
+            TEIFile(
+                name,
+                tr_config,
+                entity_dict=tnm["entity_dict"],
+                nlp=nlp,
+                openfile=io.BytesIO(content.encode("utf-8")),
+                with_position_tags=with_position_tags,
+            )
+            for name, content in tei_documents.items()
+        ]
+
+    def assemble_text_by_concatenation(self, element_list):
+        # former implementation of the text assembly in TEIFile._get_text_and_statistics
+        text = ""
+        for element in element_list:
+            text = text + str(element)
+        text = " ".join(re.split(r"\s+", text))
+        return text.replace("<linebreak>", "\n")
+
+    # tests
+    def test_assemble_text(self):
+        element_lists = [
+            [],
+            [" "],
+            ["\n", " ", "\t"],
+            [" Lieber ", " <pers> ", "Herr\n  Walden", " </pers> ", ",", " <linebreak>\n"],
+            ["a", "b ", " c", "  ", "d\xa0\xa0e", " <linebreak>\n", " <linebreak>\n", "f "],
+            ["<line", "break>", "x<linebreak>y"],
+            ["\u2008a\x1c", "\u3000", "b\x0b"],
+        ]
+        for element_list in element_lists:
+            self.assertEqual(
+                assemble_text(element_list),
+                self.assemble_text_by_concatenation(element_list),
+                f"assemble_text differs from the former concatenation for {element_list}",
+            )
+
+    def test_engines_deliver_identical_results(self):
+        for name, content in tei_documents.items():
+            filepath = self.write_tei_file(name, content)
+            for tr_config in self.get_templates("TR_Configs"):
+                for tnm in self.get_templates("TNM"):
+                    soup_results = self.get_results(
+                        TEIFile(filepath, tr_config, entity_dict=tnm["entity_dict"], engine=engine_soup)
+                    )
+                    stream_results = self.get_results(
+                        TEIFile(filepath, tr_config, entity_dict=tnm["entity_dict"], engine=engine_stream)
+                    )
+                    for key in soup_results.keys():
+                        self.assertEqual(
+                            soup_results[key],
+                            stream_results[key],
+                            f"{key} of {name} differs between the engines with TR config {tr_config['name']} and TNM {tnm['name']}",
+                        )
+
+    def test_engines_with_openfile(self):
+        tr_config = self.get_templates("TR_Configs")[0]
+        for name, content in tei_documents.items():
+            openfile = io.BytesIO(content.encode("utf-8"))
+            soup_results = self.get_results(TEIFile(name, tr_config, openfile=openfile, engine=engine_soup))
+            stream_results = self.get_results(TEIFile(name, tr_config, openfile=openfile, engine=engine_stream))
+            self.assertEqual(
+                soup_results, stream_results, f"results of uploaded file {name} differ between the engines"
+            )
+
+    def test_batched_sentence_split(self):
+        nlp = self.get_nlp()
+        for with_position_tags in [False, True]:
+            for tei_file in self.get_tei_files(nlp, with_position_tags):
+                for build_line_list in [tei_file.build_tagged_text_line_list, tei_file.build_tagged_note_line_list]:
+                    line_list = build_line_list(batch_size=None)
+                    self.assertGreater(len(line_list), 0, "line list should not be empty")
+                    self.assertEqual(
+                        build_line_list(batch_size=2),
+                        line_list,
+                        f"batched sentence split differs from the line by line split ({build_line_list.__name__})",
+                    )
+
+    def test_build_tagged_line_lists_of_many_files(self):
+        nlp = self.get_nlp()
+        tei_files = self.get_tei_files(nlp, True)
+        expected = [
+            (
+                tei_file.build_tagged_text_line_list(batch_size=None),
+                tei_file.build_tagged_note_line_list(batch_size=None),
+            )
+            for tei_file in tei_files
+        ]
+        tei_files = self.get_tei_files(nlp, True)
+        build_tagged_line_lists(tei_files, nlp, use_notes=True, batch_size=3)
+        self.assertEqual(
+            [(tei_file.get_tagged_text_line_list(), tei_file.get_tagged_note_line_list()) for tei_file in tei_files],
+            expected,
+            "line lists built for many files at once differ from the line lists built per file",
+        )
+
+    def test_missing_text_tag(self):
+        tr_config = self.get_templates("TR_Configs")[0]
+        filepath = self.write_tei_file("no_text", "<TEI><teiHeader/></TEI>")
+        for engine in [engine_soup, engine_stream]:
+            with self.assertRaises(ValueError, msg=f"engine {engine} should reject a TEI-File without text tag"):
+                TEIFile(filepath, tr_config, engine=engine)
+
+    def test_unknown_engine(self):
+        tr_config = self.get_templates("TR_Configs")[0]
+        filepath = self.write_tei_file("letter", tei_documents["letter"])
+        with self.assertRaises(ValueError, msg="an unknown engine should be rejected"):
+            TEIFile(filepath, tr_config, engine="unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
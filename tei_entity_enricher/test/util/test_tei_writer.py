@@ -0,0 +1,236 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import spacy
+
+import tei_entity_enricher.util.tei_parser as tp
+from tei_entity_enricher.test.util.test_tei_parser import tei_documents
+from tei_entity_enricher.util.helper import module_path
+from tei_entity_enricher.util.tei_writer import (
+    TagNode,
+    TEI_Writer,
+    _TagStructureError,
+    get_full_xml_of_tree_content,
+    get_pure_text_of_tree_element,
+)
+
+# texts of the text tag, for which the tree builders have to deliver identical results
+tree_texts = {
+    "empty": "",
+    "only_text": "Nur Text ohne Tags",
+    "self_closing": '<lb/>Anfang<pb n="2" /><p>Text<lb/></p><milestone unit="x"/>',
+    "nested_same_tags": "<note>a<note>b<note/>c<note>d</note></note>e</note><note>f</note>",
+    "comments": "<p>vor<!-- Kommentar --><hi>mit</hi><!-- a > b --></p><!-- Ende -->",
+    "comment_with_tags": "<p>Text<!-- <p> und </hi> --></p>",
+    "comment_without_space": "<p>Text<!--Kommentar--></p>",
+    "greater_than_in_text": "<p>a > b</p><lb/>",
+    "empty_tags": '<p></p><hi rend="x"></hi>< p>x</ p>',
+    "unclosed_tag": "<p>Text<hi>ohne Ende</p>",
+    "stray_end_tag": "Text</p>",
+}
+
+# texts with crossing tags, which are repaired by the tree builders with swap=True
+crossing_texts = {
+    "end_after_end": "<p>Ein <hi>kursiver <persName>Herr</hi></persName> Walden</p>",
+    "begin_before_begin": "<p><persName><hi>Herr Walden</persName> schreibt</hi></p>",
+    "raw_text_between": "<p><hi>Herr <persName>Walden</hi> aus Berlin</persName></p>",
+    "second_end_missing": "<div><p><hi>a<b>b</hi></p>c</b></div>",
+}
+
+
+class RecursiveTreeTEIWriter(TEI_Writer):
+    # uses only the recursive tree builder
+    def _build_tree(self, text, swap=False):
+        return self._build_subtexttaglist(text, swap=swap)[0]
+
+
+class CharacterAlignmentTEIWriter(TEI_Writer):
+    # aligns the predictions only character by character
+    def _write_textstring(self, *args):
+        return self._write_textstring_by_characters(*args)
+
+
+class TestTEIWriter(unittest.TestCase):
+    # auxiliaries
+    def setUp(self):
+        with open(os.path.join(module_path, "templates", "TR_Configs", "Standard.json")) as f:
+            self.tr_config = json.load(f)
+        with open(os.path.join(module_path, "templates", "TNW", "UJWA_Prediction_Writer.json")) as f:
+            self.tnw_config = json.load(f)
+
+    def get_writer(self, text, **kwargs):
+        tei = "<TEI><text>" + text + "</text></TEI>"
+        return TEI_Writer("test.xml", openfile=io.BytesIO(tei.encode("utf-8")), **kwargs)
+
+    def build_trees(self, writer, text, swap=False):
+        # returns the trees (or the type of the error) of the stack based and of the recursive tree builder
+        results = []
+        for build in [
+            lambda: writer._build_tree(text, swap=swap),
+            lambda: writer._build_subtexttaglist(text, swap=swap)[0],
+        ]:
+            writer._max_id = 0
+            try:
+                results.append((build(), writer._max_id))
+            except ValueError as ex:
+                results.append(type(ex))
+        return results
+
+    # tests
+    def test_tree_builder_parity(self):
+        writer = self.get_writer("")
+        texts = dict(tree_texts)
+        for name, content in tei_documents.items():
+            texts[name] = content[content.find(">", content.find("<text")) + 1 : content.find("</text>")]
+        for name, text in texts.items():
+            for swap in [False, True]:
+                stack_result, recursive_result = self.build_trees(writer, text, swap)
+                self.assertEqual(stack_result, recursive_result, f"tree builders differ for {name} (swap={swap})")
+        writer._max_id = 0
+        tree = writer._build_text_tree_by_stack(texts["letter"])
+        self.assertEqual(get_full_xml_of_tree_content(tree), texts["letter"], "the tree should reproduce the text")
+
+    def test_swap_repair_parity(self):
+        writer = self.get_writer("")
+        for name, text in crossing_texts.items():
+            with self.assertRaises(_TagStructureError, msg=f"crossing tags of {name} should be left to the repair"):
+                writer._build_text_tree_by_stack(text)
+            with self.assertRaises(ValueError, msg=f"crossing tags of {name} should not be accepted without swap"):
+                writer._build_tree(text)
+            stack_result, recursive_result = self.build_trees(writer, text, swap=True)
+            self.assertEqual(stack_result, recursive_result, f"repaired trees differ for {name}")
+
+    def test_writing_predictions_across_tags(self):
+        nlp = spacy.blank("de")
+        nlp.add_pipe("sentencizer")
+        text = (
+            '<TEI><text><body><p>Ein Brief von Fr<hi rend="bold">anz</hi> Marc an Herwarth W<hi>alden</hi>'
+            "<note>Aus <hi>Sindelsdorf</hi>.</note></p><!-- Ende --></body></text></TEI>"
+        )
+        brief = tp.TEIFile(
+            "letter.xml", self.tr_config, nlp=nlp, openfile=io.BytesIO(text.encode("utf-8")), with_position_tags=True
+        )
+        predicted_data = tp.split_into_sentences(brief.build_tagged_text_line_list())
+        predicted_note_data = tp.split_into_sentences(brief.build_tagged_note_line_list())
+        # the predicted persons end inside of a hi tag, so the written tags have to be swapped
+        for sentence in predicted_data + predicted_note_data:
+            for word in sentence:
+                if word[0] in ["Franz", "Herwarth", "Sindelsdorf"]:
+                    word[1] = "B-pers"
+                elif word[0] in ["Marc", "Walden"]:
+                    word[1] = "I-pers"
+        results = []
+        for writer_class in [TEI_Writer, RecursiveTreeTEIWriter]:
+            writer = writer_class(
+                "letter.xml", openfile=io.BytesIO(text.encode("utf-8")), tr=self.tr_config, tnw=self.tnw_config
+            )
+            writer.write_predicted_ner_tags(predicted_data, predicted_note_data)
+            results.append((writer.get_tei_file_string(), writer.get_text_tree()))
+        self.assertEqual(results[0], results[1], "tree builders differ after writing the predictions")
+        self.assertIn(
+            '<persName check="False" type="real">Herwarth W<hi>alden</hi></persName>',
+            results[0][0],
+            "the crossing tags should be repaired",
+        )
+
+    def test_prediction_alignment_parity(self):
+        nlp = spacy.blank("de")
+        nlp.add_pipe("sentencizer")
+        texts = {
+            "entities": "<p>Herwarth&#xA0;Walden &amp; Nell Walden in Berlin&#x2008;Halensee, M&#252;nchen &lt;1912&gt;</p>",
+            "split_words": "<p>Franz M<lb/>arc an Fr<hi>anz</hi> und W<hi>alden</hi><note>Aus <hi>Berlin</hi>.</note></p>",
+            "spaces": "<p>  Franz\n      Marc  -  Berlin </p><p>Berlin</p>",
+        }
+        for name, text in texts.items():
+            tei = "<TEI><text><body>" + text + "</body></text></TEI>"
+            brief = tp.TEIFile(
+                "letter.xml", self.tr_config, nlp=nlp, openfile=io.BytesIO(tei.encode("utf-8")), with_position_tags=True
+            )
+            predicted_data = tp.split_into_sentences(brief.build_tagged_text_line_list())
+            predicted_note_data = tp.split_into_sentences(brief.build_tagged_note_line_list())
+            for sentence in predicted_data + predicted_note_data:
+                for word in sentence:
+                    if word[0] in ["Franz", "Herwarth", "Nell"]:
+                        word[1] = "B-pers"
+                    elif word[0] in ["Marc", "Walden"]:
+                        word[1] = "I-pers"
+                    elif word[0].startswith("Berlin") or word[0].startswith("M&#252;"):
+                        word[1] = "B-city"
+            mismatched_data = json.loads(json.dumps(predicted_data))
+            mismatched_data[0][-1][0] += "x"
+            for data in [predicted_data, mismatched_data]:
+                results = []
+                for writer_class in [TEI_Writer, CharacterAlignmentTEIWriter]:
+                    writer = writer_class(
+                        "letter.xml", openfile=io.BytesIO(tei.encode("utf-8")), tr=self.tr_config, tnw=self.tnw_config
+                    )
+                    try:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            writer.write_predicted_ner_tags(json.loads(json.dumps(data)), predicted_note_data)
+                        results.append(writer.get_tei_file_string())
+                    except ValueError as ex:
+                        results.append(str(ex))
+                self.assertEqual(results[0], results[1], f"the alignments differ for {name}")
+            self.assertNotEqual(results[0], tei, f"the predictions of {name} should be written")
+
+    def test_tag_node_as_dict(self):
+        tag = TagNode("persName", '<persName ref="x">', 7, tagend="</persName>", tagcontent=["Walden"])
+        expected = {
+            "name": "persName",
+            "tagbegin": '<persName ref="x">',
+            "tag_id": "7",
+            "tagend": "</persName>",
+            "tagcontent": ["Walden"],
+        }
+        self.assertEqual(tag, expected, "a TagNode should equal the dict of the tag")
+        self.assertEqual(list(tag.keys()), list(expected.keys()), "the keys should keep the order of the dict")
+        self.assertIsInstance(tag.copy(), dict, "copy should return a plain dict")
+        self.assertEqual(tag.copy(), expected)
+        empty_tag = TagNode("lb", "<lb/>", 8)
+        self.assertEqual(empty_tag, {"name": "lb", "tagbegin": "<lb/>", "tag_id": "8"})
+        self.assertNotIn("tagcontent", empty_tag.keys(), "a tag without content should not have the key tagcontent")
+        self.assertIsNone(empty_tag.get("tagend"))
+        with self.assertRaises(KeyError):
+            empty_tag["tagend"]
+        tag["delete"] = False
+        tag["tagbegin"] = "<persName>"
+        self.assertEqual(tag["delete"], False, "further keys should be stored")
+        self.assertEqual(len(tag), 6)
+        del tag["tagcontent"]
+        del tag["delete"]
+        self.assertEqual(tag, {"name": "persName", "tagbegin": "<persName>", "tag_id": "7", "tagend": "</persName>"})
+        with self.assertRaises(KeyError):
+            del tag["name"]
+
+    def test_manual_changes_of_tags(self):
+        # the steps of the manual postprocessing: search tags, change the copies and include the changes
+        writer = self.get_writer(
+            tree_texts["nested_same_tags"] + "<p>Text mit <hi>Hervorhebung</hi></p>", tr=self.tr_config
+        )
+        matching_tag_list = writer.get_list_of_tags_matching_tag_list([["note", {}], ["hi", {}]], ["a", "b"])
+        self.assertEqual([tag["tag_id"] for tag in matching_tag_list], ["0", "1", "3", "4", "6"])
+        self.assertTrue(all(isinstance(tag, dict) for tag in matching_tag_list), "the found tags should be copies")
+        self.assertEqual(matching_tag_list[-1]["default_sparql_query"], "b")
+        self.assertEqual(
+            get_pure_text_of_tree_element(writer.get_text_tree(), self.tr_config, id_to_mark="6"),
+            "Text mit <marked_id>Hervorhebung</marked_id>",
+        )
+        for tag in matching_tag_list:
+            tag["delete"] = tag["tag_id"] in ["0", "4"]
+            if tag["tag_id"] == "6":
+                tag["name"] = "persName"
+                tag["tagbegin"] = '<persName ref="x">'
+                tag["tagend"] = "</persName>"
+        writer.include_changes_of_tag_list(matching_tag_list)
+        self.assertEqual(
+            writer.get_tei_file_string(),
+            '<TEI><text>a<note>b<note/>c<note>d</note></note>ef<p>Text mit <persName ref="x">Hervorhebung</persName></p>'
+            "</text></TEI>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
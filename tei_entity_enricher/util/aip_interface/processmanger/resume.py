@@ -7,7 +7,7 @@ import streamlit as st
 
 from tei_entity_enricher.util.aip_interface.processmanger.base import ProcessManagerBase
 from tei_entity_enricher.util import config_io
-from tei_entity_enricher.util.helper import remember_cwd
+from tei_entity_enricher.util.helper import remember_cwd, atomic_write
 
 logger = logging.getLogger(__name__)
 ON_POSIX = "posix" in sys.builtin_module_names
@@ -57,6 +57,6 @@ class ResumeProcessManager(ProcessManagerBase):
         self.save_train_params()
 
     def save_train_params(self):
-        with open(os.path.join(self._params.model, "trainer_params.json"), "w") as fp:
+        with atomic_write(os.path.join(self._params.model, "trainer_params.json")) as fp:
             json.dump(self._params.trainer_params_json, fp, indent=2)
         return 0
@@ -2,6 +2,8 @@ import json
 import logging
 import os
 
+from tei_entity_enricher.util.helper import atomic_write
+
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,6 @@ def set_config(config_dict, allow_new=False):
         assert os.path.isfile(
             config_dict["config_path"]
         ), f"No config in path: {config_dict}, make a new config is not allowed in this option"
-    with open(config_dict["config_path"], "w") as fp:
+    with atomic_write(config_dict["config_path"]) as fp:
         json.dump(config_dict, fp, indent=2)
     return 0
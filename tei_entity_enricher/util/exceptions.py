@@ -53,3 +53,21 @@ class FileNotFound(Exception):
 
     def __str__(self):
         return self.message.format(self.caller_class, self.caller_method, self.filepath)
+
+
+class NotCached(Exception):
+    def __init__(
+        self,
+        url: str,
+        caller_class: str,
+        caller_method: str,
+        message: str = "{} {}: response of {} not found in response cache (cache-only mode)",
+    ):
+        self.url = url
+        self.caller_class: str = caller_class
+        self.caller_method: str = caller_method
+        self.message: str = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message.format(self.caller_class, self.caller_method, self.url)
@@ -0,0 +1,216 @@
+import math
+import multiprocessing
+import os
+import random
+import traceback
+
+import tei_entity_enricher.util.tei_parser as tp
+from tei_entity_enricher.util import json_io
+from tei_entity_enricher.util.helper import makedir_if_necessary, is_accepted_TEI_filename, atomic_write
+from tei_entity_enricher.util.spacy_lm import get_spacy_lm, sentence_split_parser
+
+# attributes of a groundtruth build config
+tng_attr_name = "name"
+tng_attr_tr = "tr"
+tng_attr_tnm = "tnm"
+tng_attr_lang = "lang"
+tng_attr_sentence_split = "sentence_split"
+tng_attr_ratio = "ratio"
+tng_attr_shuffle_type = "shuffle_type"
+tng_attr_template = "template"
+tng_gt_type_train = "train"
+tng_gt_type_dev = "dev"
+tng_gt_type_test = "test"
+
+shuffle_options_dict = {
+    "Shuffle by TEI File": True,
+    "Shuffle by Sentences": False,
+}
+
+# state of a worker process, set by _init_worker
+_worker_nlp = None
+_worker_tr_config = None
+_worker_entity_dict = None
+_worker_parse_cache = None
+
+
+def _init_worker(lang, sentence_split, tr_config, entity_dict, parse_cache=None):
+    global _worker_nlp, _worker_tr_config, _worker_entity_dict, _worker_parse_cache
+    _worker_nlp = get_spacy_lm(lang, sentence_split)
+    _worker_tr_config = tr_config
+    _worker_entity_dict = entity_dict
+    _worker_parse_cache = parse_cache
+
+
+def _get_ner_data_of_tei_file(filepath):
+    try:
+        brief = tp.TEIFile(
+            filepath,
+            _worker_tr_config,
+            entity_dict=_worker_entity_dict,
+            nlp=_worker_nlp,
+            with_position_tags=True,
+            parse_cache=_worker_parse_cache,
+        )
+        return filepath, tp.split_into_sentences(brief.build_tagged_text_line_list()), None
+    except Exception as ex:
+        error_stack = (
+            " \n \n" + f"{repr(ex)}" + "\n \n" + "\n".join(traceback.TracebackException.from_exception(ex).format())
+        )
+        return filepath, None, error_stack
+
+
+def iterate_ner_data_of_tei_files(
+    filepath_list, lang, tr_config, entity_dict, sentence_split=sentence_split_parser, processes=1, parse_cache=None
+):
+    """Parses and splits the given TEI-Files into sentences and yields a tuple (filepath, ner_data, error_stack)
+    for every file in the order of filepath_list. With processes > 1 the files are processed concurrently in a
+    process pool, in which every worker loads its own spaCy model. If a file could not be processed ner_data is None
+    and error_stack describes the error, otherwise error_stack is None. With a parse_cache (ParseCache) files
+    already parsed with the same configuration are taken from the cache."""
+    initargs = (lang, sentence_split, tr_config, entity_dict, parse_cache)
+    if processes <= 1 or len(filepath_list) <= 1:
+        _init_worker(*initargs)
+        for filepath in filepath_list:
+            yield _get_ner_data_of_tei_file(filepath)
+    else:
+        with multiprocessing.Pool(
+            processes=min(processes, len(filepath_list)), initializer=_init_worker, initargs=initargs
+        ) as pool:
+            for result in pool.imap(_get_ner_data_of_tei_file, filepath_list):
+                yield result
+
+
+def _no_output(*args):
+    pass
+
+
+def build_groundtruth(
+    build_config,
+    folder_path,
+    save_folder,
+    processes=1,
+    seed=None,
+    parse_cache=None,
+    resume=False,
+    message_callback=_no_output,
+    progress_callback=_no_output,
+):
+    """Builds a groundtruth from the TEI-Files in folder_path into save_folder as described by build_config.
+    With a parse_cache (ParseCache) the parse results of the TEI-Files are cached.
+    All files are written atomically, so that an interrupted build never leaves truncated files. With resume=True
+    and "Shuffle by TEI File" the TEI-Files, whose groundtruth file was already written by an earlier interrupted
+    build, are not processed again (the earlier build has to use the same seed, so that the files are assigned to
+    the same sets).
+    message_callback (str) and progress_callback (percentage as int) are used to report the progress.
+    Returns an error message if the groundtruth building was stopped, otherwise None."""
+    build_config[tng_attr_template] = False
+    gt_name = build_config[tng_attr_name].replace(" ", "_")
+    makedir_if_necessary(save_folder)
+    save_test_folder = os.path.join(save_folder, tng_gt_type_test)
+    makedir_if_necessary(save_test_folder)
+    save_dev_folder = os.path.join(save_folder, tng_gt_type_dev)
+    makedir_if_necessary(save_dev_folder)
+    save_train_folder = os.path.join(save_folder, tng_gt_type_train)
+    makedir_if_necessary(save_train_folder)
+    test_ratio = build_config[tng_attr_ratio][tng_gt_type_test] / 100.0
+    test_dev_ratio = (
+        build_config[tng_attr_ratio][tng_gt_type_test] + build_config[tng_attr_ratio][tng_gt_type_dev]
+    ) / 100.0
+
+    by_file = shuffle_options_dict[build_config[tng_attr_shuffle_type]]
+    # sorted, so that the split into train, dev and test set is reproducible for a given seed
+    filelist = sorted(os.listdir(folder_path))
+    random_generator = random.Random(seed)
+    if not by_file:
+        all_data = []
+    else:
+        random_generator.shuffle(filelist)
+
+    trainfilelist = []
+    devfilelist = []
+    testfilelist = []
+    tei_fileindices = [fileindex for fileindex in range(len(filelist)) if is_accepted_TEI_filename(filelist[fileindex])]
+    # the groundtruth file and the file list of every TEI-File (for "Shuffle by TEI File")
+    output_files = {}
+    if by_file:
+        for fileindex in tei_fileindices:
+            if fileindex <= test_ratio * len(filelist):
+                save_type_folder, type_filelist = save_test_folder, testfilelist
+            elif fileindex <= test_dev_ratio * len(filelist):
+                save_type_folder, type_filelist = save_dev_folder, devfilelist
+            else:
+                save_type_folder, type_filelist = save_train_folder, trainfilelist
+            output_files[fileindex] = (os.path.join(save_type_folder, filelist[fileindex] + ".json"), type_filelist)
+        if resume:
+            fileindices_to_process = []
+            for fileindex in tei_fileindices:
+                filepath, type_filelist = output_files[fileindex]
+                if os.path.isfile(filepath):
+                    type_filelist.append(filepath + "\n")
+                else:
+                    fileindices_to_process.append(fileindex)
+            if len(fileindices_to_process) < len(tei_fileindices):
+                message_callback(
+                    f"Skip {len(tei_fileindices) - len(fileindices_to_process)} TEI-Files already processed in an earlier build..."
+                )
+            tei_fileindices = fileindices_to_process
+    if len(tei_fileindices) > 0:
+        message_callback(f"Process file {filelist[tei_fileindices[0]]}...")
+    results = iterate_ner_data_of_tei_files(
+        [os.path.join(folder_path, filelist[fileindex]) for fileindex in tei_fileindices],
+        build_config[tng_attr_lang],
+        build_config[tng_attr_tr],
+        build_config[tng_attr_tnm]["entity_dict"],
+        sentence_split=build_config.get(tng_attr_sentence_split, sentence_split_parser),
+        processes=processes,
+        parse_cache=parse_cache,
+    )
+    for result_index, (fileindex, (_, raw_ner_data, error_stack)) in enumerate(zip(tei_fileindices, results)):
+        if error_stack is not None:
+            results.close()
+            return f"Groundtruth Building stopped: The Following error occurs, when trying to process TEI-File {filelist[fileindex]} : {error_stack}"
+        if result_index + 1 < len(tei_fileindices):
+            message_callback(f"Process file {filelist[tei_fileindices[result_index + 1]]}...")
+        if not by_file:
+            all_data.extend(raw_ner_data)
+        else:
+            filepath, type_filelist = output_files[fileindex]
+            type_filelist.append(filepath + "\n")
+            with atomic_write(filepath, "w+") as g:
+                json_io.dump(raw_ner_data, g)
+        progress_callback(math.floor((fileindex + 1) / len(filelist) * 100))
+    progress_callback(100)
+    if not by_file:
+        message_callback("Shuffle and save the data...")
+        random_generator.shuffle(all_data)
+        test_list = []
+        dev_list = []
+        train_list = []
+        for data_index in range(len(all_data)):
+            if data_index <= test_ratio * len(all_data):
+                test_list.append(all_data[data_index])
+            elif data_index <= test_dev_ratio * len(all_data):
+                dev_list.append(all_data[data_index])
+            else:
+                train_list.append(all_data[data_index])
+        for save_type_folder, gt_type, data_list, type_filelist in [
+            (save_test_folder, tng_gt_type_test, test_list, testfilelist),
+            (save_dev_folder, tng_gt_type_dev, dev_list, devfilelist),
+            (save_train_folder, tng_gt_type_train, train_list, trainfilelist),
+        ]:
+            filepath = os.path.join(save_type_folder, gt_type + "_" + gt_name + ".json")
+            type_filelist.append(filepath + "\n")
+            with atomic_write(filepath, "w+") as g:
+                json_io.dump(data_list, g)
+    with atomic_write(os.path.join(save_folder, gt_name + ".json"), "w+") as h:
+        json_io.dump(build_config, h)
+    for gt_type, type_filelist in [
+        (tng_gt_type_test, testfilelist),
+        (tng_gt_type_dev, devfilelist),
+        (tng_gt_type_train, trainfilelist),
+    ]:
+        with atomic_write(os.path.join(save_folder, gt_type + "_" + gt_name + ".lst"), "w+") as h:
+            h.writelines(type_filelist)
+    message_callback(f"Groundtruth {build_config[tng_attr_name]} succesfully built.")
+    return None
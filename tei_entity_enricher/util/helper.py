@@ -1,9 +1,11 @@
 import os
 import logging
 import contextlib
-from PIL import Image
+import functools
+import shutil
+import threading
 
-import streamlit as st
+# streamlit is imported in the functions which need it, so that the helpers can be used without the UI
 
 logger = logging.getLogger(__name__)
 module_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -72,6 +74,53 @@ def makedir_if_necessary(directory):
         os.makedirs(directory)
 
 
+@contextlib.contextmanager
+def atomic_write(filepath, mode="w", backup=False, **open_kwargs):
+    """Opens a temporary file next to filepath for writing, which replaces filepath (after flush and fsync) only if
+    the with block is left without an exception, so that an interrupted write never leaves a truncated file.
+    With backup=True the replaced file is kept as filepath + ".bak"."""
+    temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, mode, **open_kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.isfile(filepath):
+            shutil.copymode(filepath, temp_path)
+            if backup:
+                _keep_backup(filepath)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(os.path.dirname(os.path.abspath(filepath)))
+
+
+def _keep_backup(filepath):
+    # the backup is linked (or copied) to a temporary name first, so that filepath exists during the whole rotation
+    temp_backup_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.bak.tmp"
+    try:
+        os.link(filepath, temp_backup_path)
+    except OSError:
+        shutil.copy2(filepath, temp_backup_path)
+    os.replace(temp_backup_path, filepath + ".bak")
+
+
+def _fsync_directory(directory):
+    # makes the rename durable, not possible on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 def transform_xml_to_markdown(xml):
     return "```xml\n" + xml + "\n ```"
 
@@ -109,6 +158,8 @@ def file_lists_entry_widget(list_param: list, name: str, help=None) -> list:
     :param name: the name/unique key of the text input for streamlit
     :return: the list maybe modified by users input
     """
+    import streamlit as st
+
     # train_lists_str = clean_list_str(str(self.trainer_params_json["gen"]["train"]["lists"]))
     lists_str = clean_list_str(str(list_param))
     logger.debug(f"cleaned str: {lists_str}")
@@ -147,6 +198,8 @@ def numbers_lists_entry_widget(
     :param expect_amount: set >0 to activate
     :return: the list maybe modified by users input
     """
+    import streamlit as st
+
     # train_lists_str = clean_list_str(str(self.trainer_params_json["gen"]["train"]["lists"]))
     lists_str = clean_list_str(str(list_param))
     logger.debug(f"cleaned str: {lists_str}")
@@ -194,6 +247,8 @@ def replace_empty_string(input_string, replace_string="-"):
 
 
 def text_entry_with_check(string: str, name: str, check_fn: callable, help=None):
+    import streamlit as st
+
     string_field, string_state = st.columns([10, 1])
     string_field = string_field.text_input(name, value=string, help=help)
     if check_fn(string_field):
@@ -207,6 +262,8 @@ def text_entry_with_check(string: str, name: str, check_fn: callable, help=None)
 
 
 def check_dir_ask_make(dir_string):
+    import streamlit as st
+
     if os.path.isdir(dir_string):
         return True
     else:
@@ -226,6 +283,8 @@ def model_dir_entry_widget(
     ask_make_dir=False,
     help=None,
 ) -> str:
+    import streamlit as st
+
     string_field, string_state = st.columns([10, 1])
     string_field = string_field.text_input(name, value=string_param, help=help)
     ok = True
@@ -268,6 +327,8 @@ def transform_arbitrary_text_to_latex(text):
 
 
 def print_st_message(type, message):
+    import streamlit as st
+
     if type == MessageType.info:
         st.info(message)
     elif type == MessageType.success:
@@ -326,8 +387,10 @@ def is_accepted_TEI_filename(filename,with_st_message_output=False,with_message_
     return False
 
 
-@st.cache(allow_output_mutation=True)
+@functools.lru_cache(maxsize=None)
 def load_images():
+    from PIL import Image
+
     neiss_logo = Image.open(os.path.join(module_path, "images", "neiss_logo_nn_pentagon01b2.png"))
     eu_fonds = Image.open(os.path.join(module_path, "images", "logo_EU_Fonds.png"))
     eu_esf = Image.open(os.path.join(module_path, "images", "logo_EU_ESF.png"))
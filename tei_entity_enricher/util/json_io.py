@@ -0,0 +1,106 @@
+"""JSON encoding and decoding for the large files of n-tee (groundtruths, prediction data and results, entity library).
+
+orjson is used, if it is installed (pip install orjson), otherwise the json module of the standard library. The
+results of both backends are interchangeable, but orjson writes non-ASCII characters unescaped and indents by two
+spaces. Text files, which are not encoded in UTF-8, and values orjson cannot encode (e.g. integers with more than
+64 bits) are written with the json module. Invalid JSON is decoded with the json module again, so that the same
+exceptions (json.JSONDecodeError, a subclass of ValueError) are raised with both backends. orjson decodes integers
+with more than 64 bits as floats.
+
+With both backends the garbage collector is paused while decoding: the decoded values contain no reference cycles,
+but the millions of new lists of a groundtruth would trigger collections over all of them again and again, which
+takes longer than the decoding itself.
+"""
+import codecs
+import contextlib
+import gc
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+backend_orjson = "orjson"
+backend_json = "json"
+
+_backend = backend_orjson if orjson is not None else backend_json
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    """Selects backend_orjson or backend_json for all following calls, e.g. to compare them."""
+    global _backend
+    if backend not in [backend_orjson, backend_json]:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend == backend_orjson and orjson is None:
+        raise ValueError("The JSON backend orjson is not installed")
+    _backend = backend
+
+
+def _orjson_dumps(obj, indent):
+    # returns None, if orjson cannot encode obj
+    option = orjson.OPT_NON_STR_KEYS
+    if indent is not None:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, option=option)
+    except TypeError:
+        return None
+
+
+def dumps(obj, indent=None):
+    """Returns obj encoded as JSON string (non-ASCII characters may be unescaped)."""
+    if _backend == backend_orjson:
+        data = _orjson_dumps(obj, indent)
+        if data is not None:
+            return data.decode("utf-8")
+    return json.dumps(obj, indent=indent, ensure_ascii=False)
+
+
+def dump(obj, file, indent=None):
+    """Writes obj encoded as JSON to file, which can be opened in text or in binary mode."""
+    is_text_file = isinstance(file, io.TextIOBase)
+    if _backend == backend_orjson:
+        encoding = getattr(file, "encoding", None) if is_text_file else None
+        if encoding is None or codecs.lookup(encoding).name == "utf-8":
+            data = _orjson_dumps(obj, indent)
+            if data is not None:
+                file.write(data.decode("utf-8") if is_text_file else data)
+                return
+    # json.dumps encodes in one go with the C encoder, json.dump encodes piece by piece in Python
+    if is_text_file:
+        file.write(json.dumps(obj, indent=indent))
+    else:
+        file.write(json.dumps(obj, indent=indent, ensure_ascii=False).encode("utf-8"))
+
+
+@contextlib.contextmanager
+def _garbage_collection_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def loads(data):
+    """Decodes the JSON string (str or bytes) data."""
+    with _garbage_collection_paused():
+        if _backend == backend_orjson:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(data)
+
+
+def load(file):
+    """Decodes the JSON content of file, which can be opened in text or in binary mode."""
+    return loads(file.read())
@@ -0,0 +1,175 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+
+from tei_entity_enricher.util import json_io
+from tei_entity_enricher.util.helper import local_save_path, makedir_if_necessary
+from tei_entity_enricher.util.spacy_lm import get_sentence_pipe_names
+
+logger = logging.getLogger(__name__)
+
+default_cache_dir = os.path.join(local_save_path, "cache", "tei_parse")
+default_max_size = 512 * 1024 * 1024
+# share of max_size, down to which the entries are removed, so that not every new entry requires an eviction
+default_low_water_ratio = 0.9
+
+line_list_text = "text"
+line_list_notes = "notes"
+
+
+def _get_hash(*parts):
+    hash_object = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        # the length separates the parts, so that different splits of the same bytes get different hashes
+        hash_object.update(str(len(part)).encode("ascii") + b":" + part)
+    return hash_object.hexdigest()
+
+
+def get_content_hash(filename, openfile=None):
+    if openfile is not None:
+        return hashlib.sha256(openfile.getvalue()).hexdigest()
+    hash_object = hashlib.sha256()
+    with open(file=filename, mode="rb") as tei:
+        for chunk in iter(functools.partial(tei.read, 1 << 20), b""):
+            hash_object.update(chunk)
+    return hash_object.hexdigest()
+
+
+def get_nlp_id(nlp):
+    # the sentence split of a pipeline depends on the model (name and version) and on the pipes used for the split
+    meta = nlp.meta
+    pipe_configs = {name: nlp.get_pipe_config(name) for name in get_sentence_pipe_names(nlp)}
+    return [meta.get("lang"), meta.get("name"), meta.get("version"), pipe_configs]
+
+
+class ParseCache:
+    """On-disk cache of the texts, statistics and sentence lists extracted from TEI-Files.
+
+    The parse results of a file are stored under a key built from the hash of the file content, the TEI Reader
+    Config and the entity dict of the TEI Read Entity Mapping, the sentence lists additionally under the spaCy model
+    used for the sentence split. Every entry is a JSON file in cache_dir, whose modification time is updated on
+    every hit. If the entries exceed max_size bytes, the least recently used entries are removed, until they take
+    less than low_water_ratio * max_size bytes. Errors of the cache are logged and never stop the parsing."""
+
+    def __init__(self, cache_dir=default_cache_dir, max_size=default_max_size, low_water_ratio=default_low_water_ratio):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.low_water_ratio = low_water_ratio
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    def get_key(self, content_hash, tr_config, entity_dict=None):
+        return content_hash + "_" + _get_hash(tr_config, entity_dict)[:32]
+
+    def get_line_list_key(self, key, nlp, with_position_tags, part=line_list_text):
+        return key + "_" + _get_hash(get_nlp_id(nlp), with_position_tags)[:16] + "_" + part
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def load(self, key):
+        """Returns the cached data of key or None, if there is no entry."""
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = json_io.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Could not read the parse cache entry {path}: {repr(ex)}")
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def store(self, key, data):
+        path = self._get_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            makedir_if_necessary(self.cache_dir)
+            with open(temp_path, "wb") as f:
+                json_io.dump(data, f)
+            size = os.path.getsize(temp_path)
+            try:
+                # the size of a replaced entry is freed
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+        except OSError as ex:
+            logger.warning(f"Could not write the parse cache entry {path}: {repr(ex)}")
+            self._remove(temp_path)
+            return
+        if self._size is None or self._size + size > self.max_size:
+            self.evict()
+        else:
+            self._size += size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _list_entries(self):
+        # (modification time, size, path) of all entries
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Removes the least recently used entries, if the cache is larger than max_size, until it is not larger than
+        low_water_ratio * max_size."""
+        entries = sorted(self._list_entries())
+        size = sum(entry[1] for entry in entries)
+        if size <= self.max_size:
+            self._size = size
+            return
+        for _, entry_size, path in entries:
+            if size <= self.low_water_ratio * self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+        self._size = size
+
+    def get_size(self):
+        return sum(entry[1] for entry in self._list_entries())
+
+    def invalidate(self, filename=None, openfile=None, content_hash=None):
+        """Removes all entries of the given TEI-File (given by filename, openfile or the hash of its content) or,
+        without arguments, all entries of the cache. Returns the number of removed entries."""
+        if content_hash is None and (filename is not None or openfile is not None):
+            content_hash = get_content_hash(filename, openfile)
+        count = 0
+        for _, _, path in self._list_entries():
+            if content_hash is None or os.path.basename(path).startswith(content_hash + "_"):
+                self._remove(path)
+                count += 1
+        self._size = None
+        return count
+
+    def clear(self):
+        return self.invalidate()
+
+
+@functools.lru_cache(maxsize=None)
+def get_parse_cache(cache_dir=default_cache_dir, max_size=default_max_size, low_water_ratio=default_low_water_ratio):
+    # shared instance of the app
+    return ParseCache(cache_dir, max_size, low_water_ratio)
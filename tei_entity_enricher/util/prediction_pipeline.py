@@ -0,0 +1,438 @@
+import collections
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import re
+import traceback
+
+import tei_entity_enricher.util.tei_parser as tp
+from tei_entity_enricher.util import json_io
+from tei_entity_enricher.util.helper import MessageType, is_accepted_TEI_filename, atomic_write
+from tei_entity_enricher.util.spacy_lm import get_spacy_lm, sentence_split_parser
+from tei_entity_enricher.util.tei_writer import TEI_Writer
+
+data_to_predict_filename = "data_to_predict.json"
+predict_file_dict_filename = "predict_file_dict.json"
+prediction_result_filename = "data_to_predict.pred.json"
+data_to_predict_jsonl_filename = "data_to_predict.jsonl"
+predict_file_dict_jsonl_filename = "predict_file_dict.jsonl"
+prediction_result_jsonl_filename = "data_to_predict.pred.jsonl"
+
+data_format_json = "JSON"
+data_format_jsonl = "JSON-lines"
+data_format_options = [data_format_json, data_format_jsonl]
+
+_json_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def _no_output(*args):
+    pass
+
+
+class _WritingStopped(Exception):
+    # leaves an atomic_write block without replacing the file
+    pass
+
+
+def get_prediction_command(work_dir, model, input_json_file, prediction_out_dir):
+    return [
+        "python",
+        os.path.join(work_dir, "tf2_neiss_nlp", "tfaip_scenario", "nlp", "ner", "scripts", "prediction_ner.py"),
+        "--export_dir",
+        model,
+        "--input_json",
+        input_json_file,
+        "--out",
+        prediction_out_dir,
+    ]
+
+
+def get_tei_filelist(input_path):
+    # a single TEI-File or all TEI-Files of a folder
+    if os.path.isdir(input_path):
+        return [
+            os.path.join(input_path, filepath)
+            for filepath in os.listdir(input_path)
+            if is_accepted_TEI_filename(filepath)
+        ]
+    return [input_path]
+
+
+def _iterate_preprocessed_tei_files(
+    tei_filelist, tr_config, nlp, message_callback, progress_callback, parse_cache=None
+):
+    # yields for every TEI-File a tuple (text sentences, note sentences or None, error message or None)
+    for fileindex in range(len(tei_filelist)):
+        progress_callback(math.floor((fileindex + 1) / len(tei_filelist) * 100))
+        message_callback(f"Preprocess file {tei_filelist[fileindex]}...")
+        try:
+            brief = tp.TEIFile(
+                filename=tei_filelist[fileindex],
+                tr_config=tr_config,
+                nlp=nlp,
+                with_position_tags=True,
+                parse_cache=parse_cache,
+            )
+        except Exception as ex:
+            error_stack = (
+                " \n \n" + f"{repr(ex)}" + "\n \n" + "\n".join(traceback.TracebackException.from_exception(ex).format())
+            )
+            yield None, None, f"The Following error occurs, when trying to process TEI-File {tei_filelist[fileindex]} : {error_stack}"
+            return
+        raw_ner_data = tp.split_into_sentences(brief.build_tagged_text_line_list())
+        if tr_config["use_notes"]:
+            yield raw_ner_data, tp.split_into_sentences(brief.build_tagged_note_line_list()), None
+        else:
+            yield raw_ner_data, None, None
+
+
+def preprocess_tei_files(
+    tei_filelist,
+    tr_config,
+    lang,
+    prediction_out_dir,
+    sentence_split=sentence_split_parser,
+    data_format=data_format_json,
+    parse_cache=None,
+    message_callback=_no_output,
+    progress_callback=_no_output,
+):
+    """Splits the texts (and notes) of the TEI-Files into sentences and writes them to the data_to_predict file in
+    prediction_out_dir, together with a dictionary which assigns the sentences to the files.
+    With data_format_jsonl the sentences and the file assignments are written file by file to JSON-lines files
+    instead of being collected in memory; the JSON input of the prediction is then streamed from these files.
+    With a parse_cache (ParseCache) the sentences of files already preprocessed with the same configuration are
+    taken from the cache.
+    Returns an error message if the preprocessing failed, otherwise None."""
+    if len(tei_filelist) < 1:
+        return "With the given Configuration no TEI-Files where found!"
+    nlp = get_spacy_lm(lang, sentence_split)
+    results = _iterate_preprocessed_tei_files(
+        tei_filelist, tr_config, nlp, message_callback, progress_callback, parse_cache=parse_cache
+    )
+    if data_format == data_format_jsonl:
+        return _write_preprocessed_data_as_jsonl(tei_filelist, results, prediction_out_dir)
+    all_data = []
+    file_name_dict = {}
+    for fileindex, (raw_ner_data, raw_ner_note_data, error) in enumerate(results):
+        if error is not None:
+            return error
+        old_length = len(all_data)
+        all_data.extend(raw_ner_data)
+        file_name_dict[tei_filelist[fileindex]] = {"begin": old_length, "end": len(all_data)}
+        if raw_ner_note_data is not None:
+            all_data.extend(raw_ner_note_data)
+            file_name_dict[tei_filelist[fileindex]]["note_end"] = len(all_data)
+    with atomic_write(os.path.join(prediction_out_dir, data_to_predict_filename), "w+") as h:
+        json_io.dump(all_data, h)
+    with atomic_write(os.path.join(prediction_out_dir, predict_file_dict_filename), "w+") as h2:
+        json_io.dump(file_name_dict, h2)
+    return None
+
+
+def has_preprocessed_data(prediction_out_dir, data_format=data_format_json):
+    """Returns whether the preprocessing was already completed in prediction_out_dir by an earlier run."""
+    if data_format == data_format_jsonl:
+        file_dict_filename = predict_file_dict_jsonl_filename
+    else:
+        file_dict_filename = predict_file_dict_filename
+    return all(
+        os.path.isfile(os.path.join(prediction_out_dir, filename))
+        for filename in [data_to_predict_filename, file_dict_filename]
+    )
+
+
+def _write_preprocessed_data_as_jsonl(tei_filelist, results, prediction_out_dir):
+    # one sentence per line with the index of its file and its offset in the whole data
+    offset = 0
+    try:
+        with atomic_write(os.path.join(prediction_out_dir, data_to_predict_jsonl_filename), "w+") as h, atomic_write(
+            os.path.join(prediction_out_dir, predict_file_dict_jsonl_filename), "w+"
+        ) as h2:
+            for fileindex, (raw_ner_data, raw_ner_note_data, error) in enumerate(results):
+                if error is not None:
+                    raise _WritingStopped(error)
+                file_entry = {"file": fileindex, "path": tei_filelist[fileindex], "begin": offset}
+                for is_note, sentences in [(False, raw_ner_data), (True, raw_ner_note_data)]:
+                    if sentences is None:
+                        continue
+                    for sentence in sentences:
+                        json_io.dump({"file": fileindex, "offset": offset, "note": is_note, "sentence": sentence}, h)
+                        h.write("\n")
+                        offset += 1
+                    file_entry["note_end" if is_note else "end"] = offset
+                json_io.dump(file_entry, h2)
+                h2.write("\n")
+    except _WritingStopped as ex:
+        return str(ex)
+    # the prediction script expects one JSON list of all sentences
+    with atomic_write(os.path.join(prediction_out_dir, data_to_predict_filename), "w+") as h:
+        h.write("[")
+        for index, line in enumerate(iterate_jsonl(os.path.join(prediction_out_dir, data_to_predict_jsonl_filename))):
+            if index > 0:
+                h.write(", ")
+            json_io.dump(line["sentence"], h)
+        h.write("]")
+    return None
+
+
+def iterate_jsonl(filepath):
+    """Yields the values of a JSON-lines file line by line."""
+    with open(filepath, "rb") as f:
+        for line in f:
+            if line.strip() != b"":
+                yield json_io.loads(line)
+
+
+def iterate_json_array(filepath, chunk_size=1 << 16):
+    """Yields the elements of the JSON array in filepath one after another without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(filepath) as f:
+        buffer = ""
+        position = 0
+        eof = False
+        expect_array_begin = True
+        expect_separator = False
+        while True:
+            position = _json_whitespace.match(buffer, position).end()
+            if position == len(buffer) or expect_separator is None:
+                if eof:
+                    raise ValueError(f'Unexpected end of the JSON array in "{filepath}"')
+                chunk = f.read(chunk_size)
+                eof = chunk == ""
+                buffer = buffer[position:] + chunk
+                position = 0
+                if expect_separator is None:
+                    expect_separator = False
+                continue
+            if expect_array_begin:
+                if buffer[position] != "[":
+                    raise ValueError(f'"{filepath}" does not contain a JSON array')
+                position += 1
+                expect_array_begin = False
+                continue
+            if buffer[position] == "]":
+                return
+            if expect_separator:
+                if buffer[position] != ",":
+                    raise ValueError(
+                        f'Missing separator in the JSON array in "{filepath}" at "{buffer[position:position + 20]}"'
+                    )
+                position += 1
+                expect_separator = False
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # the element is not completely read yet
+                expect_separator = None
+                continue
+            if not eof and (end == len(buffer) or buffer[end] in ".eE+-"):
+                # a number could continue in the next chunk
+                expect_separator = None
+                continue
+            yield value
+            position = end
+            expect_separator = True
+
+
+# state of a write back worker process, set by _init_write_back_worker
+_worker_tr_config = None
+_worker_tnw_config = None
+_worker_prediction_out_dir = None
+_worker_resume = False
+
+
+def _init_write_back_worker(tr_config, tnw_config, prediction_out_dir, resume=False):
+    global _worker_tr_config, _worker_tnw_config, _worker_prediction_out_dir, _worker_resume
+    _worker_tr_config = tr_config
+    _worker_tnw_config = tnw_config
+    _worker_prediction_out_dir = prediction_out_dir
+    _worker_resume = resume
+
+
+def _get_error_message(ex):
+    ret_message = f"{repr(ex)}" + "\n" + "".join(traceback.TracebackException.from_exception(ex).format())
+    return ret_message.replace("\n", "\n\n")
+
+
+def _iterate_write_back_tasks(filelist, file_dict, all_predict_data, use_notes):
+    # yields for every file its slice of the prediction results (or the error which occured during slicing)
+    for tei_file_path in filelist:
+        try:
+            predicted_data = all_predict_data[file_dict[tei_file_path]["begin"] : file_dict[tei_file_path]["end"]]
+            if use_notes:
+                if file_dict[tei_file_path]["note_end"] - file_dict[tei_file_path]["end"] > 0:
+                    predicted_note_data = all_predict_data[
+                        file_dict[tei_file_path]["end"] : file_dict[tei_file_path]["note_end"]
+                    ]
+                else:
+                    predicted_note_data = []
+            else:
+                predicted_note_data = []
+            yield tei_file_path, predicted_data, predicted_note_data, None
+        except Exception as ex:
+            yield tei_file_path, None, None, _get_error_message(ex)
+
+
+def _take_sentences(sentence_iterator, count, position):
+    sentences = list(itertools.islice(sentence_iterator, count))
+    if len(sentences) < count:
+        raise ValueError(f"The prediction results end before sentence {position + len(sentences)}")
+    return sentences
+
+
+def _iterate_jsonl_write_back_tasks(file_entries, predicted_sentences, use_notes):
+    # like _iterate_write_back_tasks, but takes the prediction results of the files one after another from an
+    # iterator instead of slicing a list of all prediction results
+    position = 0
+    for file_entry in file_entries:
+        try:
+            _take_sentences(predicted_sentences, file_entry["begin"] - position, position)
+            position = file_entry["begin"]
+            predicted_data = _take_sentences(predicted_sentences, file_entry["end"] - position, position)
+            position = file_entry["end"]
+            predicted_note_data = []
+            if "note_end" in file_entry:
+                note_data = _take_sentences(predicted_sentences, file_entry["note_end"] - position, position)
+                position = file_entry["note_end"]
+                if use_notes:
+                    predicted_note_data = note_data
+            yield file_entry["path"], predicted_data, predicted_note_data, None
+        except Exception as ex:
+            yield file_entry["path"], None, None, _get_error_message(ex)
+
+
+def _iterate_predicted_sentences(prediction_out_dir):
+    if os.path.isfile(os.path.join(prediction_out_dir, prediction_result_jsonl_filename)):
+        for line in iterate_jsonl(os.path.join(prediction_out_dir, prediction_result_jsonl_filename)):
+            yield line["sentence"] if isinstance(line, dict) else line
+    else:
+        yield from iterate_json_array(os.path.join(prediction_out_dir, prediction_result_filename))
+
+
+def imap_bounded(pool, func, tasks, max_tasks_in_flight):
+    """Like pool.imap(func, tasks), but takes the next task from the iterator tasks only if less than
+    max_tasks_in_flight tasks are submitted and their results have not been yielded yet (pool.imap consumes the whole
+    iterator at once, so that all tasks would be kept in memory)."""
+    pending_results = collections.deque()
+    for task in tasks:
+        if len(pending_results) >= max_tasks_in_flight:
+            yield pending_results.popleft().get()
+        pending_results.append(pool.apply_async(func, (task,)))
+    while len(pending_results) > 0:
+        yield pending_results.popleft().get()
+
+
+def _write_predictions_to_tei_file(task):
+    # returns None if successful, otherwise the filename and the error message
+    tei_file_path, predicted_data, predicted_note_data, error_message = task
+    _, teifilename = os.path.split(tei_file_path)
+    if error_message is not None:
+        return [teifilename, error_message]
+    outputpath = os.path.join(_worker_prediction_out_dir, teifilename)
+    if _worker_resume and os.path.isfile(outputpath) and os.path.abspath(outputpath) != os.path.abspath(tei_file_path):
+        # already written by an earlier interrupted run (TEI_Writer writes the file atomically)
+        return None
+    try:
+        brief = TEI_Writer(
+            tei_file_path,
+            tr=_worker_tr_config,
+            tnw=_worker_tnw_config,
+            untagged_symbols=["O", "UNK"],
+        )
+        brief.write_predicted_ner_tags(predicted_data, predicted_note_data)
+        brief.write_back_to_file(outputpath)
+    except Exception as ex:
+        return [teifilename, _get_error_message(ex)]
+    return None
+
+
+def write_predictions_to_tei_files(
+    prediction_out_dir,
+    tr_config,
+    tnw_config,
+    processes=1,
+    data_format=data_format_json,
+    resume=False,
+    message_callback=_no_output,
+    progress_callback=_no_output,
+):
+    """Writes the prediction results in prediction_out_dir back into copies of the predicted TEI-Files, which are
+    saved in prediction_out_dir as well. With processes > 1 the files are written in a process pool, each worker
+    gets only the slice of the prediction results which belongs to its file, and at most two files per process are
+    handed to the pool in advance. With data_format_jsonl the prediction results are read file by file instead of
+    being loaded completely. With resume=True the TEI-Files already
+    written by an earlier interrupted run are skipped. Returns a tuple of a MessageType and
+    a message if there is something to report, otherwise None, None."""
+    if not os.path.isfile(os.path.join(prediction_out_dir, prediction_result_filename)) and not (
+        data_format == data_format_jsonl
+        and os.path.isfile(os.path.join(prediction_out_dir, prediction_result_jsonl_filename))
+    ):
+        return MessageType.error, "Could not find prediction results to write into TEI-Files"
+    message_callback("Write Prediction Results back to TEI-Files...")
+    if data_format == data_format_jsonl:
+        file_entries = list(iterate_jsonl(os.path.join(prediction_out_dir, predict_file_dict_jsonl_filename)))
+        filelist = [file_entry["path"] for file_entry in file_entries]
+        tasks = _iterate_jsonl_write_back_tasks(
+            file_entries, _iterate_predicted_sentences(prediction_out_dir), tr_config["use_notes"]
+        )
+    else:
+        with open(os.path.join(prediction_out_dir, prediction_result_filename), "rb") as h:
+            all_predict_data = json_io.load(h)
+        with open(os.path.join(prediction_out_dir, predict_file_dict_filename), "rb") as h2:
+            file_dict = json_io.load(h2)
+        filelist = list(file_dict.keys())
+        tasks = _iterate_write_back_tasks(filelist, file_dict, all_predict_data, tr_config["use_notes"])
+    initargs = (tr_config, tnw_config, prediction_out_dir, resume)
+    failed_prediction_files = []
+    if processes <= 1 or len(filelist) <= 1:
+        _init_write_back_worker(*initargs)
+        results = map(_write_predictions_to_tei_file, tasks)
+        _collect_write_back_results(filelist, results, failed_prediction_files, message_callback, progress_callback)
+    else:
+        with multiprocessing.Pool(
+            processes=min(processes, len(filelist)), initializer=_init_write_back_worker, initargs=initargs
+        ) as pool:
+            results = imap_bounded(pool, _write_predictions_to_tei_file, tasks, 2 * processes)
+            _collect_write_back_results(filelist, results, failed_prediction_files, message_callback, progress_callback)
+    return get_write_back_message(filelist, failed_prediction_files)
+
+
+def _collect_write_back_results(filelist, results, failed_prediction_files, message_callback, progress_callback):
+    for fileindex, failed_prediction in enumerate(results):
+        _, teifilename = os.path.split(filelist[fileindex])
+        progress_callback(math.floor((fileindex + 1) / len(filelist) * 100))
+        message_callback(f"Included predicted entities into {teifilename}.")
+        if failed_prediction is not None:
+            failed_prediction_files.append(failed_prediction)
+
+
+def get_write_back_message(filelist, failed_prediction_files):
+    if len(failed_prediction_files) > 0:
+        if len(filelist) == 1:
+            return (
+                MessageType.error,
+                f"Prediction to file {failed_prediction_files[0][0]} was not succesful because of the following error: \n\n"
+                + failed_prediction_files[0][1],
+            )
+        elif len(filelist) == len(failed_prediction_files):
+            return (
+                MessageType.error,
+                f"It was not possible to write back the prediction results into the TEI-Files. For example for the file {failed_prediction_files[0][0]} occured the error: \n\n"
+                + failed_prediction_files[0][1],
+            )
+        else:
+            ret_message = "For the following files It was not possible to write back the prediction results into the TEI-Files: \n\n"
+            for failed_prediction in failed_prediction_files:
+                ret_message += failed_prediction[0] + ", \n\n"
+            ret_message += (
+                f"For example for the file {failed_prediction_files[0][0]} occured the error: \n\n"
+                + failed_prediction_files[0][1]
+            )
+            return MessageType.warning, ret_message
+    return None, None
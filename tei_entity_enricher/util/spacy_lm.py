@@ -1,3 +1,5 @@
+import functools
+
 import spacy
 
 lang_dict = {
@@ -8,11 +10,53 @@ lang_dict = {
     "Spanish": "es_core_news_sm",
 }
 
+sentence_split_parser = "Dependency parse"
+sentence_split_senter = "Statistical sentence segmenter (senter)"
+sentence_split_sentencizer = "Rule-based sentencizer"
+sentence_split_options = [sentence_split_parser, sentence_split_senter, sentence_split_sentencizer]
+
 
-def get_spacy_lm(lang):
+@functools.lru_cache(maxsize=None)
+def get_spacy_lm(lang, sentence_split=sentence_split_parser):
+    # The loaded pipelines are cached, so repeated calls with the same arguments reuse the same pipeline.
+    # Use get_spacy_lm.cache_clear() to release them.
+    if sentence_split not in sentence_split_options:
+        raise ValueError(f'Unknown sentence split "{sentence_split}"!')
     if not spacy.util.is_package(lang_dict[lang]):
         spacy.cli.download(lang_dict[lang])
-    nlp = spacy.load(lang_dict[lang])
-    if lang == "Multilingual":
-        nlp.add_pipe("sentencizer")
+    if sentence_split == sentence_split_parser:
+        nlp = spacy.load(lang_dict[lang])
+        if lang == "Multilingual":
+            nlp.add_pipe("sentencizer")
+        return nlp
+    components = _get_component_names(lang_dict[lang])
+    if sentence_split == sentence_split_senter and "senter" in components:
+        nlp = spacy.load(lang_dict[lang], exclude=[name for name in components if name not in ["senter", "tok2vec"]])
+        nlp.enable_pipe("senter")
+        if "tok2vec" in nlp.pipe_names and "senter" not in nlp.get_pipe("tok2vec").listening_components:
+            nlp.remove_pipe("tok2vec")
+        return nlp
+    # rule-based sentence split (also used if the model does not contain a senter)
+    nlp = spacy.load(lang_dict[lang], exclude=components)
+    nlp.add_pipe("sentencizer")
     return nlp
+
+
+def _get_component_names(model_name):
+    meta = spacy.util.get_model_meta(spacy.util.get_package_path(model_name))
+    return meta.get("components", meta["pipeline"])
+
+
+def get_sentence_pipe_names(nlp):
+    # names of the pipes which are necessary to get the sentence boundaries (doc.sents) of a text
+    segmenter_names = [
+        name for name in nlp.pipe_names if nlp.get_pipe_meta(name).factory in ["parser", "senter", "sentencizer"]
+    ]
+    if any(nlp.get_pipe_meta(name).factory != "sentencizer" for name in segmenter_names):
+        # the statistical segmenters may listen to a shared embedding layer
+        return [
+            name
+            for name in nlp.pipe_names
+            if name in segmenter_names or nlp.get_pipe_meta(name).factory in ["tok2vec", "transformer"]
+        ]
+    return segmenter_names
@@ -1,5 +1,28 @@
 from bs4 import BeautifulSoup
-import re
+from lxml import etree
+from tei_entity_enricher.util.parse_cache import get_content_hash, line_list_notes, line_list_text
+from tei_entity_enricher.util.spacy_lm import get_sentence_pipe_names
+
+engine_soup = "soup"
+engine_stream = "stream"
+stream_chunk_size = 1 << 16
+default_sentence_batch_size = 256
+
+
+def assemble_text(element_list):
+    # Joins the elements and collapses every whitespace sequence to one space in linear time (str.split uses
+    # the same whitespace definition as \s in re), afterwards the <linebreak> marks are replaced by newlines
+    text = "".join(element_list)
+    if len(text) == 0:
+        return text
+    collapsed = " ".join(text.split())
+    if len(collapsed) == 0:
+        return " "
+    if text[0].isspace():
+        collapsed = " " + collapsed
+    if text[-1].isspace():
+        collapsed = collapsed + " "
+    return collapsed.replace("<linebreak>", "\n")
 
 
 class TEIFile:
@@ -11,10 +34,21 @@ class TEIFile:
         nlp=None,
         openfile=None,
         with_position_tags=False,
+        engine=engine_soup,
+        parse_cache=None,
     ):
+        # With a parse_cache (see util.parse_cache.ParseCache) the texts, statistics and sentence lists of a file,
+        # which was already parsed with the same configuration, are loaded from the cache.
+        if engine not in [engine_soup, engine_stream]:
+            raise ValueError(f'Unknown TEI parser engine "{engine}"!')
         self._pagelist = []
         self._soup = None
-        if self._soup is None:
+        self._parse_cache = parse_cache
+        cached_data = None
+        if parse_cache is not None:
+            self._parse_cache_key = parse_cache.get_key(get_content_hash(filename, openfile), tr_config, entity_dict)
+            cached_data = parse_cache.load(self._parse_cache_key)
+        if engine == engine_soup and cached_data is None:
             if openfile is not None:
                 self._soup = BeautifulSoup(openfile.getvalue().decode("utf-8"), "xml")
             else:
@@ -31,13 +65,26 @@ class TEIFile:
             self._note_tags = []
         self._exclude_tags = tr_config["exclude_tags"]
         self.init_tnm(entity_dict)
-        (
-            self._text,
-            self._tagged_text,
-            self._statistics,
-            self._notes,
-            self._tagged_notes,
-        ) = self._get_text_and_statistics(filename)
+        if cached_data is not None:
+            self.set_parsed_data(cached_data)
+        elif engine == engine_stream:
+            (
+                self._text,
+                self._tagged_text,
+                self._statistics,
+                self._notes,
+                self._tagged_notes,
+            ) = self._get_text_and_statistics_streaming(filename, openfile)
+        else:
+            (
+                self._text,
+                self._tagged_text,
+                self._statistics,
+                self._notes,
+                self._tagged_notes,
+            ) = self._get_text_and_statistics(filename)
+        if parse_cache is not None and cached_data is None:
+            parse_cache.store(self._parse_cache_key, self.get_parsed_data())
         self._tagged_text_line_list = []
         self._tagged_note_line_list = []
 
@@ -46,6 +93,24 @@ class TEIFile:
         # else:
         #    self._nlp=spacy.load('de_core_news_sm')
 
+    def get_parsed_data(self):
+        return {
+            "text": self._text,
+            "tagged_text": self._tagged_text,
+            "statistics": self._statistics,
+            "notes": self._notes,
+            "tagged_notes": self._tagged_notes,
+            "note_statistics": self._note_statistics,
+        }
+
+    def set_parsed_data(self, parsed_data):
+        self._text = parsed_data["text"]
+        self._tagged_text = parsed_data["tagged_text"]
+        self._statistics = parsed_data["statistics"]
+        self._notes = parsed_data["notes"]
+        self._tagged_notes = parsed_data["tagged_notes"]
+        self._note_statistics = parsed_data["note_statistics"]
+
     def init_tnm(self, entity_dict):
         self._allowed_tags = {}
         if entity_dict is not None:
@@ -218,177 +283,73 @@ class TEIFile:
                     tagged_text_list.extend(new_tagged_text_list)
                     tagged_text_list.append(" <linebreak>\n")
                     statistics = self._merge_statistics(statistics, new_statistics)
+        return self._build_text_outputs(text_list, tagged_text_list, statistics)
 
-        text = ""
-        for element in text_list:
-            text = text + str(element)
-        text = " ".join(re.split(r"\s+", text))
-        text = text.replace("<linebreak>", "\n")
-        tagged_text = ""
-        for element in tagged_text_list:
-            tagged_text = tagged_text + str(element)
-        tagged_text = " ".join(re.split(r"\s+", tagged_text))
-        tagged_text = tagged_text.replace("<linebreak>", "\n")
-        notes = ""
-        for element in self._note_list:
-            notes = notes + str(element)
-        notes = " ".join(re.split(r"\s+", notes))
-        notes = notes.replace("<linebreak>", "\n")
-        tagged_notes = ""
-        for element in self._tagged_note_list:
-            tagged_notes = tagged_notes + str(element)
-        tagged_notes = " ".join(re.split(r"\s+", tagged_notes))
-        tagged_notes = tagged_notes.replace("<linebreak>", "\n")
+    def _get_text_and_statistics_streaming(self, filename, openfile=None):
+        # Same result as _get_text_and_statistics, but the file is fed chunkwise to an lxml parser target,
+        # so that no tree of the whole document has to be built
+        self._note_list = []
+        self._tagged_note_list = []
+        self._note_statistics = {}
+        target = _TEITextStreamTarget(self)
+        parser = etree.XMLParser(target=target, strip_cdata=False, recover=True, huge_tree=True)
+        if openfile is not None:
+            parser.feed(openfile.getvalue())
+        else:
+            with open(file=filename, mode="rb") as tei:
+                chunk = tei.read(stream_chunk_size)
+                while len(chunk) > 0 and not target.finished:
+                    parser.feed(chunk)
+                    chunk = tei.read(stream_chunk_size)
+        parser.close()
+        if not target.found_text:
+            raise ValueError(f'TEI-File "{filename}" does not contain a text tag!')
+        return self._build_text_outputs(target.text_list, target.tagged_text_list, target.statistics)
+
+    def _build_text_outputs(self, text_list, tagged_text_list, statistics):
+        text = assemble_text(text_list)
+        tagged_text = assemble_text(tagged_text_list)
+        notes = assemble_text(self._note_list)
+        tagged_notes = assemble_text(self._tagged_note_list)
         return text, tagged_text, statistics, notes, tagged_notes
 
-    def build_tagged_text_line_list(self):
-        cur_tag = "O"  # O is the sign for without tag
-        tagged_text_lines = self.get_tagged_text().split("\n")
-        # Build Mapping Word to Tag
-        for tagged_text_line in tagged_text_lines:
-            cur_line_list = []
-            tagged_text_list = tagged_text_line.split(" ")
-            for text_part in tagged_text_list:
-                if text_part.startswith("<") and text_part.endswith(">"):
-                    if text_part[1] == "/":
-                        cur_tag = "O"  # O is the sign for without tag
-                    else:
-                        cur_tag = text_part[1:-1]
-                        first_tag_element = True
-                elif text_part is not None and text_part != "":
-                    if self._with_position_tags and cur_tag != "O":
-                        if first_tag_element:
-                            modified_tag = "B-" + cur_tag
-                            first_tag_element = False
-                        else:
-                            modified_tag = "I-" + cur_tag
-                    else:
-                        modified_tag = cur_tag
-                    # Sentence extraction doesn't work for capitalized words, that is why we use the following
-                    if text_part.upper() == text_part:
-                        cur_line_list.append([text_part.lower(), modified_tag, 1])
-                    else:
-                        cur_line_list.append([text_part, modified_tag, 0])
-            self._tagged_text_line_list.append(cur_line_list)
-        # Seperate sentences with the help of spacy
-        for i in range(len(self._tagged_text_line_list)):
-            # print(self._tagged_text_line_list[i])
-            cur_line_text = ""
-            tokenlist=[]
-            for j in range(len(self._tagged_text_line_list[i])):
-                if j > 0:
-                    #nlp sentence split has problems with strings whose length is longer than 1000000. That is why we use the following workaround
-                    if len(cur_line_text)+len(self._tagged_text_line_list[i][j][0])>999000 and self._tagged_text_line_list[i][j][1]=="O":
-                        tokenlist.append(self._nlp(cur_line_text))
-                        cur_line_text = ""
-                    else:
-                        cur_line_text += " "
-                cur_line_text += self._tagged_text_line_list[i][j][0]
-            # print('cur line text: ',cur_line_text)
-            tokenlist.append(self._nlp(cur_line_text))
-            k = 0
-            new_line_list = []
-            cur_word = ""
-            for tokens in tokenlist:
-                for sent in tokens.sents:
-                    space_before = False
-                    for wordindex in range(len(sent)):
-                        cur_tag_element = self._tagged_text_line_list[i][k]
-                        cur_word += str(sent[wordindex])
-                        word_to_insert = str(sent[wordindex])
-                        if cur_tag_element[2] == 1:
-                            word_to_insert = word_to_insert.upper()
-                        if wordindex == 0 and not cur_tag_element[1].startswith("I-"):
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 2])
-                        elif space_before:
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 0])
-                        else:
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 1])
-                        if cur_word == cur_tag_element[0]:
-                            space_before = True
-                            cur_word = ""
-                            k += 1
-                        else:
-                            space_before = False
-            self._tagged_text_line_list[i] = new_line_list
-        # for line_list in self._tagged_text_line_list:
-        #    print(line_list)
+    def _get_line_list_cache_key(self, part, nlp):
+        if self._parse_cache is None:
+            return None
+        return self._parse_cache.get_line_list_key(self._parse_cache_key, nlp, self._with_position_tags, part)
+
+    def _build_line_list(self, tagged_text, part, batch_size, n_process):
+        cache_key = self._get_line_list_cache_key(part, self._nlp)
+        if cache_key is not None:
+            line_list = self._parse_cache.load(cache_key)
+            if line_list is not None:
+                return line_list
+        word_tag_line_list = build_word_tag_line_list(tagged_text, self._with_position_tags)
+        line_list = split_line_lists_into_sentences(
+            self._nlp, [word_tag_line_list], batch_size=batch_size, n_process=n_process
+        )[0]
+        if cache_key is not None:
+            self._parse_cache.store(cache_key, line_list)
+        return line_list
+
+    def build_tagged_text_line_list(self, batch_size=default_sentence_batch_size, n_process=1):
+        self._tagged_text_line_list = self._build_line_list(
+            self.get_tagged_text(), line_list_text, batch_size, n_process
+        )
         return self._tagged_text_line_list
 
-    def build_tagged_note_line_list(self):
-        cur_tag = "O"  # O is the sign for without tag
-        tagged_note_lines = self.get_tagged_notes().split("\n")
-        # Build Mapping Word to Tag
-        for tagged_note_line in tagged_note_lines:
-            cur_line_list = []
-            tagged_note_list = tagged_note_line.split(" ")
-            for note_part in tagged_note_list:
-                if note_part.startswith("<") and note_part.endswith(">"):
-                    if note_part[1] == "/":
-                        cur_tag = "O"  # O is the sign for without tag
-                    else:
-                        cur_tag = note_part[1:-1]
-                        first_tag_element = True
-                elif note_part is not None and note_part != "":
-                    if self._with_position_tags and cur_tag != "O":
-                        if first_tag_element:
-                            modified_tag = "B-" + cur_tag
-                            first_tag_element = False
-                        else:
-                            modified_tag = "I-" + cur_tag
-                    else:
-                        modified_tag = cur_tag
-                    # Sentence extraction doesn't work for capitalized words, that is why we use the following
-                    if note_part.upper() == note_part:
-                        cur_line_list.append([note_part.lower(), modified_tag, 1])
-                    else:
-                        cur_line_list.append([note_part, modified_tag, 0])
-            self._tagged_note_line_list.append(cur_line_list)
-        # Seperate sentences with the help of spacy
-        for i in range(len(self._tagged_note_line_list)):
-            # print(self._tagged_text_line_list[i])
-            cur_line_note = ""
-            tokenlist=[]
-            for j in range(len(self._tagged_note_line_list[i])):
-                if j > 0:
-                    #nlp sentence split has problems with strings whose length is longer than 1000000. That is why we use the following workaround
-                    if len(cur_line_note)+len(self._tagged_note_line_list[i][j][0])>999000 and self._tagged_note_line_list[i][j][1]=="O":
-                        tokenlist.append(self._nlp(cur_line_note))
-                        cur_line_note = ""
-                    else:
-                        cur_line_note += " "
-                cur_line_note += self._tagged_note_line_list[i][j][0]
-            # print('cur line text: ',cur_line_text)
-            tokenlist.append(self._nlp(cur_line_note))
-            k = 0
-            new_line_list = []
-            cur_word = ""
-            for tokens in tokenlist:
-                for sent in tokens.sents:
-                    space_before = False
-                    for wordindex in range(len(sent)):
-                        cur_tag_element = self._tagged_note_line_list[i][k]
-                        cur_word += str(sent[wordindex])
-                        word_to_insert = str(sent[wordindex])
-                        if cur_tag_element[2] == 1:
-                            word_to_insert = word_to_insert.upper()
-                        if wordindex == 0 and not cur_tag_element[1].startswith("I-"):
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 2])
-                        elif space_before:
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 0])
-                        else:
-                            new_line_list.append([word_to_insert, cur_tag_element[1], 1])
-                        if cur_word == cur_tag_element[0]:
-                            space_before = True
-                            cur_word = ""
-                            k += 1
-                        else:
-                            space_before = False
-            self._tagged_note_line_list[i] = new_line_list
-        # for line_list in self._tagged_text_line_list:
-        #    print(line_list)
+    def build_tagged_note_line_list(self, batch_size=default_sentence_batch_size, n_process=1):
+        self._tagged_note_line_list = self._build_line_list(
+            self.get_tagged_notes(), line_list_notes, batch_size, n_process
+        )
         return self._tagged_note_line_list
 
+    def _set_line_list(self, part, line_list):
+        if part == line_list_text:
+            self._tagged_text_line_list = line_list
+        else:
+            self._tagged_note_line_list = line_list
+
     def get_text(self):
         return self._text
 
@@ -422,6 +383,335 @@ class TEIFile:
             print(key, self._note_statistics[key])
 
 
+class _StreamElement:
+    # Minimal stand-in for a BeautifulSoup tag, used by TEIFile.get_entity_name_to_pagecontent
+    __slots__ = ("name", "attrs")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+
+class _StreamFrame:
+    __slots__ = ("kind", "name", "entity", "is_note", "text_list", "tagged_text_list", "statistics")
+
+    def __init__(self, kind, name=None, entity=None, is_note=False):
+        self.kind = kind
+        self.name = name
+        self.entity = entity
+        self.is_note = is_note
+        self.text_list = []
+        self.tagged_text_list = []
+        self.statistics = {}
+
+
+class _TEITextStreamTarget:
+    """lxml parser target which extracts the content of the first text tag of a TEI-File in one pass.
+
+    It mirrors the recursion of TEIFile._get_text_from_contentlist with an explicit stack of frames
+    and treats text, comments and namespaces in the same way as BeautifulSoup does with the "xml" parser,
+    so that both engines of TEIFile deliver identical results."""
+
+    _ascii_spaces = "\x20\x0a\x09\x0c\x0d"
+
+    def __init__(self, tei_file):
+        self._tei_file = tei_file
+        self._data = []
+        self._stack = []
+        self._nsmaps = [{"http://www.w3.org/XML/1998/namespace": "xml"}]
+        self.found_text = False
+        self.finished = False
+        self.text_list = []
+        self.tagged_text_list = []
+        self.statistics = {}
+
+    def _prefix_for_namespace(self, namespace):
+        for inverted_nsmap in reversed(self._nsmaps):
+            if inverted_nsmap is not None and namespace in inverted_nsmap:
+                return inverted_nsmap[namespace]
+        return None
+
+    def _get_name(self, tag):
+        if tag.startswith("{"):
+            namespace, name = tag[1:].split("}", 1)
+            prefix = self._prefix_for_namespace(namespace)
+            if prefix:
+                return prefix + ":" + name
+            return name
+        return tag
+
+    def _flush_data(self):
+        if len(self._data) > 0:
+            data = "".join(self._data)
+            self._data = []
+            if len(data.strip(self._ascii_spaces)) == 0:
+                data = "\n" if "\n" in data else " "
+            self._add_string(data, False)
+
+    def _add_string(self, data, is_comment):
+        if len(self._stack) == 0 or self._stack[-1].kind in ["outside", "skip"]:
+            return
+        frame = self._stack[-1]
+        if frame.kind == "text":
+            # a string directly in the text tag is handled like a page
+            if None in self._tei_file._exclude_tags:
+                return
+            self._tei_file._pagelist.append({"name": None, "page": None})
+            page_frame = _StreamFrame("page", is_note=None in self._tei_file._note_tags)
+            self._append_string_to_frame(page_frame, data, is_comment)
+            self._close_page(page_frame)
+        else:
+            self._append_string_to_frame(frame, data, is_comment)
+
+    def _append_string_to_frame(self, frame, data, is_comment):
+        if data != "\n" and not is_comment:
+            frame.text_list.append(data)
+            frame.tagged_text_list.append(data)
+        else:
+            frame.text_list.append(" ")
+            frame.tagged_text_list.append(" ")
+
+    def _close_page(self, frame):
+        tei_file = self._tei_file
+        if frame.is_note:
+            tei_file._note_list.extend(frame.text_list)
+            tei_file._note_list.append(" <linebreak>\n")
+            tei_file._tagged_note_list.extend(frame.tagged_text_list)
+            tei_file._tagged_note_list.append(" <linebreak>\n")
+            tei_file._note_statistics = tei_file._merge_statistics(tei_file._note_statistics, frame.statistics)
+        else:
+            self.text_list.extend(frame.text_list)
+            self.text_list.append(" <linebreak>\n")
+            self.tagged_text_list.extend(frame.tagged_text_list)
+            self.tagged_text_list.append(" <linebreak>\n")
+            self.statistics = tei_file._merge_statistics(self.statistics, frame.statistics)
+
+    def _new_frame(self, name, attrs):
+        tei_file = self._tei_file
+        parent = self._stack[-1] if len(self._stack) > 0 else None
+        if parent is None or parent.kind == "outside":
+            if name == "text" and not self.found_text:
+                self.found_text = True
+                return _StreamFrame("text", name)
+            return _StreamFrame("outside", name)
+        if parent.kind == "skip":
+            return _StreamFrame("skip", name)
+        if parent.kind == "text":
+            if name in tei_file._exclude_tags:
+                return _StreamFrame("skip", name)
+            tei_file._pagelist.append({"name": name, "page": None})
+            return _StreamFrame("page", name, is_note=name in tei_file._note_tags)
+        if (
+            (name not in ["lb", "pb"] and name not in tei_file._note_tags)
+            or (name in tei_file._note_tags and parent.is_note)
+        ) and name not in tei_file._exclude_tags:
+            if name == "closer" or name == "postscript":
+                parent.text_list.append(" <linebreak>\n")
+                parent.tagged_text_list.append(" <linebreak>\n")
+            entity = tei_file.get_entity_name_to_pagecontent(_StreamElement(name, attrs))
+            return _StreamFrame("content", name, entity=entity, is_note=parent.is_note)
+        if name in tei_file._note_tags:
+            return _StreamFrame("note", name, is_note=True)
+        return _StreamFrame("skip", name)
+
+    def _close_content(self, frame, parent):
+        tei_file = self._tei_file
+        parent.text_list.extend(frame.text_list)
+        if frame.entity is None:
+            parent.tagged_text_list.extend(frame.tagged_text_list)
+            parent.statistics = tei_file._merge_statistics(parent.statistics, frame.statistics)
+            if frame.name == "address":
+                parent.text_list.append(" <linebreak>\n")
+                parent.tagged_text_list.append(" <linebreak>\n")
+        else:
+            parent.statistics = tei_file._add_content_to_statistics(frame.entity, parent.statistics, frame.text_list)
+            parent.tagged_text_list.append(" <" + frame.entity + "> ")
+            parent.tagged_text_list.extend(frame.tagged_text_list)
+            parent.tagged_text_list.append(" </" + frame.entity + "> ")
+            parent.statistics = tei_file._merge_statistics(parent.statistics, frame.statistics)
+        if frame.name == "opener":
+            parent.text_list.append(" <linebreak>\n")
+            parent.tagged_text_list.append(" <linebreak>\n")
+
+    def start(self, tag, attrib, nsmap):
+        self._flush_data()
+        if len(nsmap) == 0 and len(self._nsmaps) > 1:
+            self._nsmaps.append(None)
+        elif len(nsmap) > 0:
+            self._nsmaps.append({namespace: prefix for prefix, namespace in nsmap.items()})
+        if self.finished:
+            self._stack.append(_StreamFrame("outside"))
+            return
+        attrs = {}
+        for prefix, namespace in nsmap.items():
+            attrs["xmlns:" + prefix if prefix else "xmlns"] = namespace
+        for key, value in attrib.items():
+            attrs[self._get_name(key)] = value
+        self._stack.append(self._new_frame(self._get_name(tag), attrs))
+
+    def end(self, tag):
+        self._flush_data()
+        if len(self._nsmaps) > 1:
+            self._nsmaps.pop()
+        frame = self._stack.pop()
+        if frame.kind == "text":
+            self.finished = True
+        elif frame.kind == "page":
+            self._close_page(frame)
+        elif frame.kind == "note":
+            self._close_page(frame)
+        elif frame.kind == "content":
+            self._close_content(frame, self._stack[-1])
+
+    def data(self, data):
+        self._data.append(data)
+
+    def comment(self, text):
+        self._flush_data()
+        self._add_string(text, True)
+
+    def pi(self, target, data):
+        self._flush_data()
+        self._data.append(target + " " + (data or ""))
+        self._flush_data()
+
+    def close(self):
+        self._flush_data()
+
+
+def build_word_tag_line_list(tagged_text, with_position_tags=False):
+    word_tag_line_list = []
+    cur_tag = "O"  # O is the sign for without tag
+    # Build Mapping Word to Tag
+    for tagged_text_line in tagged_text.split("\n"):
+        cur_line_list = []
+        for text_part in tagged_text_line.split(" "):
+            if text_part.startswith("<") and text_part.endswith(">"):
+                if text_part[1] == "/":
+                    cur_tag = "O"  # O is the sign for without tag
+                else:
+                    cur_tag = text_part[1:-1]
+                    first_tag_element = True
+            elif text_part is not None and text_part != "":
+                if with_position_tags and cur_tag != "O":
+                    if first_tag_element:
+                        modified_tag = "B-" + cur_tag
+                        first_tag_element = False
+                    else:
+                        modified_tag = "I-" + cur_tag
+                else:
+                    modified_tag = cur_tag
+                # Sentence extraction doesn't work for capitalized words, that is why we use the following
+                if text_part.upper() == text_part:
+                    cur_line_list.append([text_part.lower(), modified_tag, 1])
+                else:
+                    cur_line_list.append([text_part, modified_tag, 0])
+        word_tag_line_list.append(cur_line_list)
+    return word_tag_line_list
+
+
+def _get_line_chunks(line_list):
+    chunks = []
+    cur_line_text = ""
+    for j in range(len(line_list)):
+        if j > 0:
+            # nlp sentence split has problems with strings whose length is longer than 1000000. That is why we use the following workaround
+            if len(cur_line_text) + len(line_list[j][0]) > 999000 and line_list[j][1] == "O":
+                chunks.append(cur_line_text)
+                cur_line_text = ""
+            else:
+                cur_line_text += " "
+        cur_line_text += line_list[j][0]
+    chunks.append(cur_line_text)
+    return chunks
+
+
+def _align_sentences_to_line_list(line_list, tokenlist):
+    k = 0
+    new_line_list = []
+    cur_word = ""
+    for tokens in tokenlist:
+        for sent in tokens.sents:
+            space_before = False
+            for wordindex in range(len(sent)):
+                cur_tag_element = line_list[k]
+                cur_word += str(sent[wordindex])
+                word_to_insert = str(sent[wordindex])
+                if cur_tag_element[2] == 1:
+                    word_to_insert = word_to_insert.upper()
+                if wordindex == 0 and not cur_tag_element[1].startswith("I-"):
+                    new_line_list.append([word_to_insert, cur_tag_element[1], 2])
+                elif space_before:
+                    new_line_list.append([word_to_insert, cur_tag_element[1], 0])
+                else:
+                    new_line_list.append([word_to_insert, cur_tag_element[1], 1])
+                if cur_word == cur_tag_element[0]:
+                    space_before = True
+                    cur_word = ""
+                    k += 1
+                else:
+                    space_before = False
+    return new_line_list
+
+
+def split_line_lists_into_sentences(nlp, word_tag_line_lists, batch_size=default_sentence_batch_size, n_process=1):
+    # Seperate sentences with the help of spacy. With a batch_size all lines of all given line lists are processed
+    # in one nlp.pipe stream with only the pipes necessary for the sentence split, with batch_size None every line
+    # is processed by a separate call of the whole pipeline.
+    chunks = []
+    chunk_counts = []
+    for word_tag_line_list in word_tag_line_lists:
+        for line_list in word_tag_line_list:
+            line_chunks = _get_line_chunks(line_list)
+            chunks.extend(line_chunks)
+            chunk_counts.append(len(line_chunks))
+    sentence_line_lists = []
+    if batch_size is None:
+        docs = (nlp(chunk) for chunk in chunks)
+        _collect_sentence_line_lists(word_tag_line_lists, chunk_counts, docs, sentence_line_lists)
+    else:
+        with nlp.select_pipes(enable=get_sentence_pipe_names(nlp)):
+            docs = nlp.pipe(chunks, batch_size=batch_size, n_process=n_process)
+            _collect_sentence_line_lists(word_tag_line_lists, chunk_counts, docs, sentence_line_lists)
+    return sentence_line_lists
+
+
+def _collect_sentence_line_lists(word_tag_line_lists, chunk_counts, docs, sentence_line_lists):
+    line_index = 0
+    for word_tag_line_list in word_tag_line_lists:
+        new_word_tag_line_list = []
+        for line_list in word_tag_line_list:
+            tokenlist = [next(docs) for _ in range(chunk_counts[line_index])]
+            new_word_tag_line_list.append(_align_sentences_to_line_list(line_list, tokenlist))
+            line_index += 1
+        sentence_line_lists.append(new_word_tag_line_list)
+
+
+def build_tagged_line_lists(tei_file_list, nlp, use_notes=False, batch_size=default_sentence_batch_size, n_process=1):
+    # Builds the tagged text (and note) line lists of many TEI-Files with one nlp.pipe stream, line lists found in
+    # the parse caches of the files are not split again
+    parts = [line_list_text, line_list_notes] if use_notes else [line_list_text]
+    tasks = []
+    word_tag_line_lists = []
+    for tei_file in tei_file_list:
+        for part in parts:
+            cache_key = tei_file._get_line_list_cache_key(part, nlp)
+            line_list = tei_file._parse_cache.load(cache_key) if cache_key is not None else None
+            if line_list is not None:
+                tei_file._set_line_list(part, line_list)
+                continue
+            tagged_text = tei_file.get_tagged_text() if part == line_list_text else tei_file.get_tagged_notes()
+            word_tag_line_lists.append(build_word_tag_line_list(tagged_text, tei_file._with_position_tags))
+            tasks.append((tei_file, part, cache_key))
+    sentence_line_lists = split_line_lists_into_sentences(
+        nlp, word_tag_line_lists, batch_size=batch_size, n_process=n_process
+    )
+    for (tei_file, part, cache_key), line_list in zip(tasks, sentence_line_lists):
+        tei_file._set_line_list(part, line_list)
+        if cache_key is not None:
+            tei_file._parse_cache.store(cache_key, line_list)
+
+
 def split_into_sentences(tagged_text_line_list):
     cur_sentence = []
     sentence_list = []
@@ -1,11 +1,98 @@
 import os
+from collections.abc import Mapping, MutableMapping
 from os.path import join
 from bs4 import BeautifulSoup
 import re
 
+from tei_entity_enricher.util.helper import atomic_write
+
 _RE_COMBINE_WHITESPACE = re.compile(r"\s+")
 
 
+class TagNode(MutableMapping):
+    """Tag of the text tree of a TEI_Writer.
+
+    The tags of the tree used to be dicts with the keys "name", "tagbegin", "tag_id", "tagend" (only for tags with an
+    end tag) and "tagcontent" (only for tags with content). A TagNode keeps them in slots, the tag_id as int, and can
+    still be used like such a dict. Further keys are kept in an additional dict, copy() returns a plain dict.
+    """
+
+    __slots__ = ("name", "tagbegin", "tag_id", "tagend", "tagcontent", "_further_keys")
+
+    def __init__(self, name, tagbegin, tag_id, tagend=None, tagcontent=None):
+        self.name = name
+        self.tagbegin = tagbegin
+        self.tag_id = tag_id
+        self.tagend = tagend
+        self.tagcontent = tagcontent
+        self._further_keys = None
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self.name
+        elif key == "tagbegin":
+            return self.tagbegin
+        elif key == "tag_id":
+            return str(self.tag_id)
+        elif key == "tagend":
+            if self.tagend is None:
+                raise KeyError(key)
+            return self.tagend
+        elif key == "tagcontent":
+            if self.tagcontent is None:
+                raise KeyError(key)
+            return self.tagcontent
+        elif self._further_keys is None:
+            raise KeyError(key)
+        return self._further_keys[key]
+
+    def __setitem__(self, key, value):
+        if key in ["name", "tagbegin", "tag_id", "tagend", "tagcontent"]:
+            setattr(self, key, value)
+        else:
+            if self._further_keys is None:
+                self._further_keys = {}
+            self._further_keys[key] = value
+
+    def __delitem__(self, key):
+        if key in ["tagend", "tagcontent"] and getattr(self, key) is not None:
+            setattr(self, key, None)
+        elif key in ["name", "tagbegin", "tag_id"] or self._further_keys is None:
+            raise KeyError(key)
+        else:
+            del self._further_keys[key]
+
+    def __iter__(self):
+        yield "name"
+        yield "tagbegin"
+        yield "tag_id"
+        if self.tagend is not None:
+            yield "tagend"
+        if self.tagcontent is not None:
+            yield "tagcontent"
+        if self._further_keys is not None:
+            yield from self._further_keys
+
+    def __len__(self):
+        return (
+            3
+            + (self.tagend is not None)
+            + (self.tagcontent is not None)
+            + (len(self._further_keys) if self._further_keys is not None else 0)
+        )
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return f"TagNode({dict(self)!r})"
+
+
+class _TagStructureError(Exception):
+    # raised by TEI_Writer._build_text_tree_by_stack for texts, which are left to the recursive tree builder
+    pass
+
+
 class TEI_Writer:
     def __init__(self, filename, openfile=None, tr=None, tnw=None, untagged_symbols=["O"], tags_from_iob_scheme=True):
         self._space_codes = ["&#x2008;", "&#xA0;"]
@@ -85,7 +172,7 @@ class TEI_Writer:
         return endstartindex
 
     def _extract_next_tag(self, cur_text, swap=False, allow_only_end_tags=False):
-        #if swap:
+        # if swap:
         #    print(cur_text)
         beginstartindex = cur_text.find("<")
         swap_tag = ""
@@ -93,10 +180,12 @@ class TEI_Writer:
             beginstopindex = cur_text.find(">")
             if beginstopindex < beginstartindex:
                 print("Error: CheckSyntax")
-                errorexampletext=cur_text
-                if (len(cur_text)>100):
-                    errorexampletext=errorexampletext[:100]
-                raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+                errorexampletext = cur_text
+                if len(cur_text) > 100:
+                    errorexampletext = errorexampletext[:100]
+                raise ValueError(
+                    f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+                )
             tag_name = self._get_tag_name(cur_text[beginstartindex + 1 : beginstopindex])
             if tag_name == "!--":
                 beginstopindex = cur_text.find("-->") + 2
@@ -110,10 +199,12 @@ class TEI_Writer:
                     return tag_name, beginstartindex, beginstopindex, -1, -1, ""
                 else:
                     print("Error: CheckSyntax")
-                    errorexampletext=cur_text
-                    if (len(cur_text)>100):
-                        errorexampletext=errorexampletext[:100]
-                    raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+                    errorexampletext = cur_text
+                    if len(cur_text) > 100:
+                        errorexampletext = errorexampletext[:100]
+                    raise ValueError(
+                        f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+                    )
             endstopindex = endstartindex + len(tag_name) + 2
             return tag_name, beginstartindex, beginstopindex, endstartindex, endstopindex, swap_tag
 
@@ -175,10 +266,12 @@ class TEI_Writer:
             second_tag_start_begin_index = cur_text.find(second_tag_start + ">", first_tag_start_begin_index)
         if first_tag_start_begin_index < 0 or second_tag_start_begin_index < 0:
             print("Error: CheckSyntax")
-            errorexampletext=cur_text
-            if (len(cur_text)>100):
-                errorexampletext=errorexampletext[:100]
-            raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+            errorexampletext = cur_text
+            if len(cur_text) > 100:
+                errorexampletext = errorexampletext[:100]
+            raise ValueError(
+                f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+            )
         first_tag_start_stop_index = cur_text.find(">", first_tag_start_begin_index)
         second_tag_start_stop_index = cur_text.find(">", second_tag_start_begin_index)
         # print(first_tag, second_tag, cur_text)
@@ -188,10 +281,12 @@ class TEI_Writer:
         second_tag_end_begin_index = cur_text.find(second_tag_end, first_tag_end_begin_index)
         if first_tag_end_begin_index < 0:
             print("Error: CheckSyntax")
-            errorexampletext=cur_text
-            if (len(cur_text)>100):
-                errorexampletext=errorexampletext[:100]
-            raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+            errorexampletext = cur_text
+            if len(cur_text) > 100:
+                errorexampletext = errorexampletext[:100]
+            raise ValueError(
+                f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+            )
         if second_tag_end_begin_index < 0:
             return first_tag, "", -1, -1, -1, -1
         first_tag_end_stop_index = first_tag_end_begin_index + len(first_tag_end) - 1
@@ -211,10 +306,12 @@ class TEI_Writer:
             # print(new_text)
             if len(cur_text) != len(new_text):
                 print("Error: CheckSyntax")
-                errorexampletext=cur_text
-                if (len(cur_text)>100):
-                    errorexampletext=errorexampletext[:100]
-                raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+                errorexampletext = cur_text
+                if len(cur_text) > 100:
+                    errorexampletext = errorexampletext[:100]
+                raise ValueError(
+                    f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+                )
             return (
                 first_tag,
                 new_text,
@@ -237,10 +334,12 @@ class TEI_Writer:
                 new_text = new_text + cur_text[second_tag_start_stop_index + 1 :]
             if len(cur_text) != len(new_text):
                 print("Error: CheckSyntax")
-                errorexampletext=cur_text
-                if (len(cur_text)>100):
-                    errorexampletext=errorexampletext[:100]
-                raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+                errorexampletext = cur_text
+                if len(cur_text) > 100:
+                    errorexampletext = errorexampletext[:100]
+                raise ValueError(
+                    f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+                )
             return (
                 second_tag,
                 new_text,
@@ -261,10 +360,12 @@ class TEI_Writer:
             # print(new_text)
             if len(cur_text) != len(new_text):
                 print("Error: CheckSyntax")
-                errorexampletext=cur_text
-                if (len(cur_text)>100):
-                    errorexampletext=errorexampletext[:100]
-                raise ValueError(f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...')
+                errorexampletext = cur_text
+                if len(cur_text) > 100:
+                    errorexampletext = errorexampletext[:100]
+                raise ValueError(
+                    f'Cannot read hierarchical structure of tei-file "{self._filename}": ...{errorexampletext}...'
+                )
             return (
                 first_tag,
                 new_text,
@@ -275,11 +376,13 @@ class TEI_Writer:
             )
 
     def _build_subtexttaglist(self, cur_text, swap=False):
-        #rewritten to don't have trouble with maximum recrusive depth (see old variant self.build_subtexttaglist_old)
-        cur_end_text=cur_text
-        returnlist=[]
+        # rewritten to don't have trouble with maximum recrusive depth (see old variant self.build_subtexttaglist_old)
+        cur_end_text = cur_text
+        returnlist = []
         while cur_end_text is not None:
-            return_element, swap_tag, splitreturn , cur_end_text = self._build_subtexttaglist_part(cur_text=cur_end_text,swap=swap)
+            return_element, swap_tag, splitreturn, cur_end_text = self._build_subtexttaglist_part(
+                cur_text=cur_end_text, swap=swap
+            )
             if swap and len(swap_tag) > 0:
                 return [], swap_tag
             if splitreturn:
@@ -288,7 +391,6 @@ class TEI_Writer:
                 returnlist.append(return_element)
         return returnlist, swap_tag
 
-
     def _build_subtexttaglist_part(self, cur_text, swap=False):
         # if swap and cur_text=='<lem type="print">Chl.</lem><rdg type="original"><del type="strikethrough"><subst><del type="overwritten">ich</del><add type="superimposed">Ch.</add></subst></del><add place="left-margin">Chl.</add></rdg>':
         #    print("Hallo")
@@ -296,16 +398,12 @@ class TEI_Writer:
             cur_text, swap=swap
         )
         if swap and len(cur_swap_tag) > 0:
-            return None, cur_swap_tag, False , None
+            return None, cur_swap_tag, False, None
         elif tag_name is not None:
             returnlist = []
             if beginstartindex > 0:
                 returnlist.append(cur_text[:beginstartindex])
-            tag_dict = {
-                "name": tag_name,
-                "tagbegin": cur_text[beginstartindex : beginstopindex + 1],
-                "tag_id": str(self._max_id),
-            }
+            tag_dict = TagNode(tag_name, cur_text[beginstartindex : beginstopindex + 1], self._max_id)
             self._max_id += 1
             if endstartindex > 0:
                 tag_dict["tagend"] = cur_text[endstartindex : endstopindex + 1]
@@ -354,11 +452,7 @@ class TEI_Writer:
             returnlist = []
             if beginstartindex > 0:
                 returnlist.append(cur_text[:beginstartindex])
-            tag_dict = {
-                "name": tag_name,
-                "tagbegin": cur_text[beginstartindex : beginstopindex + 1],
-                "tag_id": str(self._max_id),
-            }
+            tag_dict = TagNode(tag_name, cur_text[beginstartindex : beginstopindex + 1], self._max_id)
             self._max_id += 1
             if endstartindex > 0:
                 tag_dict["tagend"] = cur_text[endstartindex : endstopindex + 1]
@@ -401,9 +495,80 @@ class TEI_Writer:
         else:
             return cur_text, ""
 
+    def _build_text_tree_by_stack(self, text):
+        # Builds the same tree as _build_subtexttaglist, but tokenizes the text only once by offsets and assembles the
+        # tree with a stack of the open tags. Crossing, unclosed or unmatched tags and other texts for which the
+        # recursive builder has its own behaviour (repair with swap=True or an error) raise a _TagStructureError.
+        if len(text) == 0:
+            return [""]
+        tree = []
+        content = tree
+        # repeated tag names, begin and end tags are shared between the TagNodes
+        tag_strings = {}
+        # open tags as tuples (TagNode, content list of the parent tag)
+        stack = []
+        position = 0
+        while position < len(text):
+            beginstartindex = text.find("<", position)
+            if beginstartindex < 0:
+                beginstartindex = len(text)
+            if beginstartindex > position:
+                if text.find(">", position, beginstartindex) >= 0:
+                    raise _TagStructureError()
+                content.append(text[position:beginstartindex])
+                if beginstartindex == len(text):
+                    break
+            beginstopindex = text.find(">", beginstartindex)
+            if beginstopindex < 0:
+                raise _TagStructureError()
+            spaceindex = text.find(" ", beginstartindex + 1, beginstopindex)
+            tag_name = text[beginstartindex + 1 : spaceindex if spaceindex > beginstartindex + 1 else beginstopindex]
+            if len(tag_name) == 0:
+                raise _TagStructureError()
+            if tag_name[0] == "/":
+                if (
+                    len(stack) == 0
+                    or tag_name[1:] != stack[-1][0]["name"]
+                    or beginstopindex != beginstartindex + len(tag_name) + 1
+                ):
+                    raise _TagStructureError()
+                tag_dict, parent_content = stack.pop()
+                tagend = text[beginstartindex : beginstopindex + 1]
+                tag_dict.tagend = tag_strings.setdefault(tagend, tagend)
+                if len(content) > 0:
+                    tag_dict.tagcontent = content
+                content = parent_content
+                position = beginstopindex + 1
+                continue
+            if tag_name == "!--":
+                beginstopindex = text.find("-->", beginstartindex) + 2
+                if beginstopindex < 2 or text.find("<", beginstartindex + 1, beginstopindex) >= 0:
+                    raise _TagStructureError()
+            tagbegin = text[beginstartindex : beginstopindex + 1]
+            tag_dict = TagNode(
+                tag_strings.setdefault(tag_name, tag_name), tag_strings.setdefault(tagbegin, tagbegin), self._max_id
+            )
+            self._max_id += 1
+            content.append(tag_dict)
+            if text[beginstopindex - 1] != "/" and tag_name != "!--":
+                stack.append((tag_dict, content))
+                content = []
+            position = beginstopindex + 1
+        if len(stack) > 0:
+            raise _TagStructureError()
+        return tree
+
+    def _build_tree(self, text, swap=False):
+        max_id = self._max_id
+        try:
+            return self._build_text_tree_by_stack(text)
+        except _TagStructureError:
+            self._max_id = max_id
+            return self._build_subtexttaglist(text, swap=swap)[0]
+
     def _build_text_tree(self):
         self._max_id = 0
-        self._text_tree, _ = self._build_subtexttaglist(self._text)
+        self._text_tree = self._build_tree(self._text)
 
     # def _get_full_xml_of_tree_content(self, cur_element):
     #    if isinstance(cur_element, dict):
@@ -428,7 +593,8 @@ class TEI_Writer:
         return self._begin + self._text + self._end
 
     def write_back_to_file(self, outputpath):
-        with open(file=outputpath, mode="w", encoding="utf8") as file:
+        # an interrupted write does not leave a truncated TEI-File
+        with atomic_write(outputpath, encoding="utf8") as file:
             file.write(self.get_tei_file_string())
 
     def _merge_tags_to_insert(self, ins_tag, textstring):
@@ -485,7 +651,7 @@ class TEI_Writer:
         return merged_tags
 
     def _get_new_tagged_string(self, tag, string_to_tag, with_begin=True, with_end=True):
-        new_tagged_string=string_to_tag
+        new_tagged_string = string_to_tag
         if tag in self._write_entity_dict.keys():
             new_tagged_string = "<" + self._write_entity_dict[tag][0]
             attr_string = " "
@@ -501,6 +667,197 @@ class TEI_Writer:
         return new_tagged_string
 
     def _write_textstring(self, textstring, predicted_data, already_tagged, predicted_note_data, is_note):
+        # Inserts the predicted tags into a text of the tree. The words of the predictions are aligned with offsets of
+        # the text and all tags are inserted at once. Gives the same result as _write_textstring_by_characters, which
+        # is still used for empty texts and empty predicted words.
+        if (
+            textstring is None
+            or textstring == ""
+            or self._has_empty_predicted_word
+            or (self._cur_pred_note_word if is_note else self._cur_pred_word) == ""
+        ):
+            return self._write_textstring_by_characters(
+                textstring, predicted_data, already_tagged, predicted_note_data, is_note
+            )
+        if is_note:
+            ins_tag = self._align_textstring(textstring, predicted_note_data, already_tagged, True)
+        else:
+            ins_tag = self._align_textstring(textstring, predicted_data, already_tagged, False)
+        # words, which are continued in the next text
+        i = len(textstring) - 1
+        if len(self._cur_word) > 0:
+            if (
+                already_tagged == False
+                and predicted_data[self._contentindex][self._wordindex][1] not in self._untagged_symbols
+                and i - len(self._cur_word) + 1 >= 0
+            ):
+                ins_tag.append(
+                    {
+                        "tag": predicted_data[self._contentindex][self._wordindex][1],
+                        "begin": i - len(self._cur_word) + 1,
+                        "note": False,
+                    }
+                )
+        if len(self._cur_note_word) > 0:
+            if (
+                already_tagged == False
+                and predicted_note_data[self._notecontentindex][self._notewordindex][1] not in self._untagged_symbols
+                and i - len(self._cur_note_word) + 1 >= 0
+            ):
+                ins_tag.append(
+                    {
+                        "tag": predicted_note_data[self._notecontentindex][self._notewordindex][1],
+                        "begin": i - len(self._cur_note_word) + 1,
+                        "note": True,
+                    }
+                )
+        if len(ins_tag) > 0:
+            return self._insert_tags(textstring, self._merge_tags_to_insert(ins_tag, textstring))
+        return textstring
+
+    def _align_textstring(self, textstring, data, already_tagged, is_note):
+        # Returns the tags to insert into textstring and moves the position in the predicted data (data) behind the
+        # words of textstring. Skips characters before a word with find and compares complete words with startswith,
+        # only words containing entities (&...;) or continued in the next text are compared character by character.
+        if is_note:
+            contentindex, wordindex = self._notecontentindex, self._notewordindex
+            word, index = self._cur_pred_note_word, self._cur_pred_note_index
+        else:
+            contentindex, wordindex = self._contentindex, self._wordindex
+            word, index = self._cur_pred_word, self._cur_pred_index
+        ins_tag = []
+        length = len(textstring)
+        find = textstring.find
+        # position of the next "&" at or after position
+        next_entity = find("&")
+        if next_entity < 0:
+            next_entity = length
+        position = 0
+        while position < length:
+            if position > next_entity:
+                next_entity = find("&", position)
+                if next_entity < 0:
+                    next_entity = length
+            if index == 0:
+                # characters before the begin of the next word are skipped
+                next_position = find(word[0], position, next_entity)
+                position = next_position if next_position >= 0 else next_entity
+                if position == length:
+                    break
+            last_position = position
+            if position == next_entity:  # Special handling for html unicode characters
+                entity_end = find(";", position)
+                if entity_end >= 0 and textstring[position : entity_end + 1] in self._space_codes:
+                    position = entity_end + 1
+                    continue
+                index += 1
+                position = entity_end + 1 if entity_end >= 0 else position + 1
+            elif textstring[position] == word[index]:
+                if "&" not in word and textstring.startswith(word[index:], position):
+                    last_position = position + len(word) - index - 1
+                    index = len(word)
+                else:
+                    index += 1
+                position = last_position + 1
+            else:
+                if position > 0 and index > 0:
+                    if is_note:
+                        print("Error: Predicted note data doesn't match TEI-File!")
+                    else:
+                        print("Error: Predicted data doesn't match TEI-File!")
+                    errorexampletext = textstring
+                    if len(textstring) > 100:
+                        errorexampletext = errorexampletext[:100]
+                    if is_note:
+                        raise ValueError(
+                            f'Not able to insert all predictions to the notes of tei-file "{self._filename}": ...{errorexampletext}...'
+                        )
+                    raise ValueError(
+                        f'Not able to insert all predictions in tei-file "{self._filename}": ...{errorexampletext}...'
+                    )
+                position += 1
+                continue
+            if index == len(word):
+                if already_tagged == False and data[contentindex][wordindex][1] not in self._untagged_symbols:
+                    if last_position - len(word) + 1 >= 0:
+                        ins_tag.append(
+                            {
+                                "tag": data[contentindex][wordindex][1],
+                                "begin": last_position - len(word) + 1,
+                                "end": last_position + 1,
+                                "note": is_note,
+                            }
+                        )
+                    else:
+                        ins_tag.append(
+                            {"tag": data[contentindex][wordindex][1], "end": last_position + 1, "note": is_note}
+                        )
+                if len(data[contentindex]) - 1 > wordindex:
+                    wordindex += 1
+                else:
+                    wordindex = 0
+                    contentindex += 1
+                if len(data) > contentindex:
+                    word = data[contentindex][wordindex][0]
+                index = 0
+        if is_note:
+            self._notecontentindex, self._notewordindex = contentindex, wordindex
+            self._cur_pred_note_word, self._cur_pred_note_index = word, index
+            self._cur_note_word = word[:index]
+        else:
+            self._contentindex, self._wordindex = contentindex, wordindex
+            self._cur_pred_word, self._cur_pred_index = word, index
+            self._cur_word = word[:index]
+        return ins_tag
+
+    def _insert_tags(self, textstring, ins_tag):
+        # inserts the tags with one join, if they are ordered and do not overlap
+        pieces = []
+        last_end = 0
+        for tag in ins_tag:
+            begin = tag["begin"] if "begin" in tag.keys() else 0
+            end = tag["end"] if "end" in tag.keys() else len(textstring)
+            if begin < last_end or end < begin:
+                return self._insert_tags_one_by_one(textstring, ins_tag)
+            pieces.append(textstring[last_end:begin])
+            pieces.append(
+                self._get_new_tagged_string(
+                    tag["tag"], textstring[begin:end], with_begin="begin" in tag.keys(), with_end="end" in tag.keys()
+                )
+            )
+            last_end = end
+        pieces.append(textstring[last_end:])
+        return "".join(pieces)
+
+    def _insert_tags_one_by_one(self, textstring, ins_tag):
+        addindex = 0
+        for tag in ins_tag:
+            if "begin" in tag.keys():
+                if "end" in tag.keys():
+                    string_to_tag = textstring[tag["begin"] + addindex : tag["end"] + addindex]
+                    new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag)
+                    textstring = (
+                        textstring[: tag["begin"] + addindex] + new_tagged_string + textstring[tag["end"] + addindex :]
+                    )
+                else:
+                    string_to_tag = textstring[tag["begin"] + addindex :]
+                    new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag, with_end=False)
+                    textstring = textstring[: tag["begin"] + addindex] + new_tagged_string
+            else:
+                if "end" in tag.keys():
+                    string_to_tag = textstring[: tag["end"] + addindex]
+                    new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag, with_begin=False)
+                    textstring = new_tagged_string + textstring[tag["end"] + addindex :]
+                else:
+                    string_to_tag = textstring
+                    new_tagged_string = self._get_new_tagged_string(
+                        tag["tag"], string_to_tag, with_begin=False, with_end=False
+                    )
+                    textstring = new_tagged_string
+            addindex = addindex + len(new_tagged_string) - len(string_to_tag)
+        return textstring
+
+    def _write_textstring_by_characters(self, textstring, predicted_data, already_tagged, predicted_note_data, is_note):
         if textstring is not None and textstring != "":
             ins_tag = []
             ignore_char_until = 0
@@ -512,10 +869,12 @@ class TEI_Writer:
                         predicted_note_data[self._notecontentindex][self._notewordindex][0]
                     ):
                         print("Error: Predicted note data doesn't match TEI-File!")
-                        errorexampletext=textstring
-                        if (len(textstring)>100):
-                            errorexampletext=errorexampletext[:100]
-                        raise ValueError(f'Not able to insert all predictions to the notes of tei-file "{self._filename}": ...{errorexampletext}...')
+                        errorexampletext = textstring
+                        if len(textstring) > 100:
+                            errorexampletext = errorexampletext[:100]
+                        raise ValueError(
+                            f'Not able to insert all predictions to the notes of tei-file "{self._filename}": ...{errorexampletext}...'
+                        )
                     if textstring[i] == "&":  # Special handling for html unicode characters
                         unicode_end_index = textstring[i:].find(";")
                         ignore_char_until = i + unicode_end_index + 1
@@ -529,10 +888,12 @@ class TEI_Writer:
                         self._cur_note_word = self._cur_note_word + textstring[i]
                     elif i > 0 and self._cur_pred_note_index > 0:
                         print("Error: Predicted note data doesn't match TEI-File!")
-                        errorexampletext=textstring
-                        if (len(textstring)>100):
-                            errorexampletext=errorexampletext[:100]
-                        raise ValueError(f'Not able to insert all predictions to the notes of tei-file "{self._filename}": ...{errorexampletext}...')
+                        errorexampletext = textstring
+                        if len(textstring) > 100:
+                            errorexampletext = errorexampletext[:100]
+                        raise ValueError(
+                            f'Not able to insert all predictions to the notes of tei-file "{self._filename}": ...{errorexampletext}...'
+                        )
                     if self._cur_note_word == self._cur_pred_note_word:
                         if (
                             already_tagged == False
@@ -572,10 +933,12 @@ class TEI_Writer:
                         predicted_data[self._contentindex][self._wordindex][0]
                     ):
                         print("Error: Predicted data doesn't match TEI-File!")
-                        errorexampletext=textstring
-                        if (len(textstring)>100):
-                            errorexampletext=errorexampletext[:100]
-                        raise ValueError(f'Not able to insert all predictions in tei-file "{self._filename}": ...{errorexampletext}...')
+                        errorexampletext = textstring
+                        if len(textstring) > 100:
+                            errorexampletext = errorexampletext[:100]
+                        raise ValueError(
+                            f'Not able to insert all predictions in tei-file "{self._filename}": ...{errorexampletext}...'
+                        )
 
                     if textstring[i] == "&":  # Special handling for html unicode characters
                         unicode_end_index = textstring[i:].find(";")
@@ -588,10 +951,12 @@ class TEI_Writer:
                         self._cur_word = self._cur_word + textstring[i]
                     elif i > 0 and self._cur_pred_index > 0:
                         print("Error: Predicted data doesn't match TEI-File!")
-                        errorexampletext=textstring
-                        if (len(textstring)>100):
-                            errorexampletext=errorexampletext[:100]
-                        raise ValueError(f'Not able to insert all predictions in tei-file "{self._filename}": ...{errorexampletext}...')
+                        errorexampletext = textstring
+                        if len(textstring) > 100:
+                            errorexampletext = errorexampletext[:100]
+                        raise ValueError(
+                            f'Not able to insert all predictions in tei-file "{self._filename}": ...{errorexampletext}...'
+                        )
                     if self._cur_word == self._cur_pred_word:
                         if (
                             already_tagged == False
@@ -652,34 +1017,7 @@ class TEI_Writer:
                     }
                 )
         if len(ins_tag) > 0:
-            addindex = 0
-            ins_tag = self._merge_tags_to_insert(ins_tag, textstring)
-            for tag in ins_tag:
-                if "begin" in tag.keys():
-                    if "end" in tag.keys():
-                        string_to_tag = textstring[tag["begin"] + addindex : tag["end"] + addindex]
-                        new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag)
-                        textstring = (
-                            textstring[: tag["begin"] + addindex]
-                            + new_tagged_string
-                            + textstring[tag["end"] + addindex :]
-                        )
-                    else:
-                        string_to_tag = textstring[tag["begin"] + addindex :]
-                        new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag, with_end=False)
-                        textstring = textstring[: tag["begin"] + addindex] + new_tagged_string
-                else:
-                    if "end" in tag.keys():
-                        string_to_tag = textstring[: tag["end"] + addindex]
-                        new_tagged_string = self._get_new_tagged_string(tag["tag"], string_to_tag, with_begin=False)
-                        textstring = new_tagged_string + textstring[tag["end"] + addindex :]
-                    else:
-                        string_to_tag = textstring
-                        new_tagged_string = self._get_new_tagged_string(
-                            tag["tag"], string_to_tag, with_begin=False, with_end=False
-                        )
-                        textstring = new_tagged_string
-                addindex = addindex + len(new_tagged_string) - len(string_to_tag)
+            textstring = self._insert_tags_one_by_one(textstring, self._merge_tags_to_insert(ins_tag, textstring))
         return textstring
 
     def _write_only_notes_in_contentlist(
@@ -690,7 +1028,7 @@ class TEI_Writer:
                 contentlist[contentindex] = self._write_only_notes_in_contentlist(
                     contentlist[contentindex], predicted_data, already_tagged, predicted_note_data, is_note
                 )
-            elif isinstance(contentlist[contentindex], dict):
+            elif isinstance(contentlist[contentindex], Mapping):
                 if (
                     contentlist[contentindex]["name"] in self._note_tags
                     and "tagcontent" in contentlist[contentindex].keys()
@@ -715,7 +1053,7 @@ class TEI_Writer:
                     tag_dict["tagcontent"] = self._write_contentlist(
                         tag_dict["tagcontent"], predicted_data, tagged, predicted_note_data, is_note
                     )
-                elif isinstance(tag_dict["tagcontent"], dict):
+                elif isinstance(tag_dict["tagcontent"], Mapping):
                     tag_dict["tagcontent"] = self._write_tag_dict(
                         tag_dict["tagcontent"], predicted_data, tagged, predicted_note_data, is_note
                     )
@@ -731,7 +1069,7 @@ class TEI_Writer:
                 contentlist[contentindex] = self._write_contentlist(
                     contentlist[contentindex], predicted_data, already_tagged, predicted_note_data, is_note
                 )
-            elif isinstance(contentlist[contentindex], dict):
+            elif isinstance(contentlist[contentindex], Mapping):
                 contentlist[contentindex] = self._write_tag_dict(
                     contentlist[contentindex], predicted_data, already_tagged, predicted_note_data, is_note
                 )
@@ -743,7 +1081,7 @@ class TEI_Writer:
 
     def sort_begins_and_ends_in_text_tree(self):
         self.refresh_text_by_tree()
-        self._text_tree, _ = self._build_subtexttaglist(self._text, swap=True)
+        self._text_tree = self._build_tree(self._text, swap=True)
         self.refresh_text_by_tree()
 
     def write_predicted_ner_tags(self, predicted_data, predicted_note_data):
@@ -754,6 +1092,9 @@ class TEI_Writer:
         self._cur_word = ""
         self._cur_note_word = ""
         self._cur_pred_word = predicted_data[0][0][0]
+        self._has_empty_predicted_word = any(
+            len(word[0]) == 0 for sentence in predicted_data + predicted_note_data for word in sentence
+        )
         if self._use_notes and len(predicted_note_data) > 0:
             self._cur_pred_note_word = predicted_note_data[0][0][0]
         else:
@@ -783,14 +1124,14 @@ class TEI_Writer:
                     if len(tag_config[1][attr]) > 0 and cur_attr_dict[attr] != tag_config[1][attr]:
                         cur_tag_config_matches = False
             if cur_tag_config_matches:
-                self.cur_matching_index=tag_list.index(tag_config)
+                self.cur_matching_index = tag_list.index(tag_config)
                 return True
         return False
 
     def get_text_tree(self):
         return self._text_tree
 
-    def get_list_of_tags_matching_tag_list(self, tag_list,sparqllist):
+    def get_list_of_tags_matching_tag_list(self, tag_list, sparqllist):
         matching_tag_list = []
         self._loop_contentlist(matching_tag_list, self._text_tree, tag_list, sparqllist)
         return matching_tag_list
@@ -801,10 +1142,10 @@ class TEI_Writer:
                 contentlist[contentindex] = self._loop_contentlist(
                     matching_tag_list, contentlist[contentindex], tag_list, sparqllist
                 )
-            elif isinstance(contentlist[contentindex], dict):
+            elif isinstance(contentlist[contentindex], Mapping):
                 if self._is_tag_matching_tag_list(contentlist[contentindex], tag_list):
-                    tag=contentlist[contentindex].copy()
-                    tag["default_sparql_query"]=sparqllist[self.cur_matching_index]
+                    tag = contentlist[contentindex].copy()
+                    tag["default_sparql_query"] = sparqllist[self.cur_matching_index]
                     matching_tag_list.append(tag)
                 if "tagcontent" in contentlist[contentindex].keys():
                     contentlist[contentindex]["tagcontent"] = self._loop_contentlist(
@@ -818,7 +1159,7 @@ class TEI_Writer:
                 contentlist[contentindex] = self._include_changes_of_tag_dict_for_tree_element(
                     contentlist[contentindex], tag_dict
                 )
-            elif isinstance(contentlist[contentindex], dict):
+            elif isinstance(contentlist[contentindex], Mapping):
                 if contentlist[contentindex]["tag_id"] in tag_dict.keys():
                     if tag_dict[contentlist[contentindex]["tag_id"]]["delete"]:
                         if "tagcontent" in contentlist[contentindex].keys():
@@ -827,7 +1168,7 @@ class TEI_Writer:
                             contentlist[contentindex] = [""]
                     else:
                         contentlist[contentindex] = tag_dict[contentlist[contentindex]["tag_id"]]
-                if isinstance(contentlist[contentindex], dict) and "tagcontent" in contentlist[contentindex].keys():
+                if isinstance(contentlist[contentindex], Mapping) and "tagcontent" in contentlist[contentindex].keys():
                     contentlist[contentindex]["tagcontent"] = self._include_changes_of_tag_dict_for_tree_element(
                         contentlist[contentindex]["tagcontent"], tag_dict
                     )
@@ -870,7 +1211,7 @@ def write_predicted_text_list_back_to_TEI(directory, origdirectory, outdirectory
 
 
 def get_full_xml_of_tree_content(cur_element):
-    if isinstance(cur_element, dict):
+    if isinstance(cur_element, Mapping):
         text = cur_element["tagbegin"]
         if "tagcontent" in cur_element.keys():
             text += get_full_xml_of_tree_content(cur_element["tagcontent"])
@@ -887,7 +1228,7 @@ def get_full_xml_of_tree_content(cur_element):
 
 
 def get_pure_text_of_tree_element(cur_element, tr, first=True, id_to_mark=None):
-    if isinstance(cur_element, dict):
+    if isinstance(cur_element, Mapping):
         text = ""
         if (
             "tagcontent" in cur_element.keys()
@@ -913,7 +1254,7 @@ def get_pure_text_of_tree_element(cur_element, tr, first=True, id_to_mark=None):
 
 
 def get_pure_note_text_of_tree_element(cur_element, tr, id_to_mark=None, is_note=False, is_marked=False):
-    if isinstance(cur_element, dict):
+    if isinstance(cur_element, Mapping):
         text = ""
         if "tagcontent" in cur_element.keys() and cur_element["name"] not in tr["exclude_tags"]:
             if cur_element["name"] in tr["note_tags"]:
@@ -1029,7 +1370,7 @@ if __name__ == "__main__":
     tei_file = TEI_Writer("../uwe_johnson_data/Mareike_Fehler/draco_test.xml", tr=tr)
     print(get_pure_text_of_tree_element(tei_file.get_text_tree(), tr))
     # print(parse_xml_to_text(get_pure_text_of_tree_element(tei_file.get_text_tree(), tr, id_to_mark="5")))
-    #test_write_pred_results(tr=tr, tnw=tnw, pred_out_dir="ner_prediction")
+    # test_write_pred_results(tr=tr, tnw=tnw, pred_out_dir="ner_prediction")
     # mlist=tei_file.get_list_of_tags_matching_tag_list([["",{"":""}]])
     # print(mlist[1],mlist[5])
     # run_test("test",tr) #test/0809_101259.xml test/0045_060044.xml